@@ -26,11 +26,47 @@
 #include <pybind11/smart_holder.h>
 #include <routingblocks/evaluation.h>
 
+#include <algorithm>
+#include <initializer_list>
+#include <optional>
+
 PYBIND11_SMART_HOLDER_TYPE_CASTERS(routingblocks::Evaluation)
 
 namespace routingblocks::bindings {
 
     void bind_evaluation(pybind11::module& m);
-}
+
+    /**
+     * Returns false if evaluation is implemented in Python. Labels of such evaluations are Python
+     * objects, so they must not be created, copied or destroyed without holding the GIL.
+     */
+    bool is_native_evaluation(const routingblocks::Evaluation& evaluation);
+
+    /**
+     * Releases the GIL for its lifetime if native code may run without it, i.e., if at least one
+     * of the passed evaluations is set and none is implemented in Python. Null evaluations are
+     * ignored.
+     *
+     * Python operators, pivoting rules and callbacks invoked while the GIL is released acquire
+     * it themselves.
+     */
+    class release_gil_for {
+        std::optional<pybind11::gil_scoped_release> _release;
+
+      public:
+        explicit release_gil_for(const routingblocks::Evaluation* evaluation)
+            : release_gil_for({evaluation}) {}
+
+        explicit release_gil_for(std::initializer_list<const routingblocks::Evaluation*> evaluations) {
+            const bool any_set = std::any_of(evaluations.begin(), evaluations.end(),
+                                             [](const auto* evaluation) { return evaluation; });
+            const bool all_native
+                = std::all_of(evaluations.begin(), evaluations.end(), [](const auto* evaluation) {
+                      return evaluation == nullptr || is_native_evaluation(*evaluation);
+                  });
+            if (any_set && all_native) _release.emplace();
+        }
+    };
+}  // namespace routingblocks::bindings
 
 #endif  // routingblocks_EVALUATION_H
@@ -324,6 +324,11 @@ namespace routingblocks::bindings {
             .def("create_backward_label", &PyEvaluation::py_create_backward_label);
     }
 
+    bool is_native_evaluation(const routingblocks::Evaluation& evaluation) {
+        return dynamic_cast<const PyEvaluation*>(&evaluation) == nullptr
+               && dynamic_cast<const PyConcatenationBasedEvaluation*>(&evaluation) == nullptr;
+    }
+
     void bind_evaluation(pybind11::module& m) {
         auto evaluation_interface = bind_evaluation_interface(m);
         bind_py_evaluation(m, evaluation_interface);
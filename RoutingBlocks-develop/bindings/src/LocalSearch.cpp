@@ -21,6 +21,7 @@
 #include <pybind11/stl.h>
 #include <routingblocks/LocalSearch.h>
 #include <routingblocks/utility/random.h>
+#include <routingblocks_bindings/Evaluation.h>
 #include <routingblocks_bindings/LocalSearch.h>
 
 namespace routingblocks::bindings {
@@ -72,9 +73,17 @@ namespace routingblocks::bindings {
             .def(
                 "optimize",
                 [](LocalSearch& ls, Solution& sol, std::vector<Operator*> operators) -> void {
+                    // Operators and pivoting rules implemented in python re-acquire the GIL when
+                    // invoked.
+                    release_gil_for release({ls.evaluation(), ls.exact_evaluation()});
                     ls.run(sol, operators.begin(), operators.end());
                 },
-                "Optimizes the passed solution inplace.");
+                "Optimizes the passed solution inplace.")
+            .def_property("remember_local_optima", &LocalSearch::remembers_local_optima,
+                          &LocalSearch::set_remember_local_optima)
+            .def("forget_local_optima", &LocalSearch::forget_local_optima)
+            .def_property_readonly("number_of_remembered_optima",
+                                   &LocalSearch::number_of_remembered_optima);
     }
 
     template <class T> void bind_generator_arc(pybind11::module& m, const char* name) {
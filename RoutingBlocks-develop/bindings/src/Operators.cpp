@@ -175,6 +175,31 @@ namespace routingblocks::bindings {
     void bind_arc_set(pybind11::module_& m) {
         pybind11::class_<utility::arc_set>(m, "ArcSet", "A set of arcs.")
             .def(pybind11::init<VertexID>())
+            .def_static(
+                "from_mask",
+                [](const pybind11::buffer& mask) {
+                    const auto info = mask.request();
+                    if (info.ndim != 2 || info.shape[0] != info.shape[1]) {
+                        throw std::invalid_argument("The mask must be a square matrix.");
+                    }
+                    if (info.format != pybind11::format_descriptor<bool>::format()) {
+                        throw std::invalid_argument("The mask must be a boolean array.");
+                    }
+                    const auto number_of_vertices = static_cast<size_t>(info.shape[0]);
+                    const auto* data = static_cast<const char*>(info.ptr);
+                    utility::arc_set arcs(number_of_vertices);
+                    for (size_t i = 0; i < number_of_vertices; ++i) {
+                        for (size_t j = 0; j < number_of_vertices; ++j) {
+                            if (!*reinterpret_cast<const bool*>(data + i * info.strides[0]
+                                                                + j * info.strides[1])) {
+                                arcs.forbid_arc(i, j);
+                            }
+                        }
+                    }
+                    return arcs;
+                },
+                "Create an arc set from a square boolean matrix. Arc (i, j) is included iff "
+                "mask[i, j] is true.")
             .def("include_arc", &utility::arc_set::include_arc, "Include an arc in the set.")
             .def("forbid_arc", &utility::arc_set::forbid_arc, "Forbid an arc in the set.")
             .def("includes_arc", &utility::arc_set::includes_arc, "Check if an arc is allowed.");
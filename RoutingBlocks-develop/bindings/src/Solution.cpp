@@ -20,6 +20,7 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include <routingblocks/Solution.h>
+#include <routingblocks_bindings/Evaluation.h>
 #include <routingblocks_bindings/Solution.h>
 
 #include <routingblocks_bindings/binding_helpers.hpp>
@@ -39,6 +40,11 @@ namespace {
             return std::next(begin, x);
         }
     }
+
+    routingblocks::Solution _copy_solution(const routingblocks::Solution& solution) {
+        routingblocks::bindings::release_gil_for release(solution.evaluation());
+        return solution;
+    }
 }  // namespace
 
 namespace routingblocks::bindings {
@@ -98,6 +104,8 @@ namespace routingblocks::bindings {
             .def_property_readonly("modification_timestamp",
                                    &routingblocks::Route::modification_timestamp,
                                    "The route modification_timestamp. May be used for caching.")
+            .def_property_readonly("fingerprint", &routingblocks::Route::fingerprint,
+                                   "64 bit hash of the arcs of the route.")
             .def("__len__", &routingblocks::Route::size, "The number of vertices in the route.")
             .def("__copy__", [](const Route& r) { return Route(r); })
             .def("copy", [](const Route& r) { return Route(r); })
@@ -127,6 +135,7 @@ namespace routingblocks::bindings {
             .def(
                 "remove_segment",
                 [](Route& route, size_t begin_pos, size_t end_pos) {
+                    release_gil_for release(route.evaluation());
                     auto ret = route.remove_segment(std::next(route.begin(), begin_pos),
                                                     std::next(route.begin(), end_pos));
                     return std::distance(route.begin(), ret);
@@ -138,12 +147,14 @@ namespace routingblocks::bindings {
                     std::vector<NodeLocation> locations;
                     std::transform(vertices.begin(), vertices.end(), std::back_inserter(locations),
                                    [](int v) { return NodeLocation(0, v); });
+                    release_gil_for release(route.evaluation());
                     route.remove_vertices(locations.begin(), locations.end());
                 },
                 "Removes the given vertices from the route.")
             .def(
                 "insert_segment_after",
                 [](Route& route, size_t pos, const std::vector<Node>& nodes) {
+                    release_gil_for release(route.evaluation());
                     auto ret = route.insert_segment_after(std::next(route.begin(), pos),
                                                           nodes.begin(), nodes.end());
                     return std::distance(route.begin(), ret);
@@ -159,6 +170,7 @@ namespace routingblocks::bindings {
                          vertex_ids_and_locations.emplace_back(v_id, NodeLocation(0, pos));
                      }
 
+                     release_gil_for release(route.evaluation());
                      route.insert_vertices_after(vertex_ids_and_locations.begin(),
                                                  vertex_ids_and_locations.end());
                  })
@@ -169,6 +181,7 @@ namespace routingblocks::bindings {
                      auto end = std::next(route.begin(), end_pos);
                      auto other_begin = std::next(other.begin(), other_begin_pos);
                      auto other_end = std::next(other.begin(), other_end_pos);
+                     release_gil_for release({route.evaluation(), other.evaluation()});
                      if (&route != &other) {
                          // Inter-route exchange
                          route.exchange_segments(begin, end, other_begin, other_end, other);
@@ -177,8 +190,13 @@ namespace routingblocks::bindings {
                          route.exchange_segments(begin, end, other_begin, other_end);
                      }
                  })
-            .def("update", pybind11::overload_cast<>(&routingblocks::Route::update),
-                 "Updates the route.")
+            .def(
+                "update",
+                [](Route& route) {
+                    release_gil_for release(route.evaluation());
+                    route.update();
+                },
+                "Updates the route.")
             .def("__eq__", &routingblocks::Route::operator==, "Whether the routes are equal.")
             .def("__ne__", &routingblocks::Route::operator!=, "Whether the routes are not equal.");
 
@@ -239,10 +257,12 @@ namespace routingblocks::bindings {
             .def_property_readonly("feasible", &routingblocks::Solution::feasible,
                                    "Whether the solution is "
                                    "feasible.")
-            .def("__copy__", [](const Solution& s) { return Solution(s); })
-            .def("copy", [](const Solution& s) { return Solution(s); })
+            .def_property_readonly("fingerprint", &routingblocks::Solution::fingerprint,
+                                   "64 bit hash of the routes of the solution.")
+            .def("__copy__", [](const Solution& s) { return _copy_solution(s); })
+            .def("copy", [](const Solution& s) { return _copy_solution(s); })
             .def("__deepcopy__",
-                 [](const Solution& s, const pybind11::dict&) -> Solution { return Solution(s); })
+                 [](const Solution& s, const pybind11::dict&) { return _copy_solution(s); })
             .def(
                 "__iter__",
                 [](const Solution& solution) {
@@ -315,6 +335,11 @@ namespace routingblocks::bindings {
                 "location.")
             .def("find", &routingblocks::Solution::find,
                  "Finds locations where the given vertex occurs in the solution.")
+            .def_property_readonly("unassigned_vertices",
+                                   &routingblocks::Solution::unassigned_vertices,
+                                   "The customers that are not visited by any route.")
+            .def("is_unassigned", &routingblocks::Solution::is_unassigned,
+                 "Whether the given customer is not visited by any route.")
             .def(
                 "exchange_segment",
                 [](Solution& solution, std::variant<Route*, size_t> route_or_index,
@@ -329,6 +354,7 @@ namespace routingblocks::bindings {
                     auto end = std::next(route_iter->begin(), end_pos);
                     auto other_begin = std::next(other_route_iter->begin(), other_begin_pos);
                     auto other_end = std::next(other_route_iter->begin(), other_end_pos);
+                    release_gil_for release(solution.evaluation());
                     solution.exchange_segment(route_iter, begin, end, other_route_iter, other_begin,
                                               other_end);
                 },
@@ -336,6 +362,7 @@ namespace routingblocks::bindings {
             .def(
                 "insert_vertex_after",
                 [](Solution& solution, NodeLocation& location, VertexID vertex) {
+                    release_gil_for release(solution.evaluation());
                     auto route = std::next(solution.begin(), location.route);
                     auto inserted_pos = solution.insert_vertex_after(
                         route, std::next(route->begin(), location.position), vertex);
@@ -351,6 +378,7 @@ namespace routingblocks::bindings {
                              vertex_id_and_location.cast<std::pair<VertexID, NodeLocation>>());
                      }
 
+                     release_gil_for release(sol.evaluation());
                      sol.insert_vertices_after(vertex_ids_and_locations.begin(),
                                                vertex_ids_and_locations.end());
                  })
@@ -358,12 +386,14 @@ namespace routingblocks::bindings {
                 "remove_vertex",
                 [](Solution& solution, const NodeLocation& location) {
                     auto [route, pos] = to_iter(location, solution);
+                    release_gil_for release(solution.evaluation());
                     solution.remove_vertex(route, pos);
                 },
                 "Removes the vertex at the given position in the given route.")
             .def(
                 "remove_vertices",
                 [](Solution& sol, const std::vector<NodeLocation>& vertices) {
+                    release_gil_for release(sol.evaluation());
                     sol.remove_vertices(vertices.begin(), vertices.end());
                 },
                 "Removes the given vertices from the route.")
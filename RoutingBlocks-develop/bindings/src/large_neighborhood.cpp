@@ -17,15 +17,21 @@
 // IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 // CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+#include <pybind11/functional.h>
 #include <pybind11/stl.h>
 #include <routingblocks/Instance.h>
 #include <routingblocks/lns_operators.h>
 #include <routingblocks/operators.h>
+#include <routingblocks_bindings/Evaluation.h>
 #include <routingblocks_bindings/large_neighborhood.h>
 
 #include <routingblocks/adaptive_large_neighborhood.hpp>
 #include <routingblocks_bindings/binding_helpers.hpp>
 
+#include <algorithm>
+#include <functional>
+#include <memory>
+
 /*
  * Couple the lifetime of objects created in python to the shared_ptr lifetime in c++.
  */
@@ -97,21 +103,161 @@ namespace routingblocks::bindings {
                  "False otherwise.");
     }
 
+    /*
+     * Binds the apply method of a native destroy or repair operator. Releases the GIL unless the
+     * evaluation is implemented in python.
+     */
+    template <class Operator, class Arg>
+    auto apply_without_gil(Operator& op, Evaluation& evaluation, Solution& solution, Arg arg) {
+        release_gil_for release(&evaluation);
+        return op.apply(evaluation, solution, arg);
+    }
+
     auto bind_random_destory_operator(pybind11::module_& m, auto& interface) {
         using _operator = routingblocks::lns::operators::RandomRemoval;
         return pybind11::class_<_operator>(m, "_RandomRemovalOperator", interface)
             .def(pybind11::init<routingblocks::utility::random&>())
-            .def("apply", &_operator::apply, "Remove random vertices from the solution.")
+            .def("apply", &apply_without_gil<_operator, size_t>,
+                 "Remove random vertices from the solution.")
             .def("name", &_operator::name)
             .def("can_apply_to", &_operator::can_apply_to,
                  "Returns true. Random remove is always possible.");
     }
 
+    /*
+     * Read-only view of the candidates passed to python selectors. The view does not own the
+     * candidates and is only valid during the selector call, afterwards every access raises.
+     * Elements are returned as copies, so selectors may keep them beyond the call.
+     */
+    template <class T> class sequence_view {
+        const std::vector<T>* _elements;
+
+      public:
+        explicit sequence_view(const std::vector<T>& elements) : _elements(&elements) {}
+
+        void invalidate() { _elements = nullptr; }
+
+        [[nodiscard]] const std::vector<T>& elements() const {
+            if (_elements == nullptr) {
+                throw std::runtime_error(
+                    "The sequence passed to a selector is only valid during the selector call");
+            }
+            return *_elements;
+        }
+
+        [[nodiscard]] T at(pybind11::ssize_t index) const {
+            const auto& elements = this->elements();
+            auto size = static_cast<pybind11::ssize_t>(elements.size());
+            if (index < 0) index += size;
+            if (index < 0 || index >= size) throw pybind11::index_error();
+            return elements[index];
+        }
+    };
+
+    template <class T> void bind_sequence_view(pybind11::module_& m, const char* name) {
+        using sequence_t = sequence_view<T>;
+        // No __iter__: python iterates through __getitem__, which checks the view on every access
+        pybind11::class_<sequence_t>(m, name)
+            .def("__len__", [](const sequence_t& sequence) { return sequence.elements().size(); })
+            .def("__getitem__", &sequence_t::at);
+    }
+
+    /*
+     * Wraps a python selector, i.e., a callable that picks an element of the passed sequence,
+     * into a native selector that returns the index of the picked element.
+     */
+    template <class T> auto wrap_python_selector(pybind11::function selector) {
+        return [selector = std::move(selector)](const std::vector<T>& elements) -> size_t {
+            pybind11::gil_scoped_acquire gil;
+            auto view = pybind11::cast(sequence_view<T>(elements));
+            // Invalidate the view once the call returns or throws, selectors may keep it
+            struct invalidate_on_exit {
+                sequence_view<T>& view;
+                ~invalidate_on_exit() { view.invalidate(); }
+            } invalidate{view.template cast<sequence_view<T>&>()};
+            const T selected_element = selector(view).template cast<T>();
+            // Selectors usually pick one of the first elements, so the search is short
+            auto iter = std::find(elements.begin(), elements.end(), selected_element);
+            if (iter == elements.end()) {
+                throw std::invalid_argument(
+                    "Selector returned an element that is not part of the passed sequence");
+            }
+            return static_cast<size_t>(std::distance(elements.begin(), iter));
+        };
+    }
+
+    void bind_related_removal_operator(pybind11::module_& m, auto& interface) {
+        using _operator = routingblocks::lns::operators::RelatedRemoval;
+        using _move = routingblocks::lns::operators::related_vertex_removal_move;
+
+        pybind11::class_<_move>(m, "_RelatedVertexRemovalMove")
+            .def(pybind11::init([](routingblocks::VertexID vertex_id, double relatedness,
+                                   routingblocks::NodeLocation location) {
+                     return _move{vertex_id, relatedness, location};
+                 }),
+                 pybind11::arg("vertex_id"), pybind11::arg("relatedness"),
+                 pybind11::arg("location"))
+            .def_readonly("vertex_id", &_move::vertex_id, "The id of the corresponding vertex.")
+            .def_readonly("relatedness", &_move::relatedness,
+                          "The relatedness of the vertex to the seed vertex.")
+            .def_readonly("location", &_move::location,
+                          "The location of the vertex in the solution.")
+            .def("__eq__",
+                 [](const _move& move, pybind11::object other) {
+                     if (!pybind11::hasattr(other, "vertex_id")
+                         || !pybind11::hasattr(other, "location")) {
+                         return false;
+                     }
+                     auto location = other.attr("location");
+                     return move.vertex_id == other.attr("vertex_id").cast<VertexID>()
+                            && move.location.route == location.attr("route").cast<size_t>()
+                            && move.location.position
+                                   == location.attr("position").cast<size_t>();
+                 })
+            .def("__hash__",
+                 [](const _move& move) {
+                     return pybind11::hash(pybind11::make_tuple(
+                         move.vertex_id, move.location.route, move.location.position));
+                 })
+            .def("__repr__", [](const _move& move) {
+                return "RelatedVertexRemovalMove(vertex_id=" + std::to_string(move.vertex_id)
+                       + ", relatedness=" + std::to_string(move.relatedness) + ", location=("
+                       + std::to_string(move.location.route) + ", "
+                       + std::to_string(move.location.position) + "))";
+            });
+        bind_sequence_view<_move>(m, "_RelatedVertexRemovalMoveSequence");
+        bind_sequence_view<routingblocks::NodeLocation>(m, "_NodeLocationSequence");
+
+        pybind11::class_<_operator>(m, "_RelatedRemovalOperator", interface)
+            .def(pybind11::init([](const std::vector<std::vector<routingblocks::VertexID>>& neighbors,
+                                   const std::vector<std::vector<double>>& relatedness,
+                                   pybind11::function move_selector,
+                                   pybind11::function seed_selector,
+                                   pybind11::function initial_seed_selector,
+                                   size_t cluster_size) {
+                     return std::make_unique<_operator>(
+                         neighbors, relatedness,
+                         wrap_python_selector<_move>(std::move(move_selector)),
+                         wrap_python_selector<_move>(std::move(seed_selector)),
+                         wrap_python_selector<routingblocks::NodeLocation>(
+                             std::move(initial_seed_selector)),
+                         cluster_size);
+                 }),
+                 pybind11::arg("neighbors"), pybind11::arg("relatedness"),
+                 pybind11::arg("move_selector"), pybind11::arg("seed_selector"),
+                 pybind11::arg("initial_seed_selector"), pybind11::arg("cluster_size") = 1)
+            .def("apply", &apply_without_gil<_operator, size_t>,
+                 "Remove related vertices from the solution.")
+            .def("name", &_operator::name)
+            .def("can_apply_to", &_operator::can_apply_to,
+                 "Returns true if the solution has at least one route.");
+    }
+
     void bind_random_insertion_operator(pybind11::module_& m, auto& interface) {
         using _operator = routingblocks::lns::operators::RandomInsertion;
         pybind11::class_<_operator>(m, "_RandomInsertionOperator", interface)
             .def(pybind11::init<routingblocks::utility::random&>())
-            .def("apply", &_operator ::apply,
+            .def("apply", &apply_without_gil<_operator, const std::vector<routingblocks::VertexID>&>,
                  "Inserts the passed vertices in order at random locations.")
             .def("name", &_operator ::name)
             .def("can_apply_to", &_operator ::can_apply_to,
@@ -122,13 +268,53 @@ namespace routingblocks::bindings {
         using lns_t = routingblocks::adaptive_large_neighborhood;
         using destroy_operator_t = lns_t::destroy_operator_type;
         using repair_operator_t = lns_t::repair_operator_type;
+
+        pybind11::class_<routingblocks::lns_iteration>(m, "LNSIteration")
+            .def_readonly("iteration", &routingblocks::lns_iteration::iteration)
+            .def_readonly("destroy_operator", &routingblocks::lns_iteration::destroy_op)
+            .def_readonly("repair_operator", &routingblocks::lns_iteration::repair_op)
+            .def_readonly("cost", &routingblocks::lns_iteration::cost,
+                          "Cost of the solution generated in this iteration.")
+            .def_readonly("accepted", &routingblocks::lns_iteration::accepted,
+                          "True if the generated solution replaced the current solution.")
+            .def_readonly("fingerprint", &routingblocks::lns_iteration::fingerprint,
+                          "Fingerprint of the solution generated in this iteration.");
+
         pybind11::class_<routingblocks::adaptive_large_neighborhood>(m, "AdaptiveLargeNeighborhood")
             .def(pybind11::init<routingblocks::utility::random, double>())
+            .def(
+                "run",
+                [](lns_t& lns, Evaluation& evaluation, const Solution& initial_solution,
+                   size_t num_iterations, size_t num_removed_customers, size_t adaptation_period,
+                   std::optional<double> time_limit,
+                   const std::function<void(const Solution&)>& on_improvement) {
+                    // Operators and callbacks implemented in python re-acquire the GIL when
+                    // invoked.
+                    auto result = [&] {
+                        release_gil_for release(&evaluation);
+                        return lns.run(
+                            evaluation, initial_solution, num_iterations, num_removed_customers,
+                            adaptation_period,
+                            time_limit.value_or(std::numeric_limits<double>::infinity()),
+                            on_improvement);
+                    }();
+                    return std::make_pair(std::move(result.best_solution),
+                                          std::move(result.iterations));
+                },
+                pybind11::arg("evaluation"), pybind11::arg("initial_solution"),
+                pybind11::arg("num_iterations"), pybind11::arg("num_removed_customers"),
+                pybind11::arg("adaptation_period") = 0, pybind11::arg("time_limit") = pybind11::none(),
+                pybind11::arg("on_improvement") = pybind11::none(),
+                "Runs the given number of destroy/repair iterations without returning to python. "
+                "Returns the best solution found and a list of per-iteration statistics.")
             .def(
                 "generate",
                 [](lns_t& lns, Evaluation& evaluation, Solution& sol,
                    size_t num_removed_customers) {
-                    auto operator_pick = lns.generate(evaluation, sol, num_removed_customers);
+                    auto operator_pick = [&] {
+                        release_gil_for release(&evaluation);
+                        return lns.generate(evaluation, sol, num_removed_customers);
+                    }();
                     return std::make_pair(*operator_pick.first, *operator_pick.second);
                 },
                 "Generates a solution from the neighborhood of the passed solution using the "
@@ -178,6 +364,50 @@ namespace routingblocks::bindings {
                     return pybind11::make_iterator(routingblocks.repair_operators_begin(),
                                                    routingblocks.repair_operators_end());
                 })
+            .def(
+                "set_destroy_operator_weight",
+                [](lns_t& lns, const destroy_operator_t& destroy_operator, double weight) {
+                    auto iter = std::find(lns.destroy_operators_begin(),
+                                          lns.destroy_operators_end(), destroy_operator);
+                    if (iter == lns.destroy_operators_end()) {
+                        throw std::invalid_argument("Destroy operator is not registered");
+                    }
+                    lns.set_operator_weight(iter, weight);
+                },
+                "Sets the selection weight of the referenced destroy operator.")
+            .def(
+                "set_repair_operator_weight",
+                [](lns_t& lns, const repair_operator_t& repair_operator, double weight) {
+                    auto iter = std::find(lns.repair_operators_begin(), lns.repair_operators_end(),
+                                          repair_operator);
+                    if (iter == lns.repair_operators_end()) {
+                        throw std::invalid_argument("Repair operator is not registered");
+                    }
+                    lns.set_operator_weight(iter, weight);
+                },
+                "Sets the selection weight of the referenced repair operator.")
+            .def(
+                "get_destroy_operator_weight",
+                [](const lns_t& lns, const destroy_operator_t& destroy_operator) {
+                    auto iter = std::find(lns.destroy_operators_begin(),
+                                          lns.destroy_operators_end(), destroy_operator);
+                    if (iter == lns.destroy_operators_end()) {
+                        throw std::invalid_argument("Destroy operator is not registered");
+                    }
+                    return lns.operator_weight(iter);
+                },
+                "Returns the current selection weight of the referenced destroy operator.")
+            .def(
+                "get_repair_operator_weight",
+                [](const lns_t& lns, const repair_operator_t& repair_operator) {
+                    auto iter = std::find(lns.repair_operators_begin(), lns.repair_operators_end(),
+                                          repair_operator);
+                    if (iter == lns.repair_operators_end()) {
+                        throw std::invalid_argument("Repair operator is not registered");
+                    }
+                    return lns.operator_weight(iter);
+                },
+                "Returns the current selection weight of the referenced repair operator.")
             .def("reset_operator_weights",
                  &routingblocks::adaptive_large_neighborhood::reset_operator_weights,
                  "Sets the weights of all operators to 1 and resets collected scores.")
@@ -204,6 +434,7 @@ namespace routingblocks::bindings {
 
         bind_random_insertion_operator(m, repair_operator_interface);
         bind_random_destory_operator(m, destroy_operator_interface);
+        bind_related_removal_operator(m, destroy_operator_interface);
     }
 
 }  // namespace routingblocks::bindings
@@ -22,11 +22,91 @@
 #include <routingblocks/lns_operators.h>
 #include <routingblocks/removal_cache.h>
 #include <routingblocks/utility/random.h>
+#include <routingblocks_bindings/Evaluation.h>
 #include <routingblocks_bindings/utility.h>
 
 namespace routingblocks::bindings {
+    /*
+     * Lazy, read-only view of moves stored in a cache. The view reads the cache on every access,
+     * so it reflects later changes of the cache. Elements are returned as copies.
+     */
+    template <class Cache, class Range> class move_sequence {
+        const Cache* _cache;
+        Range _range;
+
+      public:
+        using move_t = typename Cache::move_t;
+
+        move_sequence(const Cache& cache, Range range) : _cache(&cache), _range(std::move(range)) {}
+
+        [[nodiscard]] auto begin() const { return _range(*_cache).first; }
+        [[nodiscard]] auto end() const { return _range(*_cache).second; }
+        [[nodiscard]] size_t size() const { return _range.size(*_cache); }
+
+        // Constant time for random access ranges, walks the range otherwise
+        [[nodiscard]] move_t at(pybind11::ssize_t index) const {
+            auto number_of_moves = static_cast<pybind11::ssize_t>(size());
+            if (index < 0) index += number_of_moves;
+            if (index < 0 || index >= number_of_moves) throw pybind11::index_error();
+            return *std::next(begin(), index);
+        }
+
+        [[nodiscard]] std::vector<move_t> top(size_t k) const {
+            std::vector<move_t> moves;
+            moves.reserve(std::min(k, size()));
+            for (auto iter = begin(), last = end(); moves.size() < k && iter != last; ++iter) {
+                moves.push_back(*iter);
+            }
+            return moves;
+        }
+    };
+
+    template <class Sequence> void bind_move_sequence(pybind11::module_& m, const char* name) {
+        pybind11::class_<Sequence>(m, name)
+            .def("__len__", &Sequence::size)
+            .def("__getitem__", &Sequence::at)
+            .def(
+                "__iter__",
+                [](const Sequence& sequence) {
+                    return pybind11::make_iterator<pybind11::return_value_policy::copy>(
+                        sequence.begin(), sequence.end());
+                },
+                pybind11::keep_alive<0, 1>())
+            .def("top", &Sequence::top, pybind11::arg("k"),
+                 "Returns the first k moves, or all moves if there are fewer than k.");
+    }
+
+    template <class Cache> struct all_moves_in_order {
+        auto operator()(const Cache& cache) const {
+            return std::make_pair(cache.begin(), cache.end());
+        }
+        size_t size(const Cache& cache) const { return cache.size(); }
+    };
+
+    // Merges the per-vertex insertion caches by a linear scan, see linear_joint_sorted_iterator
+    template <class Cache> struct all_moves_by_linear_scan {
+        auto operator()(const Cache& cache) const {
+            return std::make_pair(cache.linear_begin(), cache.linear_end());
+        }
+        size_t size(const Cache& cache) const { return cache.size(); }
+    };
+
+    template <class Cache> struct best_insertions_of_vertex {
+        VertexID vertex_id;
+
+        auto operator()(const Cache& cache) const {
+            return std::make_pair(cache.best_insertions_for_vertex_begin(vertex_id),
+                                  cache.best_insertions_for_vertex_end(vertex_id));
+        }
+        size_t size(const Cache& cache) const {
+            return std::distance(cache.best_insertions_for_vertex_begin(vertex_id),
+                                 cache.best_insertions_for_vertex_end(vertex_id));
+        }
+    };
+
     void bind_removal_cache(pybind11::module_& m) {
         using cache_t = routingblocks::utility::removal_cache<>;
+        using moves_in_order_t = move_sequence<cache_t, all_moves_in_order<cache_t>>;
 
         pybind11::class_<cache_t::move_t>(m, "RemovalMove")
             .def(pybind11::init<VertexID, NodeLocation, resource_t>())
@@ -37,24 +117,55 @@ namespace routingblocks::bindings {
             .def("__eq__",
                  [](const cache_t::move_t& lhs, const cache_t::move_t& rhs) { return lhs == rhs; });
 
+        bind_move_sequence<moves_in_order_t>(m, "_RemovalMoveSequence");
+
         pybind11::class_<cache_t>(m, "RemovalCache")
             .def(pybind11::init<const Instance&>(), pybind11::keep_alive<1, 2>())
             .def("clear", &cache_t::clear, "Resets the cache.")
-            .def("rebuild", &cache_t::rebuild, "Rebuilds the cache from the given solution.")
-            .def("invalidate_route", &cache_t::invalidate_route,
-                 "Removes any moves that were on the passed route and adds moves according to the "
-                 "new route.")
+            .def(
+                "rebuild",
+                [](cache_t& cache, Evaluation& evaluation, const Solution& solution) {
+                    release_gil_for release(&evaluation);
+                    cache.rebuild(evaluation, solution, is_native_evaluation(evaluation));
+                },
+                "Rebuilds the cache from the given solution.")
+            .def(
+                "update",
+                [](cache_t& cache, Evaluation& evaluation, const Solution& solution) {
+                    release_gil_for release(&evaluation);
+                    cache.update(evaluation, solution, is_native_evaluation(evaluation));
+                },
+                "Updates the cache to the given solution, re-evaluating only routes that changed "
+                "since the cache was last built. Call rebuild instead after changing parameters of "
+                "the evaluation.")
+            .def(
+                "invalidate_route",
+                [](cache_t& cache, const Route& route, size_t route_index) {
+                    release_gil_for release(cache.evaluation());
+                    cache.invalidate_route(route, route_index);
+                },
+                "Removes any moves that were on the passed route and adds moves according to the "
+                "new route.")
+            .def_property("number_of_threads", &cache_t::number_of_threads,
+                          &cache_t::set_number_of_threads,
+                          "Number of threads used to evaluate the moves of different routes. "
+                          "Evaluations implemented in Python are always called from one thread.")
             .def_property_readonly(
                 "moves_in_order",
-                [](const cache_t& cache) {
-                    return std::vector<cache_t::move_t>(cache.begin(), cache.end());
-                },
-                "Returns the list of moves in the cache ordered by their cost delta in "
-                "increasing order.");
+                pybind11::cpp_function(
+                    [](const cache_t& cache) {
+                        return moves_in_order_t(cache, all_moves_in_order<cache_t>{});
+                    },
+                    pybind11::keep_alive<0, 1>()),
+                "Returns a lazy sequence of the moves in the cache ordered by their cost delta in "
+                "increasing order. Supports indexing in constant time.");
     }
 
     void bind_insertion_cache(pybind11::module_& m) {
         using cache_t = routingblocks::utility::insertion_cache<>;
+        using moves_in_order_t = move_sequence<cache_t, all_moves_in_order<cache_t>>;
+        using linear_moves_in_order_t = move_sequence<cache_t, all_moves_by_linear_scan<cache_t>>;
+        using vertex_moves_t = move_sequence<cache_t, best_insertions_of_vertex<cache_t>>;
 
         pybind11::class_<cache_t::move_t>(m, "InsertionMove")
             .def(pybind11::init<VertexID, NodeLocation, resource_t>())
@@ -65,30 +176,50 @@ namespace routingblocks::bindings {
             .def("__eq__",
                  [](const cache_t::move_t& lhs, const cache_t::move_t& rhs) { return lhs == rhs; });
 
+        bind_move_sequence<moves_in_order_t>(m, "_InsertionMoveSequence");
+        bind_move_sequence<linear_moves_in_order_t>(m, "_LinearInsertionMoveSequence");
+        bind_move_sequence<vertex_moves_t>(m, "_VertexInsertionMoveSequence");
+
         pybind11::class_<cache_t>(m, "InsertionCache")
             .def(pybind11::init<const Instance&>(), pybind11::keep_alive<1, 2>())
+            .def(pybind11::init<const Instance&, const routingblocks::utility::arc_set*>(),
+                 pybind11::arg("instance"), pybind11::arg("arc_set"),
+                 pybind11::keep_alive<1, 2>(), pybind11::keep_alive<1, 3>(),
+                 "Creates a granular cache: a vertex is only inserted next to a vertex it shares "
+                 "an arc of arc_set with, or next to a depot. Passing None considers all "
+                 "insertion positions.")
             .def("clear", &cache_t::clear, "Resets the cache.")
             .def(
                 "rebuild",
                 [](cache_t& cache, Evaluation& evaluation, const Solution& solution,
                    const std::vector<VertexID>& tracked_vertices) {
+                    release_gil_for release(&evaluation);
                     cache.rebuild(evaluation, solution, tracked_vertices.begin(),
-                                  tracked_vertices.end());
+                                  tracked_vertices.end(), is_native_evaluation(evaluation));
                 },
                 "Rebuilds the cache from the given solution, tracking insertions of the passed "
                 "vertex ids.")
-            .def("invalidate_route", &cache_t::invalidate_route,
-                 "Removes any moves that were on the passed route and adds moves according to the "
-                 "new route.")
+            .def(
+                "invalidate_route",
+                [](cache_t& cache, const Route& route, size_t route_index) {
+                    release_gil_for release(cache.evaluation());
+                    cache.invalidate_route(route, route_index);
+                },
+                "Removes any moves that were on the passed route and adds moves according to the "
+                "new route.")
+            .def_property("number_of_threads", &cache_t::number_of_threads,
+                          &cache_t::set_number_of_threads,
+                          "Number of threads used to build and update the insertions of different "
+                          "vertices. Evaluations implemented in Python are always called from one "
+                          "thread.")
             .def(
                 "get_best_insertions_for_vertex",
                 [](const cache_t& cache, VertexID vertex_id) {
-                    return std::vector<cache_t::move_t>(
-                        cache.best_insertions_for_vertex_begin(vertex_id),
-                        cache.best_insertions_for_vertex_end(vertex_id));
+                    return vertex_moves_t(cache, best_insertions_of_vertex<cache_t>{vertex_id});
                 },
-                "Returns the list of insertions of the corresponding vertex ordered by their cost "
-                "delta in increasing order.")
+                "Returns a lazy sequence of the insertions of the corresponding vertex ordered by "
+                "their cost delta in increasing order. Supports indexing in constant time.",
+                pybind11::keep_alive<0, 1>())
             .def("stop_tracking", &cache_t::stop_tracking,
                  "Stops tracking insertions of the passed vertex id.")
             .def("tracks_vertex", &cache_t::tracks,
@@ -102,11 +233,23 @@ namespace routingblocks::bindings {
                 "Returns the list of vertex ids that are currently tracked.")
             .def_property_readonly(
                 "moves_in_order",
-                [](const cache_t& cache) {
-                    return std::vector<cache_t::move_t>(cache.begin(), cache.end());
-                },
-                "Returns the list of moves in the cache ordered by their cost delta in "
-                "increasing order.");
+                pybind11::cpp_function(
+                    [](const cache_t& cache) {
+                        return moves_in_order_t(cache, all_moves_in_order<cache_t>{});
+                    },
+                    pybind11::keep_alive<0, 1>()),
+                "Returns a lazy sequence of the moves in the cache ordered by their cost delta in "
+                "increasing order. Moves are merged from the per-vertex caches while iterating, "
+                "so indexing walks the sequence.")
+            .def_property_readonly(
+                "_moves_in_order_linear_scan",
+                pybind11::cpp_function(
+                    [](const cache_t& cache) {
+                        return linear_moves_in_order_t(cache, all_moves_by_linear_scan<cache_t>{});
+                    },
+                    pybind11::keep_alive<0, 1>()),
+                "Same sequence as moves_in_order, merged by a linear scan over the per-vertex "
+                "caches instead of a heap. Only meant for testing and benchmarking.");
     }
 
     void bind_random(pybind11::module_& m) {
@@ -125,7 +268,11 @@ namespace routingblocks::bindings {
                 [](routingblocks::utility::random& r, double min, double max) {
                     return r.uniform(min, max);
                 },
-                "Generates a random float between min and max");
+                "Generates a random float between min and max")
+            .def("get_state", &routingblocks::utility::random::state,
+                 "Returns the state of the generator as four 64 bit integers.")
+            .def("set_state", &routingblocks::utility::random::set_state, pybind11::arg("state"),
+                 "Restores a state returned by get_state.");
     }
 
     void bind_algorithms(pybind11::module_& m) {
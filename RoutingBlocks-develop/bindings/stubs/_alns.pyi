@@ -75,6 +75,42 @@ class DestroyOperator:
         ...
 
 
+class LNSIteration:
+    """
+    Statistics of a single iteration of :meth:`AdaptiveLargeNeighborhood.run`.
+    """
+
+    @property
+    def iteration(self) -> int: ...
+
+    @property
+    def destroy_operator(self) -> DestroyOperator: ...
+
+    @property
+    def repair_operator(self) -> RepairOperator: ...
+
+    @property
+    def cost(self) -> float:
+        """
+        Cost of the solution generated in this iteration.
+        """
+        ...
+
+    @property
+    def accepted(self) -> bool:
+        """
+        True if the generated solution replaced the current solution.
+        """
+        ...
+
+    @property
+    def fingerprint(self) -> int:
+        """
+        :attr:`Solution.fingerprint` of the solution generated in this iteration.
+        """
+        ...
+
+
 class AdaptiveLargeNeighborhood:
     """
     ALNS solver.
@@ -92,6 +128,9 @@ class AdaptiveLargeNeighborhood:
     * :math:`s_{op}` is the sum of scores achieved by operator :math:`op` in the last period
     * :math:`n_{op}` is the total number of solutions generated using operator :math:`op` in the last period
     * :math:`w_{op, old}` is the old weight of operator :math:`op`
+
+    Operators are sampled in :math:`O(\\log n)`, so large numbers of operators, e.g., parameterised variants of the
+    same operator, can be registered.
     """
 
     def __init__(self, randgen: Random, smoothing_factor: float) -> None:
@@ -150,6 +189,60 @@ class AdaptiveLargeNeighborhood:
         """
         ...
 
+    def run(self, evaluation: Evaluation, initial_solution: Solution, num_iterations: int,
+            num_removed_customers: int, adaptation_period: int = 0, time_limit: Optional[float] = None,
+            on_improvement: Optional[Callable[[Solution], None]] = None) -> Tuple[Solution, List[LNSIteration]]:
+        """
+        Run ``num_iterations`` destroy/repair iterations in native code with the GIL released. A generated solution
+        is accepted if it is cheaper than the current solution. Accepted solutions score 1, rejected ones 0.
+        The initial solution is not modified.
+
+        :param evaluation: The evaluation function to use.
+        :param initial_solution: The solution to start from.
+        :param num_iterations: The number of iterations to run.
+        :param num_removed_customers: The number of vertices to remove in each iteration.
+        :param adaptation_period: Adapt the operator weights every ``adaptation_period`` iterations. 0 disables
+            adaptation.
+        :param time_limit: Stop once this many seconds have passed. No limit if None.
+        :param on_improvement: Called with a copy of every accepted solution. Re-acquires the GIL.
+        :return: A tuple containing the best solution found and the statistics of each iteration.
+        """
+        ...
+
+    def set_destroy_operator_weight(self, destroy_operator: DestroyOperator, weight: float) -> None:
+        """
+        Set the weight of a registered destroy operator.
+
+        :param destroy_operator: The operator to reweigh.
+        :param weight: The new, non-negative weight.
+        """
+        ...
+
+    def set_repair_operator_weight(self, repair_operator: RepairOperator, weight: float) -> None:
+        """
+        Set the weight of a registered repair operator.
+
+        :param repair_operator: The operator to reweigh.
+        :param weight: The new, non-negative weight.
+        """
+        ...
+
+    def get_destroy_operator_weight(self, destroy_operator: DestroyOperator) -> float:
+        """
+        Get the current selection weight of a registered destroy operator.
+
+        :param destroy_operator: The operator.
+        """
+        ...
+
+    def get_repair_operator_weight(self, repair_operator: RepairOperator) -> float:
+        """
+        Get the current selection weight of a registered repair operator.
+
+        :param repair_operator: The operator.
+        """
+        ...
+
     def remove_destroy_operator(self, destroy_operator: DestroyOperator) -> None:
         """
         Remove a destroy operator.
@@ -17,6 +17,9 @@
 # IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+from typing import Callable, Sequence
+
+
 class _RandomRemovalOperator(DestroyOperator):
     """
     Removes random vertices from the solution. Note that the same vertex may apppear several times, i.e., if two
@@ -38,3 +41,65 @@ class _RandomInsertionOperator(RepairOperator):
         """
         :param random: The :py:class:`routingblocks.Random` instance to use.
         """
+
+
+class _RelatedVertexRemovalMove:
+    """
+    A vertex that :py:class:`routingblocks.operators.RelatedRemovalOperator` may remove.
+
+    :ivar vertex_id: The id of the corresponding vertex.
+    :ivar relatedness: The relatedness of the vertex to the seed vertex.
+    :ivar location: The location of the vertex in the solution.
+    """
+    vertex_id: VertexID
+    relatedness: float
+    location: NodeLocation
+
+    def __init__(self, vertex_id: VertexID, relatedness: float, location: NodeLocation) -> None: ...
+
+    def __eq__(self, other: object) -> bool: ...
+
+    def __hash__(self) -> int: ...
+
+
+class _RelatedVertexRemovalMoveSequence(Sequence[_RelatedVertexRemovalMove]):
+    """
+    Read-only sequence of moves passed to the move and seed selectors of the related removal operator. Only valid
+    during the selector call, accessing it afterwards raises a :py:class:`RuntimeError`.
+    """
+
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, index: int) -> _RelatedVertexRemovalMove: ...
+
+
+class _NodeLocationSequence(Sequence[NodeLocation]):
+    """
+    Read-only sequence of node locations passed to the initial seed selector of the related removal operator. Only
+    valid during the selector call, accessing it afterwards raises a :py:class:`RuntimeError`.
+    """
+
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, index: int) -> NodeLocation: ...
+
+
+class _RelatedRemovalOperator(DestroyOperator):
+    """
+    Native implementation of :py:class:`routingblocks.operators.RelatedRemovalOperator`. Neighbors are sorted by
+    relatedness once on construction.
+    """
+
+    def __init__(self, neighbors: Sequence[Sequence[VertexID]], relatedness: Sequence[Sequence[float]],
+                 move_selector: Callable[[_RelatedVertexRemovalMoveSequence], _RelatedVertexRemovalMove],
+                 seed_selector: Callable[[_RelatedVertexRemovalMoveSequence], _RelatedVertexRemovalMove],
+                 initial_seed_selector: Callable[[_NodeLocationSequence], NodeLocation],
+                 cluster_size: int = 1) -> None:
+        """
+        :param neighbors: ``neighbors[i]`` lists the vertices related to vertex ``i``. Missing vertices are least related.
+        :param relatedness: ``relatedness[i][j]`` is the relatedness of ``neighbors[i][j]`` to vertex ``i``.
+        :param move_selector: Selects the next vertex to remove from the candidates of a seed.
+        :param seed_selector: Selects the next seed from the vertices removed so far.
+        :param initial_seed_selector: Selects the initial seed from the non-depot nodes of the solution.
+        :param cluster_size: The number of vertices removed per seed.
+        """
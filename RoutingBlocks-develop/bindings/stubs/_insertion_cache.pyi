@@ -17,6 +17,9 @@
 # IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+from typing import List, Optional, Sequence
+
+
 class InsertionMove:
     vertex_id: VertexID
     after_node: NodeLocation
@@ -33,12 +36,60 @@ class InsertionMove:
     def __eq__(self, other: InsertionMove) -> bool: ...
 
 
+class _InsertionMoveSequence(Sequence[InsertionMove]):
+    """
+    Lazy, read-only view of all moves in an :py:class:`InsertionCache`. Moves are merged from the per-vertex caches
+    while iterating, so indexing walks the sequence. Prefer iteration or :py:meth:`top`.
+    """
+
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, index: int) -> InsertionMove: ...
+
+    def top(self, k: int) -> List[InsertionMove]:
+        """
+        :param k: The number of moves to return.
+        :return: The first ``k`` moves, or all moves if there are fewer than ``k``.
+        """
+        ...
+
+
+class _VertexInsertionMoveSequence(Sequence[InsertionMove]):
+    """
+    Lazy, read-only view of the insertions of a single vertex in an :py:class:`InsertionCache`. Indexing takes
+    constant time.
+    """
+
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, index: int) -> InsertionMove: ...
+
+    def top(self, k: int) -> List[InsertionMove]:
+        """
+        :param k: The number of moves to return.
+        :return: The first ``k`` moves, or all moves if there are fewer than ``k``.
+        """
+        ...
+
+
 class InsertionCache:
-    def __init__(self, instance: Instance) -> None: ...
+    def __init__(self, instance: Instance, arc_set: Optional[ArcSet] = None) -> None:
+        """
+        :param instance: The problem instance.
+        :param arc_set: Restricts the cache to granular insertion positions: a vertex is only inserted between two
+            nodes if the arc from the predecessor to the vertex or from the vertex to the successor is in the set.
+            Positions next to a depot are always considered. If ``None``, all positions are considered.
+        """
+        ...
 
     def clear(self) -> None: ...
 
-    def get_best_insertions_for_vertex(self, vertex_id: VertexID) -> List[InsertionMove]: ...
+    def get_best_insertions_for_vertex(self, vertex_id: VertexID) -> _VertexInsertionMoveSequence:
+        """
+        :param vertex_id: The id of a tracked vertex.
+        :return: The insertions of the vertex ordered by their cost delta in increasing order.
+        """
+        ...
 
     def invalidate_route(self, route: Route, route_index: int) -> None: ...
 
@@ -49,7 +100,31 @@ class InsertionCache:
     def tracks_vertex(self, vertex_id: VertexID) -> bool: ...
 
     @property
-    def moves_in_order(self) -> List[InsertionMove]: ...
+    def moves_in_order(self) -> _InsertionMoveSequence:
+        """
+        The moves of all tracked vertices ordered by their cost delta in increasing order.
+        """
+        ...
+
+    @property
+    def _moves_in_order_linear_scan(self) -> Sequence[InsertionMove]:
+        """
+        Same moves as :attr:`moves_in_order`, merged by a linear scan over the per-vertex caches instead of a heap.
+        Only meant for testing and benchmarking.
+        """
+        ...
 
     @property
     def tracked_vertices(self) -> List[VertexID]: ...
+
+    @property
+    def number_of_threads(self) -> int:
+        """
+        The number of threads used to evaluate the insertions of different vertices in :meth:`rebuild` and
+        :meth:`invalidate_route`. The native part releases the GIL while evaluating. Evaluations implemented in Python
+        are always called from a single thread. Defaults to 1.
+        """
+        ...
+
+    @number_of_threads.setter
+    def number_of_threads(self, number_of_threads: int) -> None: ...
@@ -17,12 +17,24 @@
 # IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
-from typing import Optional
+from typing import Any, Optional
 
 
 class ArcSet:
     def __init__(self, number_of_vertices: int) -> None: ...
 
+    @staticmethod
+    def from_mask(mask: Any) -> ArcSet:
+        """
+        Creates an arc set from a boolean matrix, e.g., a numpy array of dtype bool. Arc (i, j) is included if and only
+        if ``mask[i, j]`` is true. Much faster than forbidding arcs one by one.
+
+        :param mask: A square boolean matrix with one row and column per vertex, given as any object supporting the
+            buffer protocol.
+        :return: The arc set.
+        """
+        ...
+
     def forbid_arc(self, origin_vertex_id: VertexID, target_vertex_id: VertexID) -> None: ...
 
     def include_arc(self, origin_vertex_id: VertexID, target_vertex_id: VertexID) -> None: ...
@@ -179,8 +191,22 @@ class FirstImprovementPivotingRule(PivotingRule):
 class LocalSearch:
     """
     This class implements a customizable local search algorithm.
+
+    The built-in generator arc operators (swap, inter-route 2-opt) keep don't-look bits during a search:
+    a vertex whose moves did not improve the solution is not looked at again until its route or the
+    target route changes. The improving moves between two routes are cached until one of them changes.
+
+    :var remember_local_optima: If set, the routes of every local optimum found are remembered. Later searches
+        with the same operators skip moves between routes that are unchanged since a common local optimum, so
+        searching a slightly perturbed local optimum costs time proportional to the perturbation. Only valid as
+        long as the evaluation and the arc sets of the operators do not change, see :meth:`forget_local_optima`.
+        Defaults to False.
+    :var number_of_remembered_optima: The number of local optima currently remembered (at most 64).
     """
 
+    remember_local_optima: bool
+    number_of_remembered_optima: int
+
     def __init__(self, instance: Instance, evaluation: Evaluation, exact_evaluation: Optional[Evaluation],
                  pivoting_rule: PivotingRule) -> None: ...
 
@@ -195,6 +221,13 @@ class LocalSearch:
         """
         ...
 
+    def forget_local_optima(self) -> None:
+        """
+        Forgets all remembered local optima. Call this after changing the evaluation (e.g., penalty factors) or the
+        arc sets of the operators.
+        """
+        ...
+
 
 class QuadraticNeighborhoodIterator:
 
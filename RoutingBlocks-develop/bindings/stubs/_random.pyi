@@ -17,6 +17,8 @@
 # IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+from typing import List, overload
+
 class Random:
     @overload
     def __init__(self) -> None:
@@ -59,3 +61,18 @@ class Random:
         :param float max: The upper bound of the range.
         :return: A random floating-point number within the specified range [min, max).
         """
+
+    def get_state(self) -> List[int]:
+        """
+        Returns the internal state of the generator. A generator restored to this state with
+        :meth:`set_state` produces the same sequence of numbers from there on.
+
+        :return: The state as four unsigned 64 bit integers.
+        """
+
+    def set_state(self, state: List[int]) -> None:
+        """
+        Restores a state returned by :meth:`get_state`.
+
+        :param List[int] state: The state as four unsigned 64 bit integers.
+        """
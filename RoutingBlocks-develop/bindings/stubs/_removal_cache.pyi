@@ -17,6 +17,9 @@
 # IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+from typing import List, Sequence
+
+
 class RemovalMove:
     vertex_id: VertexID
     node_location: NodeLocation
@@ -33,6 +36,24 @@ class RemovalMove:
     def __eq__(self, other: RemovalMove) -> bool: ...
 
 
+class _RemovalMoveSequence(Sequence[RemovalMove]):
+    """
+    Lazy, read-only view of the moves in a :py:class:`RemovalCache`. Reflects later changes of the cache. Indexing
+    takes constant time.
+    """
+
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, index: int) -> RemovalMove: ...
+
+    def top(self, k: int) -> List[RemovalMove]:
+        """
+        :param k: The number of moves to return.
+        :return: The first ``k`` moves, or all moves if there are fewer than ``k``.
+        """
+        ...
+
+
 class RemovalCache:
     def __init__(self, instance: Instance) -> None: ...
 
@@ -42,5 +63,33 @@ class RemovalCache:
 
     def rebuild(self, evaluation: Evaluation, solution: Solution) -> None: ...
 
+    def update(self, evaluation: Evaluation, solution: Solution) -> None:
+        """
+        Brings the cache in line with the given solution. Routes whose vertex sequence is unchanged since the cache
+        last saw them keep their moves; only the remaining routes are re-evaluated. Falls back to :meth:`rebuild` if
+        the cache was built with a different evaluation. Moves of unchanged routes keep their cost, so call
+        :meth:`rebuild` instead after changing parameters of the evaluation, e.g., penalty factors.
+
+        :param evaluation: The evaluation function to use.
+        :param solution: The solution to synchronize with.
+        """
+        ...
+
+    @property
+    def moves_in_order(self) -> _RemovalMoveSequence:
+        """
+        The moves in the cache ordered by their cost delta in increasing order. The sequence is evaluated lazily.
+        """
+        ...
+
     @property
-    def moves_in_order(self) -> List[RemovalMove]: ...
+    def number_of_threads(self) -> int:
+        """
+        The number of threads used to evaluate the moves of different routes in :meth:`rebuild` and :meth:`update`.
+        The native part releases the GIL while evaluating. Evaluations implemented in Python are always called from a
+        single thread. Defaults to 1.
+        """
+        ...
+
+    @number_of_threads.setter
+    def number_of_threads(self, number_of_threads: int) -> None: ...
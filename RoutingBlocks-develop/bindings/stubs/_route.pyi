@@ -119,6 +119,17 @@ class Route:
         """
         ...
 
+    @property
+    def fingerprint(self) -> int:
+        """
+        Retrieves a 64 bit hash of the arcs of the route. Equal routes have equal fingerprints, empty routes have a
+        fingerprint of 0. The fingerprint is kept up to date on every modification of the route.
+
+        :return: The fingerprint.
+        :rtype: int
+        """
+        ...
+
     def __iter__(self) -> Iterator:
         """
         Returns an iterator over the nodes in the route.
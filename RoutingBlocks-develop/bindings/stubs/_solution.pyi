@@ -293,6 +293,40 @@ class Solution:
         """
         ...
 
+    @property
+    def fingerprint(self) -> int:
+        """
+        Retrieves a 64 bit hash of the solution, combined from the fingerprints of its routes. It does not depend on
+        the order of the routes or on empty routes, so it identifies solutions that visit the same vertex sequences,
+        up to (unlikely) hash collisions. Runs in time linear in the number of routes.
+
+        :return: The fingerprint.
+        :rtype: int
+        """
+        ...
+
+    def is_unassigned(self, vertex_id: int) -> bool:
+        """
+        Checks whether a customer is not visited by any route. Runs in constant time.
+
+        :param int vertex_id: The ID of the customer to check.
+        :return: True if the customer is not part of the solution, False otherwise.
+        :rtype: bool
+        """
+        ...
+
+    @property
+    def unassigned_vertices(self) -> List[VertexID]:
+        """
+        Gets the IDs of all customers that are not visited by any route, in no particular order. The set is maintained
+        incrementally as the solution is modified, so destroy and repair operators can exchange removed customers
+        without scanning the solution.
+
+        :return: A list of customer IDs.
+        :rtype: List[VertexID]
+        """
+        ...
+
     @property
     def insertion_points(self) -> List[NodeLocation]:
         """
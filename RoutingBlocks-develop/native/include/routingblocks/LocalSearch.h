@@ -30,7 +30,12 @@ SOFTWARE.*/
 #include <routingblocks/utility/arc_set.h>
 #include <routingblocks/utility/random.h>
 
+#include <algorithm>
+#include <atomic>
+#include <cstdint>
+#include <limits>
 #include <memory>
+#include <optional>
 #include <set>
 #include <vector>
 
@@ -53,10 +58,112 @@ namespace routingblocks {
         virtual ~Move() = default;
     };
 
+    /**
+     * Tracks how the routes of the solution under search change, so that operators can skip the
+     * parts of their neighborhood that are known to contain no improving move. Maintained by
+     * LocalSearch, which attaches it to its operators for the duration of a run.
+     *
+     * Two kinds of information are provided:
+     *  - A watermark, the largest route modification timestamp present in the solution. Timestamps
+     *    are issued from a global counter, so a route whose timestamp does not exceed a watermark
+     *    recorded earlier in the same run has not been changed since.
+     *  - Optionally, the route timestamps of previous local optima. A pair of routes that both
+     *    still carry their timestamps of the same local optimum holds no improving move.
+     */
+    class SearchMemory {
+      public:
+        static constexpr size_t max_remembered_optima = 64;
+
+      private:
+        static inline std::atomic<size_t> _next_run_id = 1;
+
+        size_t _run_id = 0;
+        size_t _watermark = 0;
+        // Route timestamps of the remembered local optima, by route index.
+        std::vector<std::vector<size_t>> _local_optima;
+        size_t _next_optimum = 0;
+        // Bit i is set if the route at this index is unchanged since local optimum i.
+        std::vector<std::uint64_t> _settled_in;
+
+      public:
+        /**
+         * Starts a new run on the passed solution. Invalidates the per-run state operators keep.
+         */
+        void begin_run(const Solution& solution) {
+            _run_id = _next_run_id++;
+            update(solution);
+        }
+
+        /**
+         * Refreshes the watermark and settled routes. Call after every change to the solution.
+         */
+        void update(const Solution& solution) {
+            _watermark = 0;
+            _settled_in.assign(solution.size(), 0);
+            size_t route_index = 0;
+            for (const auto& route : solution) {
+                const auto timestamp = route.modification_timestamp();
+                _watermark = std::max(_watermark, timestamp);
+                for (size_t optimum = 0; optimum < _local_optima.size(); ++optimum) {
+                    const auto& timestamps = _local_optima[optimum];
+                    if (route_index < timestamps.size() && timestamps[route_index] == timestamp) {
+                        _settled_in[route_index] |= std::uint64_t{1} << optimum;
+                    }
+                }
+                ++route_index;
+            }
+        }
+
+        /**
+         * Remembers the passed solution as a local optimum. Replaces the oldest remembered optimum
+         * once max_remembered_optima are stored.
+         */
+        void remember_local_optimum(const Solution& solution) {
+            std::vector<size_t> timestamps;
+            timestamps.reserve(solution.size());
+            for (const auto& route : solution) {
+                timestamps.push_back(route.modification_timestamp());
+            }
+            if (_local_optima.size() < max_remembered_optima) {
+                _local_optima.push_back(std::move(timestamps));
+            } else {
+                _local_optima[_next_optimum] = std::move(timestamps);
+            }
+            _next_optimum = (_next_optimum + 1) % max_remembered_optima;
+        }
+
+        void forget_local_optima() {
+            _local_optima.clear();
+            _next_optimum = 0;
+            _settled_in.assign(_settled_in.size(), 0);
+        }
+
+        [[nodiscard]] size_t run_id() const { return _run_id; }
+        [[nodiscard]] size_t watermark() const { return _watermark; }
+        [[nodiscard]] size_t number_of_remembered_optima() const { return _local_optima.size(); }
+
+        /**
+         * True if the routes at the passed indices are unchanged since a common local optimum, i.e.,
+         * no move between them can improve the solution.
+         */
+        [[nodiscard]] bool settled(size_t origin_route, size_t target_route) const {
+            return (_settled_in[origin_route] & _settled_in[target_route]) != 0;
+        }
+    };
+
     class Operator {
+      protected:
+        const SearchMemory* _search_memory = nullptr;
+
       public:
         using eval_t = routingblocks::Evaluation;
 
+        /**
+         * Attaches the memory of the running search. Operators may use it to skip moves, but are not
+         * required to. nullptr detaches the memory.
+         */
+        void attach_search_memory(const SearchMemory* memory) { _search_memory = memory; }
+
         virtual void prepare_search(const Solution& solution) = 0;
 
         [[nodiscard]] virtual std::shared_ptr<Move> find_next_improving_move(
@@ -172,6 +279,21 @@ namespace routingblocks {
         bool operator!=(const QuadraticNeighborhoodIterator& other) const {
             return !(*this == other);
         }
+
+        /**
+         * Moves the iterator to the last arc into the current target route, such that the next
+         * increment continues with the first node of the next target route.
+         */
+        void skip_target_route() {
+            _current_arc.target_node = std::prev(_current_arc.target_route->end());
+        }
+
+        /**
+         * Moves the iterator to the passed node of the current target route.
+         */
+        void seek_target_node(Solution::route_t::const_iterator target_node) {
+            _current_arc.target_node = target_node;
+        }
     };
 
     template <class move_t>
@@ -181,6 +303,93 @@ namespace routingblocks {
         const Instance& _instance;
         const utility::arc_set* _arc_set;
 
+      private:
+        // Don't-look bits. _clean_since[v] holds the search memory watermark at which no move
+        // originating at vertex v improved the solution, or 0 if v has to be looked at.
+        std::vector<size_t> _clean_since;
+        // Vertices that have to stay active after the current pass
+        std::vector<bool> _keep_active;
+        size_t _memory_run_id = 0;
+        const Solution* _searched_solution = nullptr;
+        // Origin of the last move returned in the current pass
+        std::optional<GeneratorArc> _last_returned;
+
+        // Move descriptor cache. Stores, for each origin node and target route, the target
+        // positions of the improving moves. An entry stays valid as long as neither route changes,
+        // so each pass only evaluates the moves that involve a route modified by the last move.
+        static constexpr size_t invalid_timestamp = std::numeric_limits<size_t>::max();
+        struct cached_segment {
+            // Timestamp of the target route the moves were recorded for
+            size_t target_timestamp = invalid_timestamp;
+            std::vector<size_t> improving_positions;
+        };
+        struct cached_origin_route {
+            size_t timestamp = invalid_timestamp;
+            // Indexed by origin position * number of routes + target route index
+            std::vector<cached_segment> segments;
+        };
+        std::vector<cached_origin_route> _move_cache;
+        // Segment whose improving moves are currently being recorded
+        std::optional<std::pair<const GeneratorArc, cached_segment*>> _recording;
+
+        cached_segment& _cached_segment(const Solution& solution, const GeneratorArc& arc) {
+            auto& origin_route = _move_cache[std::distance(solution.begin(), arc.origin_route)];
+            if (origin_route.timestamp != arc.origin_route->modification_timestamp()) {
+                origin_route.timestamp = arc.origin_route->modification_timestamp();
+                origin_route.segments.assign(arc.origin_route->size() * solution.size(), {});
+            }
+            return origin_route.segments[std::distance(arc.origin_route->begin(), arc.origin_node)
+                                             * solution.size()
+                                         + std::distance(solution.begin(), arc.target_route)];
+        }
+
+        [[nodiscard]] static bool _same_segment(const GeneratorArc& lhs, const GeneratorArc& rhs) {
+            return lhs.origin_route == rhs.origin_route && lhs.origin_node == rhs.origin_node
+                   && lhs.target_route == rhs.target_route;
+        }
+
+        void _finish_recording() {
+            if (_recording) {
+                auto& [arc, segment] = *_recording;
+                segment->target_timestamp = arc.target_route->modification_timestamp();
+                _recording.reset();
+            }
+        }
+
+        [[nodiscard]] bool _skip_target_route(const Solution& solution, const GeneratorArc& arc) const {
+            const auto& memory = *_search_memory;
+            if (memory.settled(std::distance(solution.begin(), arc.origin_route),
+                               std::distance(solution.begin(), arc.target_route))) {
+                return true;
+            }
+            const auto clean_since = _clean_since[arc.origin_node->vertex_id()];
+            return clean_since != 0 && arc.origin_route->modification_timestamp() <= clean_since
+                   && arc.target_route->modification_timestamp() <= clean_since;
+        }
+
+        void _update_dont_look_bits() {
+            // Origins at or after the last returned move were not (completely) examined
+            if (_last_returned) {
+                for (auto route = _last_returned->origin_route; route != _searched_solution->end();
+                     ++route) {
+                    auto node = route == _last_returned->origin_route ? _last_returned->origin_node
+                                                                      : route->begin();
+                    for (; node != route->end(); ++node) {
+                        _keep_active[node->vertex_id()] = true;
+                    }
+                }
+            }
+            const auto watermark = _search_memory->watermark();
+            for (const auto& searched_route : *_searched_solution) {
+                for (const auto& searched_node : searched_route) {
+                    if (!_keep_active[searched_node.vertex_id()]) {
+                        _clean_since[searched_node.vertex_id()] = watermark;
+                    }
+                }
+            }
+        }
+
+      protected:
         QuadraticNeighborhoodIterator _get_next_arc(const Solution& solution, const Move* move) {
             if (move == nullptr) {
                 return QuadraticNeighborhoodIterator(
@@ -200,15 +409,83 @@ namespace routingblocks {
         explicit GeneratorArcOperator(const Instance& instance, const utility::arc_set* arc_set)
             : _instance(instance), _arc_set(arc_set) {}
 
-        void prepare_search(const Solution&) override {}
+        void prepare_search(const Solution& solution) override {
+            if (!_search_memory) {
+                return;
+            }
+            if (_memory_run_id != _search_memory->run_id()) {
+                _memory_run_id = _search_memory->run_id();
+                _clean_since.assign(_instance.NumberOfVertices(), 0);
+                _move_cache.clear();
+            }
+            if (_move_cache.size() != solution.size()) {
+                _move_cache.assign(solution.size(), {});
+            }
+            _keep_active.assign(_instance.NumberOfVertices(), false);
+            _searched_solution = &solution;
+            _last_returned.reset();
+            _recording.reset();
+        }
 
         std::shared_ptr<Move> find_next_improving_move(eval_t& evaluation, const Solution& solution,
                                                        const Move* previous_move) override {
             auto neighborhood_iter = _get_next_arc(solution, previous_move);
+            const bool use_memory = _search_memory && _searched_solution == &solution;
+            // A resumed search may start in the middle of a target route
+            bool entering_target_route = true;
+
+            const auto found_improving_move = [&]() {
+                const auto& arc = *neighborhood_iter;
+                if (use_memory) {
+                    _keep_active[arc.origin_node->vertex_id()] = true;
+                    _last_returned = arc;
+                }
+                return std::make_shared<move_t>(
+                    create_move(location_cast(solution, arc.origin_route, arc.origin_node),
+                                location_cast(solution, arc.target_route, arc.target_node)));
+            };
 
             // Iterate over all arcs in the solution
             const auto end_iter = QuadraticNeighborhoodIterator();
             for (; neighborhood_iter != end_iter; ++neighborhood_iter) {
+                if (use_memory
+                    && (entering_target_route
+                        || neighborhood_iter->target_node
+                               == neighborhood_iter->target_route->begin())) {
+                    entering_target_route = false;
+                    const bool continues_recording
+                        = _recording && _same_segment(_recording->first, *neighborhood_iter);
+                    if (!continues_recording) {
+                        _finish_recording();
+                        if (_skip_target_route(solution, *neighborhood_iter)) {
+                            neighborhood_iter.skip_target_route();
+                            continue;
+                        }
+                        auto& segment = _cached_segment(solution, *neighborhood_iter);
+                        if (segment.target_timestamp
+                            == neighborhood_iter->target_route->modification_timestamp()) {
+                            // Replay the cached moves instead of evaluating the segment again
+                            const size_t position
+                                = std::distance(neighborhood_iter->target_route->begin(),
+                                                neighborhood_iter->target_node);
+                            auto next_improving
+                                = std::lower_bound(segment.improving_positions.begin(),
+                                                   segment.improving_positions.end(), position);
+                            if (next_improving == segment.improving_positions.end()) {
+                                neighborhood_iter.skip_target_route();
+                                continue;
+                            }
+                            neighborhood_iter.seek_target_node(std::next(
+                                neighborhood_iter->target_route->begin(), *next_improving));
+                            return found_improving_move();
+                        }
+                        if (neighborhood_iter->target_node
+                            == neighborhood_iter->target_route->begin()) {
+                            segment.improving_positions.clear();
+                            _recording.emplace(*neighborhood_iter, &segment);
+                        }
+                    }
+                }
                 if (neighborhood_iter->origin_route == neighborhood_iter->target_route
                     && neighborhood_iter->origin_node == neighborhood_iter->target_node) {
                     continue;
@@ -225,9 +502,16 @@ namespace routingblocks {
                                                     neighborhood_iter->target_node);
                 if (const move_t& move = create_move(origin, target);
                     move.evaluate(evaluation, _instance, solution) < 0) {
-                    return std::make_shared<move_t>(move);
+                    if (_recording) {
+                        _recording->second->improving_positions.push_back(target.position);
+                    }
+                    return found_improving_move();
                 }
             }
+            if (use_memory) {
+                _finish_recording();
+                _last_returned.reset();
+            }
             return {};
         }
 
@@ -235,7 +519,14 @@ namespace routingblocks {
             return move_t(origin, target);
         }
 
-        void finalize_search() override {}
+        void finalize_search() override {
+            if (_search_memory && _searched_solution) {
+                _update_dont_look_bits();
+            }
+            _searched_solution = nullptr;
+            // An interrupted segment is incomplete
+            _recording.reset();
+        }
     };
 
     class PivotingRule {
@@ -330,6 +621,11 @@ namespace routingblocks {
         std::vector<Operator*> _operators;
         PivotingRule* _pivoting_rule;
 
+        SearchMemory _memory;
+        bool _remember_local_optima = false;
+        // Operators the remembered local optima refer to
+        std::vector<Operator*> _remembered_operators;
+
         int loopID = 0;  // Current loop index
 
         solution_t _current_solution;
@@ -337,6 +633,8 @@ namespace routingblocks {
         void _apply_move(const Move& move);
         cost_t _test_move(const Move& move);
         [[nodiscard]] std::shared_ptr<Move> _explore_neighborhood();
+        void _begin_run();
+        void _end_run(bool converged);
 
       public:
         // Run the local search with the specified penalty values
@@ -349,17 +647,58 @@ namespace routingblocks {
             _operators.clear();
             std::copy(operators_begin, operators_end, std::back_inserter(_operators));
 
-            for (loopID = 0; true; loopID++) {
-                std::shared_ptr<Move> first_improving_move = _explore_neighborhood();
-                // Stop search, no improvement found.
-                if (!first_improving_move) break;
+            _begin_run();
+            try {
+                for (loopID = 0; true; loopID++) {
+                    std::shared_ptr<Move> first_improving_move = _explore_neighborhood();
+                    // Stop search, no improvement found.
+                    if (!first_improving_move) break;
 
-                _apply_move(*first_improving_move);
+                    _apply_move(*first_improving_move);
+                }
+            } catch (...) {
+                _end_run(false);
+                sol = std::move(_current_solution);
+                throw;
             }
+            _end_run(true);
 
             sol = std::move(_current_solution);
         }
 
+        /**
+         * If enabled, the route timestamps of every local optimum found are remembered, and later
+         * runs with the same operators skip moves between routes that are unchanged since a common
+         * local optimum. This makes the local search after a small perturbation of a local optimum
+         * cost time proportional to the perturbation. Disabled by default since the remembered
+         * optima are only valid as long as the evaluation and the operators' arc sets do not
+         * change.
+         */
+        void set_remember_local_optima(bool remember) {
+            _remember_local_optima = remember;
+            if (!remember) {
+                forget_local_optima();
+            }
+        }
+        [[nodiscard]] bool remembers_local_optima() const { return _remember_local_optima; }
+
+        /**
+         * Forgets all remembered local optima. Call after changing the evaluation (e.g., penalty
+         * factors) or the arc sets of the operators.
+         */
+        void forget_local_optima() {
+            _memory.forget_local_optima();
+            _remembered_operators.clear();
+        }
+        [[nodiscard]] size_t number_of_remembered_optima() const {
+            return _memory.number_of_remembered_optima();
+        }
+
+        [[nodiscard]] const eval_t* evaluation() const noexcept { return _evaluation.get(); }
+        [[nodiscard]] const eval_t* exact_evaluation() const noexcept {
+            return _exact_evaluation.get();
+        }
+
         // Constructor
         LocalSearch(const routingblocks::Instance& instance, std::shared_ptr<eval_t> evaluation,
                     std::shared_ptr<eval_t> exact_evaluation, PivotingRule* pivoting_rule);
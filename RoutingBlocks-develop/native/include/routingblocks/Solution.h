@@ -30,6 +30,7 @@
 #include <any>
 #include <atomic>
 #include <concepts>
+#include <cstdint>
 #include <iterator>
 #include <numeric>
 
@@ -96,6 +97,26 @@ namespace routingblocks {
         node_container_t _nodes;
         size_t _modification_timestamp;
         static inline std::atomic<size_t> _next_modification_timestamp = 1;
+        uint64_t _fingerprint = 0;
+
+        // Zobrist-style key of the arc (from, to). Mixing the arc with splitmix64 stands in for a
+        // table of random keys, which would need one entry per arc of the instance.
+        static uint64_t _arc_key(VertexID from, VertexID to) noexcept {
+            uint64_t key = (static_cast<uint64_t>(from) << 32) ^ static_cast<uint64_t>(to);
+            key += 0x9e3779b97f4a7c15ULL;
+            key = (key ^ (key >> 30)) * 0xbf58476d1ce4e5b9ULL;
+            key = (key ^ (key >> 27)) * 0x94d049bb133111ebULL;
+            return key ^ (key >> 31);
+        }
+
+        void _update_fingerprint() noexcept {
+            _fingerprint = 0;
+            if (empty()) return;
+            for (auto pred = _nodes.begin(), succ = std::next(pred); succ != _nodes.end();
+                 pred = succ++) {
+                _fingerprint += _arc_key(pred->vertex_id(), succ->vertex_id());
+            }
+        }
 
         // removal of segments. Does not update
         iterator _remove_segment(const_iterator begin, const_iterator end) {
@@ -153,6 +174,13 @@ namespace routingblocks {
         [[nodiscard]] auto modification_timestamp() const noexcept {
             return _modification_timestamp;
         }
+        [[nodiscard]] const eval_t* evaluation() const noexcept { return _evaluation.get(); }
+
+        /**
+         * 64 bit hash of the arcs of the route. Equal routes have equal fingerprints, empty routes
+         * have a fingerprint of 0. Maintained by update, i.e., after every modification.
+         */
+        [[nodiscard]] uint64_t fingerprint() const noexcept { return _fingerprint; }
 
         /**
          * Sets the evaluation function to be used for this route.
@@ -341,6 +369,7 @@ namespace routingblocks {
                                                _instance->getArc(first_valid_backward->vertex_id(),
                                                                  next_backward->vertex_id()));
             }
+            _update_fingerprint();
             _modification_timestamp = _next_modification_timestamp++;
         }
 
@@ -412,14 +441,37 @@ namespace routingblocks {
         std::vector<std::vector<NodeLocation>> _vertex_lookup;
         const Instance* _instance;
         std::shared_ptr<eval_t> _evaluation;
+        // Customers that are not part of any route. _unassigned_position[v] is the index of v in
+        // _unassigned_vertices and only meaningful while _is_unassigned[v] is set.
+        std::vector<bool> _is_unassigned;
+        std::vector<VertexID> _unassigned_vertices;
+        std::vector<size_t> _unassigned_position;
 
         void _update_vertex_lookup(unsigned int route_index);
 
         void _update_vertex_lookup();
 
+        void _set_unassigned(VertexID vertex_id, bool unassigned);
+
+        // Re-derives the state of a single vertex from the lookup. Mutations call this for the
+        // vertices they inserted or removed, so the bookkeeping costs O(changed vertices).
+        void _update_unassigned(VertexID vertex_id);
+
+        template <class vertex_id_iterator>
+        void _update_unassigned(vertex_id_iterator begin, vertex_id_iterator end) {
+            for (; begin != end; ++begin) _update_unassigned(*begin);
+        }
+
+        void _update_unassigned_vertices();
+
         template <class input_iterator>
         void _remove_vertices(input_iterator begin, input_iterator end) {
             if (begin == end) return;
+            std::vector<VertexID> removed_vertices;
+            for (auto location = begin; location != end; ++location) {
+                removed_vertices.push_back(
+                    std::next(_routes[location->route].begin(), location->position)->vertex_id());
+            }
             auto last_route_pos_begin = begin;
             while (last_route_pos_begin != end) {
                 auto last_route_pos_end = std::find_if(
@@ -431,6 +483,7 @@ namespace routingblocks {
                 last_route_pos_begin = last_route_pos_end;
             }
             _update_vertex_lookup();
+            _update_unassigned(removed_vertices.begin(), removed_vertices.end());
         }
 
         template <class input_iterator_t>
@@ -452,6 +505,9 @@ namespace routingblocks {
                 last_route_pos_begin = last_route_pos_end;
             }
             _update_vertex_lookup();
+            for (auto location = locations_begin; location != locations_end; ++location) {
+                _set_unassigned(location->first, false);
+            }
         }
 
       public:
@@ -460,9 +516,12 @@ namespace routingblocks {
             : _routes(num_routes, Route(evaluation, instance)),
               _vertex_lookup(instance.NumberOfVertices()),
               _instance(&instance),
-              _evaluation(std::move(evaluation)) {
+              _evaluation(std::move(evaluation)),
+              _is_unassigned(instance.NumberOfVertices(), false),
+              _unassigned_position(instance.NumberOfVertices(), 0) {
             assert(_evaluation);
             _update_vertex_lookup();
+            _update_unassigned_vertices();
         };
 
         Solution(std::shared_ptr<Evaluation> evaluation, const Instance& instance,
@@ -470,14 +529,28 @@ namespace routingblocks {
             : _routes(std::move(routes)),
               _vertex_lookup(instance.NumberOfVertices()),
               _instance(&instance),
-              _evaluation(std::move(evaluation)) {
+              _evaluation(std::move(evaluation)),
+              _is_unassigned(instance.NumberOfVertices(), false),
+              _unassigned_position(instance.NumberOfVertices(), 0) {
             _update_vertex_lookup();
+            _update_unassigned_vertices();
         };
 
         [[nodiscard]] const std::vector<NodeLocation>& find(VertexID vertex_id) const {
             return _vertex_lookup[vertex_id];
         }
 
+        /**
+         * Customers that are currently not visited by any route, in no particular order.
+         */
+        [[nodiscard]] const std::vector<VertexID>& unassigned_vertices() const {
+            return _unassigned_vertices;
+        }
+
+        [[nodiscard]] bool is_unassigned(VertexID vertex_id) const {
+            return _is_unassigned[vertex_id];
+        }
+
         [[nodiscard]] cost_t cost() const {
             return std::accumulate(
                 _routes.begin(), _routes.end(), cost_t(0.0),
@@ -502,6 +575,17 @@ namespace routingblocks {
                                [](const route_t& route) { return route.feasible(); });
         }
 
+        /**
+         * 64 bit hash of the solution, combined from the route fingerprints. Independent of the
+         * order of the routes and of empty routes, so solutions that visit the same sequences of
+         * vertices have equal fingerprints. Takes O(number of routes).
+         */
+        [[nodiscard]] uint64_t fingerprint() const {
+            return std::accumulate(
+                _routes.begin(), _routes.end(), uint64_t(0),
+                [](uint64_t acc, const route_t& route) { return acc + route.fingerprint(); });
+        }
+
         [[nodiscard]] Route& operator[](int i) { return _routes[i]; }
 
         [[nodiscard]] const Route& operator[](int i) const { return _routes[i]; }
@@ -539,6 +623,7 @@ namespace routingblocks {
         }
 
         [[nodiscard]] route_container_t::size_type size() const { return _routes.size(); }
+        [[nodiscard]] const eval_t* evaluation() const noexcept { return _evaluation.get(); }
 
         [[nodiscard]] bool operator==(const Solution& rhs) const { return _routes == rhs._routes; }
 
@@ -573,8 +658,11 @@ namespace routingblocks {
         }
 
         void remove_route(const_iterator route) {
+            std::vector<VertexID> removed_vertices;
+            for (const auto& node : *route) removed_vertices.push_back(node.vertex_id());
             _routes.erase(route);
             _update_vertex_lookup();
+            _update_unassigned(removed_vertices.begin(), removed_vertices.end());
         }
 
         const_iterator add_route() {
@@ -586,6 +674,7 @@ namespace routingblocks {
         const_iterator add_route(Route route) {
             _routes.push_back(std::move(route));
             _update_vertex_lookup(_routes.size() - 1);
+            for (const auto& node : _routes.back()) _set_unassigned(node.vertex_id(), false);
             return std::prev(_routes.end());
         }
     };
@@ -24,10 +24,30 @@
 #include <routingblocks/utility/adaptive_priority_list.h>
 #include <routingblocks/utility/random.h>
 
+#include <chrono>
+#include <functional>
+#include <limits>
 #include <type_traits>
 #include <vector>
 
 namespace routingblocks {
+    /**
+     * Record of a single destroy/repair/accept iteration of adaptive_large_neighborhood::run.
+     */
+    struct lns_iteration {
+        size_t iteration;
+        std::shared_ptr<destroy_operator> destroy_op;
+        std::shared_ptr<repair_operator> repair_op;
+        cost_t cost;
+        bool accepted;
+        uint64_t fingerprint;
+    };
+
+    struct lns_result {
+        Solution best_solution;
+        std::vector<lns_iteration> iterations;
+    };
+
     class adaptive_large_neighborhood {
       private:
         template <typename T> using OperatorList = utility::adaptive_priority_list<T>;
@@ -76,6 +96,22 @@ namespace routingblocks {
             _repair_operators.adapt();
         }
 
+        void set_operator_weight(destroy_operator_list::iterator elem, double weight) {
+            _destroy_operators.set_weight(elem, weight);
+        }
+
+        void set_operator_weight(repair_operator_list::iterator elem, double weight) {
+            _repair_operators.set_weight(elem, weight);
+        }
+
+        [[nodiscard]] double operator_weight(destroy_operator_list::const_iterator elem) const {
+            return _destroy_operators.weight(elem);
+        }
+
+        [[nodiscard]] double operator_weight(repair_operator_list::const_iterator elem) const {
+            return _repair_operators.weight(elem);
+        }
+
         void reset_operator_weights() {
             _destroy_operators.reset_weights();
             _repair_operators.reset_weights();
@@ -126,6 +162,56 @@ namespace routingblocks {
             return {destroy_op, repair_op};
         };
 
+        /**
+         * Runs num_iterations destroy/repair iterations starting from initial_solution. A
+         * generated solution is accepted if it is strictly cheaper than the current one. Accepted
+         * solutions score 1, rejected ones 0; the operator weights are adapted every
+         * adaptation_period iterations (never if 0).
+         * Stops early once time_limit seconds have passed. on_improvement, if set, is invoked
+         * with every accepted solution.
+         */
+        lns_result run(routingblocks::Evaluation& evaluation,
+                       const routingblocks::Solution& initial_solution, size_t num_iterations,
+                       size_t num_removed_customers, size_t adaptation_period = 0,
+                       double time_limit = std::numeric_limits<double>::infinity(),
+                       const std::function<void(const Solution&)>& on_improvement = {}) {
+            using clock = std::chrono::steady_clock;
+            const auto start_time = clock::now();
+            auto out_of_time = [&] {
+                return std::chrono::duration<double>(clock::now() - start_time).count()
+                       >= time_limit;
+            };
+
+            lns_result result{initial_solution, {}};
+            // num_iterations may be a loose upper bound when running against a time limit
+            result.iterations.reserve(std::min<size_t>(num_iterations, 1u << 16));
+            auto& current_solution = result.best_solution;
+            cost_t current_cost = current_solution.cost();
+
+            for (size_t iteration = 0; iteration < num_iterations && !out_of_time();
+                 ++iteration) {
+                Solution candidate = current_solution;
+                auto pick = generate(evaluation, candidate, num_removed_customers);
+                cost_t candidate_cost = candidate.cost();
+                bool accepted = candidate_cost < current_cost;
+
+                collect_score(pick, accepted ? 1.0 : 0.0);
+                result.iterations.push_back(
+                    {iteration, *pick.first, *pick.second, candidate_cost, accepted,
+                     candidate.fingerprint()});
+
+                if (accepted) {
+                    current_solution = std::move(candidate);
+                    current_cost = candidate_cost;
+                    if (on_improvement) on_improvement(current_solution);
+                }
+                if (adaptation_period > 0 && (iteration + 1) % adaptation_period == 0) {
+                    adapt_operator_weights();
+                }
+            }
+            return result;
+        }
+
         [[nodiscard]] auto destroy_operators_begin() const { return _destroy_operators.begin(); }
         [[nodiscard]] auto destroy_operators_end() const { return _destroy_operators.end(); }
         [[nodiscard]] auto destroy_operators_begin() { return _destroy_operators.begin(); }
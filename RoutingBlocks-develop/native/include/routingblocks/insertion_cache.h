@@ -27,8 +27,12 @@
 #include <routingblocks/Solution.h>
 #include <routingblocks/evaluation.h>
 #include <routingblocks/types.h>
+#include <routingblocks/utility/arc_set.h>
+#include <routingblocks/utility/thread_pool.h>
 
+#include <algorithm>
 #include <dynamic_bitset/dynamic_bitset.hpp>
+#include <memory>
 #include <vector>
 
 namespace routingblocks::utility {
@@ -94,31 +98,31 @@ namespace routingblocks::utility {
         using reference = typename child_iterator::reference;
 
       private:
+        // Non-exhausted children, kept as a binary heap whose front holds the cheapest element
         std::vector<std::pair<child_iterator, child_iterator>> _child_iterators;
-        child_iterator _next_cheapest;
         const Comp* _comp;
 
-        void _remove_exhausted() {
-            while (!_child_iterators.empty()
-                   && _child_iterators.back().first != _child_iterators.back().second) {
-                _child_iterators.pop_back();
-            }
+        auto _heap_order() const {
+            return [comp = _comp](const auto& lhs, const auto& rhs) {
+                return (*comp)(*rhs.first, *lhs.first);
+            };
         }
 
-        void _advance() {
-            ++_next_cheapest;
-            _remove_exhausted();
-            if (_child_iterators.empty()) return;
-            _set_cheapest();
+        void _remove_exhausted() {
+            _child_iterators.erase(
+                std::remove_if(_child_iterators.begin(), _child_iterators.end(),
+                               [](const auto& child) { return child.first == child.second; }),
+                _child_iterators.end());
         }
 
-        void _set_cheapest() {
-            _next_cheapest = _child_iterators.back().first;
-            for (auto [child_begin, child_end] : _child_iterators) {
-                if (child_begin == child_end) continue;
-                if ((*_comp)(*child_begin, *_next_cheapest)) {
-                    _next_cheapest = child_begin;
-                }
+        void _advance() {
+            // Moves the cheapest child to the back, advances it and re-inserts it unless exhausted
+            std::pop_heap(_child_iterators.begin(), _child_iterators.end(), _heap_order());
+            auto& advanced_child = _child_iterators.back();
+            if (++advanced_child.first == advanced_child.second) {
+                _child_iterators.pop_back();
+            } else {
+                std::push_heap(_child_iterators.begin(), _child_iterators.end(), _heap_order());
             }
         }
 
@@ -128,9 +132,7 @@ namespace routingblocks::utility {
             const Comp* comp)
             : _child_iterators(std::move(child_iterators)), _comp(comp) {
             _remove_exhausted();
-            if (!_child_iterators.empty()) {
-                _set_cheapest();
-            }
+            std::make_heap(_child_iterators.begin(), _child_iterators.end(), _heap_order());
         };
 
         joint_sorted_iterator() : _child_iterators(0), _comp(nullptr){};
@@ -146,9 +148,9 @@ namespace routingblocks::utility {
             return tmp;
         }
 
-        reference operator*() const { return *_next_cheapest; }
+        reference operator*() const { return *_child_iterators.front().first; }
 
-        pointer operator->() const { return &*_next_cheapest; }
+        pointer operator->() const { return &*_child_iterators.front().first; }
 
         bool operator==(const joint_sorted_iterator& other) const {
             if (_child_iterators.empty() && other._child_iterators.empty()) {
@@ -156,13 +158,96 @@ namespace routingblocks::utility {
             } else if (_child_iterators.empty() || other._child_iterators.empty()) {
                 return false;
             } else {
-                return _next_cheapest == other._next_cheapest;
+                return _child_iterators.front().first == other._child_iterators.front().first;
             }
         }
 
         bool operator!=(const joint_sorted_iterator& other) const { return !(*this == other); }
     };
 
+    /**
+     * Merges the same sorted children as joint_sorted_iterator, but finds the cheapest child with
+     * a linear scan on every advance, i.e., in O(R) for R children. Kept as the reference the heap
+     * merge is tested and benchmarked against.
+     */
+    template <class child_iterator, class Comp = std::less<typename child_iterator::value_type>>
+    class linear_joint_sorted_iterator {
+      public:
+        using iterator_category = std::forward_iterator_tag;
+        using value_type = typename child_iterator::value_type;
+        using pointer = typename child_iterator::pointer;
+        using difference_type = std::ptrdiff_t;
+        using reference = typename child_iterator::reference;
+
+      private:
+        std::vector<std::pair<child_iterator, child_iterator>> _child_iterators;
+        // Index of the child whose next element is the cheapest
+        size_t _next_cheapest = 0;
+        const Comp* _comp;
+
+        void _advance() {
+            auto& cheapest_child = _child_iterators[_next_cheapest];
+            if (++cheapest_child.first == cheapest_child.second) {
+                _child_iterators.erase(std::next(_child_iterators.begin(), _next_cheapest));
+            }
+            _set_cheapest();
+        }
+
+        void _set_cheapest() {
+            _next_cheapest = 0;
+            for (size_t child = 1; child < _child_iterators.size(); ++child) {
+                if ((*_comp)(*_child_iterators[child].first,
+                             *_child_iterators[_next_cheapest].first)) {
+                    _next_cheapest = child;
+                }
+            }
+        }
+
+      public:
+        linear_joint_sorted_iterator(
+            std::vector<std::pair<child_iterator, child_iterator>> child_iterators,
+            const Comp* comp)
+            : _child_iterators(std::move(child_iterators)), _comp(comp) {
+            _child_iterators.erase(
+                std::remove_if(_child_iterators.begin(), _child_iterators.end(),
+                               [](const auto& child) { return child.first == child.second; }),
+                _child_iterators.end());
+            _set_cheapest();
+        };
+
+        linear_joint_sorted_iterator() : _child_iterators(0), _comp(nullptr){};
+
+        linear_joint_sorted_iterator& operator++() {
+            _advance();
+            return *this;
+        }
+
+        linear_joint_sorted_iterator operator++(int) {
+            linear_joint_sorted_iterator tmp = *this;
+            _advance();
+            return tmp;
+        }
+
+        reference operator*() const { return *_child_iterators[_next_cheapest].first; }
+
+        pointer operator->() const { return &*_child_iterators[_next_cheapest].first; }
+
+        bool operator==(const linear_joint_sorted_iterator& other) const {
+            if (_child_iterators.empty() && other._child_iterators.empty()) {
+                return true;
+            } else if (_child_iterators.empty() || other._child_iterators.empty()) {
+                return false;
+            } else {
+                return _child_iterators[_next_cheapest].first
+                       == other._child_iterators[other._next_cheapest].first;
+            }
+        }
+
+        bool operator!=(const linear_joint_sorted_iterator& other) const {
+            return !(*this == other);
+        }
+    };
+
     template <class Comp = std::less<insertion_move>> class insertion_cache {
       public:
         using move_t = insertion_move;
@@ -171,6 +256,8 @@ namespace routingblocks::utility {
         using bitset_t = sul::dynamic_bitset<>;
         using cache_t = std::vector<move_t>;
         using const_iterator = joint_sorted_iterator<typename cache_t::const_iterator, Comp>;
+        using linear_const_iterator
+            = linear_joint_sorted_iterator<typename cache_t::const_iterator, Comp>;
         using tracked_vertex_iterator = bitset_iterator<bitset_t>;
 
       private:
@@ -181,6 +268,14 @@ namespace routingblocks::utility {
         // Vertices to track insertions of. Setting bit at index i indicates that moves for
         // vertex with id i should be tracked.
         bitset_t _tracked_vertices;
+        // Optional granular neighborhood. If set, a vertex is only inserted between pred and
+        // succ if (pred, vertex) or (vertex, succ) is in the set, or if pred or succ is a depot.
+        const arc_set* _granular_arcs = nullptr;
+        // Workers used to build the caches of different vertices concurrently, nullptr if
+        // single-threaded.
+        std::unique_ptr<thread_pool> _thread_pool;
+        // Whether _evaluation may be called from several threads at once
+        bool _concurrent_evaluation = false;
 
         Comp _comp;
 
@@ -197,38 +292,78 @@ namespace routingblocks::utility {
               _tracked_vertices(_instance->NumberOfVertices()),
               _comp(std::move(comp)){};
 
+        /**
+         * Creates a cache that only considers insertion positions adjacent to an arc of
+         * granular_arcs. Positions next to the start or end depot are always considered, so every
+         * route (and in particular every empty route) offers at least one insertion position.
+         * Passing nullptr considers all positions.
+         */
+        insertion_cache(const Instance& instance, const arc_set* granular_arcs, Comp comp = Comp())
+            : _instance(&instance),
+              _caches(_instance->NumberOfVertices(), std::vector<move_t>(0)),
+              _tracked_vertices(_instance->NumberOfVertices()),
+              _granular_arcs(granular_arcs),
+              _comp(std::move(comp)){};
+
         void clear() {
             _tracked_vertices.reset();
             std::for_each(_caches.begin(), _caches.end(), [](auto& cache) { cache.clear(); });
             _evaluation = nullptr;
         };
 
+        /**
+         * Sets the number of threads used to build and update the caches of different vertices.
+         * The result does not depend on the number of threads.
+         */
+        void set_number_of_threads(size_t number_of_threads) {
+            _thread_pool = number_of_threads > 1 ? std::make_unique<thread_pool>(number_of_threads)
+                                                 : nullptr;
+        }
+
+        [[nodiscard]] size_t number_of_threads() const {
+            return _thread_pool ? _thread_pool->size() : 1;
+        }
+
+        /**
+         * Rebuilds the cache. Pass concurrent_evaluation = false if evaluation must not be called
+         * from several threads at once, the cache then stays single-threaded until the next
+         * rebuild.
+         */
         template <class InputIterator>
             requires VertexIDIterator<InputIterator>
         void rebuild(Evaluation& evaluation, const Solution& solution,
-                     InputIterator tracked_vertices_begin, InputIterator tracked_vertices_end) {
+                     InputIterator tracked_vertices_begin, InputIterator tracked_vertices_end,
+                     bool concurrent_evaluation = true) {
             clear();
             _evaluation = &evaluation;
-            auto number_of_insertion_positions = number_of_nodes(solution, true);
-            // Build the initial cache
+            _concurrent_evaluation = concurrent_evaluation;
+            std::vector<VertexID> vertices;
             for (; tracked_vertices_begin != tracked_vertices_end; ++tracked_vertices_begin) {
-                _caches[*tracked_vertices_begin].resize(number_of_insertion_positions);
+                if (_tracked_vertices.test(*tracked_vertices_begin)) continue;
+                _tracked_vertices.set(*tracked_vertices_begin);
+                vertices.push_back(*tracked_vertices_begin);
+            }
+            // Build the initial cache. Each vertex has its own cache, so vertices can be
+            // processed concurrently.
+            parallel_for(_active_thread_pool(), vertices.size(), [&](size_t i) {
+                auto& cache = _caches[vertices[i]];
+                cache.reserve(number_of_nodes(solution, true));
                 size_t route_index = 0;
                 for (auto route = solution.begin(); route != solution.end();
                      ++route, ++route_index) {
-                    _update_moves_of_route(*route, route_index, _caches[*tracked_vertices_begin],
-                                           *tracked_vertices_begin);
+                    _append_moves_of_route(cache, *route, route_index, vertices[i]);
                 }
-                _restore_order(*tracked_vertices_begin);
-                _tracked_vertices.set(*tracked_vertices_begin);
-            }
+                _restore_order(vertices[i], 0);
+            });
         }
 
         void invalidate_route(const Route& route, size_t route_index) {
             // Update moves involving the invalidated route for each tracked vertex
-            _tracked_vertices.iterate_bits_on([&](VertexID vertex_id) {
-                _update_moves_of_route(route, route_index, _caches[vertex_id], vertex_id);
-                _restore_order(vertex_id);
+            const std::vector<VertexID> vertices(tracked_vertices_begin(), tracked_vertices_end());
+            parallel_for(_active_thread_pool(), vertices.size(), [&](size_t i) {
+                const size_t first_new_move = _update_moves_of_route(
+                    route, route_index, _caches[vertices[i]], vertices[i]);
+                _restore_order(vertices[i], first_new_move);
             });
         }
 
@@ -251,61 +386,105 @@ namespace routingblocks::utility {
         }
         [[nodiscard]] tracked_vertex_iterator tracked_vertices_end() const { return {}; }
 
-        [[nodiscard]] const_iterator begin() const {
-            std::vector<std::pair<cache_t::const_iterator, cache_t::const_iterator>> iters;
-            iters.reserve(_tracked_vertices.count());
-            for (const auto& cache : _caches) {
-                if (cache.empty()) continue;
-                iters.push_back(std::make_pair(cache.begin(), cache.end()));
-            }
-            return {std::move(iters), &_comp};
-        };
+        [[nodiscard]] const_iterator begin() const { return {_tracked_caches(), &_comp}; };
         [[nodiscard]] const_iterator end() const { return {}; };
 
+        /**
+         * Same sequence as [begin(), end()), merged by a linear scan over the per-vertex caches.
+         * Only meant for testing and benchmarking the heap merge.
+         */
+        [[nodiscard]] linear_const_iterator linear_begin() const {
+            return {_tracked_caches(), &_comp};
+        };
+        [[nodiscard]] linear_const_iterator linear_end() const { return {}; };
+
+        /**
+         * Number of moves between begin() and end().
+         */
+        [[nodiscard]] size_t size() const {
+            size_t number_of_moves = 0;
+            _tracked_vertices.iterate_bits_on(
+                [&](VertexID vertex_id) { number_of_moves += _caches[vertex_id].size(); });
+            return number_of_moves;
+        }
+
         bool tracks(VertexID vertex_id) const { return _tracked_vertices.test(vertex_id); }
 
+        [[nodiscard]] const arc_set* granular_arcs() const { return _granular_arcs; }
+
+        [[nodiscard]] const Evaluation* evaluation() const { return _evaluation; }
+
       private:
-        void _restore_order(VertexID vertex) {
-            std::sort(_caches[vertex].begin(), _caches[vertex].end(), _comp);
+        [[nodiscard]] thread_pool* _active_thread_pool() const {
+            return _concurrent_evaluation ? _thread_pool.get() : nullptr;
+        }
+
+        [[nodiscard]] std::vector<std::pair<typename cache_t::const_iterator,
+                                            typename cache_t::const_iterator>>
+        _tracked_caches() const {
+            std::vector<std::pair<typename cache_t::const_iterator, typename cache_t::const_iterator>>
+                iters;
+            iters.reserve(_tracked_vertices.count());
+            // Caches of vertices that are no longer tracked are stale
+            _tracked_vertices.iterate_bits_on([&](VertexID vertex_id) {
+                const auto& cache = _caches[vertex_id];
+                if (!cache.empty()) iters.push_back(std::make_pair(cache.begin(), cache.end()));
+            });
+            return iters;
+        }
+
+        /**
+         * Sorts the moves starting at first_new_move and merges them into the (sorted) moves
+         * before it.
+         */
+        void _restore_order(VertexID vertex, size_t first_new_move) {
+            auto& cache = _caches[vertex];
+            auto middle = std::next(cache.begin(), first_new_move);
+            std::sort(middle, cache.end(), _comp);
+            std::inplace_merge(cache.begin(), middle, cache.end(), _comp);
+        }
+
+        [[nodiscard]] bool _is_granular_position(const routingblocks::Route& route,
+                                                 routingblocks::Route::const_iterator pred,
+                                                 routingblocks::Route::const_iterator succ,
+                                                 VertexID vertex_id) const {
+            if (_granular_arcs == nullptr) return true;
+            // Insertions next to a depot are always allowed
+            if (pred == route.begin() || std::next(succ) == route.end()) return true;
+            return _granular_arcs->includes_arc(pred->vertex_id(), vertex_id)
+                   || _granular_arcs->includes_arc(vertex_id, succ->vertex_id());
         }
 
-        auto _overwrite_sequence_with_moves_from_route(std::vector<move_t>::iterator seq_begin,
-                                                       const routingblocks::Route& route,
-                                                       size_t route_index, VertexID vertex_id) {
+        void _append_moves_of_route(cache_t& cache, const routingblocks::Route& route,
+                                    size_t route_index, VertexID vertex_id) {
             auto succ = route.begin();
             auto pred = succ++;
             size_t pos = 0;
             auto route_cost = route.cost();
             Node n = create_node(*_evaluation, *_instance, vertex_id);
-            for (; succ != route.end(); ++succ, ++pred, ++pos, ++seq_begin) {
+            for (; succ != route.end(); ++succ, ++pred, ++pos) {
+                if (!_is_granular_position(route, pred, succ, vertex_id)) continue;
                 cost_t insertion_cost
                     = evaluate_insertion(*_evaluation, *_instance, route, pred, n);
-                *seq_begin = move_t{vertex_id, routingblocks::NodeLocation(route_index, pos),
-                                    insertion_cost - route_cost};
+                cache.push_back(move_t{vertex_id, routingblocks::NodeLocation(route_index, pos),
+                                       insertion_cost - route_cost});
             }
-            return seq_begin;
         }
 
-        void _update_moves_of_route(const routingblocks::Route& route, size_t route_index,
-                                    auto& cache, VertexID vertex_id) {
-            // Partitions the vector into [route_i, route_j, ..., route_index...]
-            auto first_invalid_move = std::partition(
-                cache.begin(), cache.end(),
-                [route_index](const move_t& move) { return move.after_node.route != route_index; });
-            const size_t first_invalid_move_index
-                = std::distance(cache.begin(), first_invalid_move);
-            // Resize the cache to have space for all elements
-            const long prev_route_size = (cache.size() - first_invalid_move_index);
-            // Could be negative if the route grew.
-            const long route_shrank_by = prev_route_size - (route.size() - 1);
-            assert(route_shrank_by <= static_cast<long long>(cache.size()));
-            cache.resize(static_cast<size_t>(cache.size() - route_shrank_by));
-            // Iterator may have been invalidated
-            first_invalid_move = std::next(cache.begin(), first_invalid_move_index);
-            // Now just replace
-            auto cache_end = _overwrite_sequence_with_moves_from_route(first_invalid_move, route,
-                                                                       route_index, vertex_id);
-            assert(cache_end == cache.end());
+        /**
+         * Replaces the moves of the passed route. Moves of other routes keep their relative
+         * order. Returns the index of the first new move, the new moves themselves are unsorted.
+         */
+        size_t _update_moves_of_route(const routingblocks::Route& route, size_t route_index,
+                                      cache_t& cache, VertexID vertex_id) {
+            cache.erase(std::remove_if(cache.begin(), cache.end(),
+                                       [route_index](const move_t& move) {
+                                           return move.after_node.route == route_index;
+                                       }),
+                        cache.end());
+            const size_t first_new_move = cache.size();
+            _append_moves_of_route(cache, route, route_index, vertex_id);
+            return first_new_move;
         }
     };
 }  // namespace routingblocks::utility
@@ -27,6 +27,10 @@
 #include <routingblocks/operators.h>
 #include <routingblocks/utility/random.h>
 
+#include <functional>
+#include <utility>
+#include <vector>
+
 namespace routingblocks::lns::operators {
     /**
      * Randomly samples k random positions from the solution without replacement.
@@ -54,6 +58,83 @@ namespace routingblocks::lns::operators {
         [[nodiscard]] bool can_apply_to(const routingblocks::Solution& sol) const override;
     };
 
+    /**
+     * A vertex that a RelatedRemoval operator may remove.
+     */
+    struct related_vertex_removal_move {
+        routingblocks::VertexID vertex_id;
+        /// Relatedness of the vertex to the seed vertex.
+        double relatedness;
+        routingblocks::NodeLocation location;
+
+        bool operator==(const related_vertex_removal_move& other) const {
+            return vertex_id == other.vertex_id && location == other.location;
+        }
+    };
+
+    /**
+     * Removes clusters of related vertices. Starts from an initial seed vertex, then repeatedly
+     * picks a seed among the vertices removed so far and removes up to cluster_size vertices
+     * related to it. Neighbour lists are sorted once on construction, so building the candidates
+     * of a seed is a single pass over its neighbours and the solution.
+     */
+    class RelatedRemoval : public routingblocks::destroy_operator {
+      public:
+        using moves_t = std::vector<related_vertex_removal_move>;
+        /// Picks one of the passed moves and returns its index.
+        using move_selector_t = std::function<size_t(const moves_t&)>;
+        /// Picks one of the passed (non-depot) node locations and returns its index.
+        using initial_seed_selector_t
+            = std::function<size_t(const std::vector<routingblocks::NodeLocation>&)>;
+
+      private:
+        // _neighbors[i] lists the vertices related to vertex i, most related first.
+        std::vector<std::vector<std::pair<routingblocks::VertexID, double>>> _neighbors;
+        move_selector_t _move_selector;
+        move_selector_t _seed_selector;
+        initial_seed_selector_t _initial_seed_selector;
+        size_t _cluster_size;
+
+        // Nodes of the solution the operator is applied to, in solution order.
+        std::vector<routingblocks::NodeLocation> _node_locations;
+        std::vector<routingblocks::VertexID> _node_vertices;
+        std::vector<size_t> _route_offsets;
+        // Nodes visiting the same vertex form a list in solution order.
+        std::vector<size_t> _first_node_of_vertex;
+        std::vector<size_t> _next_node;
+        std::vector<bool> _removed;
+        // _listed_in[v] == _listing if v was added to the current candidate list.
+        std::vector<size_t> _listed_in;
+        size_t _listing = 0;
+
+        void _cache_nodes(const routingblocks::Solution& sol);
+        [[nodiscard]] size_t _node_index(const routingblocks::NodeLocation& location) const;
+        void _collect_candidates(routingblocks::VertexID seed, moves_t& candidates);
+
+      public:
+        /**
+         * @param neighbors neighbors[i] lists vertices related to vertex i. Vertices missing from
+         * the list are least related to i.
+         * @param relatedness relatedness[i][j] is the relatedness of neighbors[i][j] to vertex i.
+         * Higher values mean more related.
+         * @param move_selector Selects the next vertex to remove from the candidates of a seed,
+         * sorted by relatedness in descending order. Ties keep the order of the neighbour list.
+         * @param seed_selector Selects the next seed from the vertices removed so far.
+         * @param initial_seed_selector Selects the initial seed.
+         * @param cluster_size Number of vertices removed per seed.
+         */
+        RelatedRemoval(const std::vector<std::vector<routingblocks::VertexID>>& neighbors,
+                       const std::vector<std::vector<double>>& relatedness,
+                       move_selector_t move_selector, move_selector_t seed_selector,
+                       initial_seed_selector_t initial_seed_selector, size_t cluster_size = 1);
+
+        std::vector<routingblocks::VertexID> apply(routingblocks::Evaluation& evaluation,
+                                                   routingblocks::Solution& sol,
+                                                   size_t numberOfRemovedCustomers) override;
+        [[nodiscard]] std::string_view name() const override;
+        [[nodiscard]] bool can_apply_to(const routingblocks::Solution& sol) const override;
+    };
+
     class RandomInsertion : public routingblocks::repair_operator {
         routingblocks::utility::random _random;
 
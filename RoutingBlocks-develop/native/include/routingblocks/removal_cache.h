@@ -27,8 +27,12 @@
 #include <routingblocks/Solution.h>
 #include <routingblocks/evaluation.h>
 #include <routingblocks/types.h>
+#include <routingblocks/utility/thread_pool.h>
 
+#include <algorithm>
 #include <concepts>
+#include <memory>
+#include <numeric>
 
 namespace routingblocks::utility {
 
@@ -58,9 +62,35 @@ namespace routingblocks::utility {
 
         // Cache structure. Holds all removal moves.
         std::vector<move_t> _cache;
+        // Vertex sequence of each route at the time its moves were computed
+        std::vector<std::vector<VertexID>> _route_snapshots;
+        // Workers used to evaluate different routes concurrently, nullptr if single-threaded.
+        std::unique_ptr<thread_pool> _thread_pool;
+        // Whether _evaluation may be called from several threads at once
+        bool _concurrent_evaluation = false;
         // Comparator
         Comp _comp;
 
+        [[nodiscard]] thread_pool* _active_thread_pool() const {
+            return _concurrent_evaluation ? _thread_pool.get() : nullptr;
+        }
+
+        void _snapshot_route(const routingblocks::Route& route, size_t route_index) {
+            if (route_index >= _route_snapshots.size()) _route_snapshots.resize(route_index + 1);
+            auto& snapshot = _route_snapshots[route_index];
+            snapshot.clear();
+            for (const auto& node : route) snapshot.push_back(node.vertex_id());
+        }
+
+        [[nodiscard]] bool _route_changed(const routingblocks::Route& route,
+                                          size_t route_index) const {
+            if (route_index >= _route_snapshots.size()) return true;
+            const auto& snapshot = _route_snapshots[route_index];
+            return !std::equal(
+                snapshot.begin(), snapshot.end(), route.begin(), route.end(),
+                [](VertexID vertex_id, const auto& node) { return vertex_id == node.vertex_id(); });
+        }
+
         auto _overwrite_sequence_with_moves_from_route(iterator seq_begin,
                                                        const routingblocks::Route& route,
                                                        size_t route_index) {
@@ -79,30 +109,61 @@ namespace routingblocks::utility {
             return seq_begin;
         }
 
-        void _update_moves_of_route(const routingblocks::Route& route, size_t route_index) {
-            // Partitions the vector into [route_i, route_j, ..., route_index...]
-            auto first_invalid_move
-                = std::partition(_cache.begin(), _cache.end(), [route_index](const move_t& move) {
-                      return move.node_location.route != route_index;
-                  });
-            const size_t first_invalid_move_index
-                = std::distance(_cache.begin(), first_invalid_move);
-            // Resize the cache to have space for all elements
-            const long prev_route_size = (_cache.size() - first_invalid_move_index);
-            // Could be negative if the route grew.
-            const long route_shrank_by = prev_route_size - (route.size() - 2);
-            assert(route_shrank_by <= static_cast<long long>(_cache.size()));
-            _cache.resize(static_cast<size_t>(_cache.size() - route_shrank_by));
-            // Iterator may have been invalidated
-            first_invalid_move = std::next(_cache.begin(), first_invalid_move_index);
-            // Now just replace
-            auto cache_end
-                = _overwrite_sequence_with_moves_from_route(first_invalid_move, route, route_index);
+        /**
+         * Drops the moves of the route and appends its new moves. Moves of other routes keep
+         * their relative order.
+         * @return The index of the first appended move.
+         */
+        size_t _update_moves_of_route(const routingblocks::Route& route, size_t route_index) {
+            _cache.erase(std::remove_if(_cache.begin(), _cache.end(),
+                                        [route_index](const move_t& move) {
+                                            return move.node_location.route == route_index;
+                                        }),
+                         _cache.end());
+            const size_t first_new_move = _cache.size();
+            _cache.resize(first_new_move + route.size() - 2);
+            [[maybe_unused]] auto cache_end = _overwrite_sequence_with_moves_from_route(
+                std::next(_cache.begin(), first_new_move), route, route_index);
             assert(cache_end == _cache.end());
+            return first_new_move;
+        }
+
+        /**
+         * Appends the moves of the routes with the passed (increasing) indices and snapshots
+         * these routes. Each route writes to its own slice of the cache, so routes are evaluated
+         * concurrently if the cache has a thread pool.
+         */
+        void _append_moves_of_routes(const routingblocks::Solution& solution,
+                                     const std::vector<size_t>& route_indices) {
+            if (route_indices.empty()) return;
+            std::vector<size_t> first_move_of_route(route_indices.size());
+            size_t number_of_moves = _cache.size();
+            for (size_t i = 0; i < route_indices.size(); ++i) {
+                first_move_of_route[i] = number_of_moves;
+                number_of_moves += solution[route_indices[i]].size() - 2;
+            }
+            _cache.resize(number_of_moves);
+            _route_snapshots.resize(std::max(_route_snapshots.size(), route_indices.back() + 1));
+            parallel_for(_active_thread_pool(), route_indices.size(), [&](size_t i) {
+                const auto& route = solution[route_indices[i]];
+                _overwrite_sequence_with_moves_from_route(
+                    std::next(_cache.begin(), first_move_of_route[i]), route, route_indices[i]);
+                _snapshot_route(route, route_indices[i]);
+            });
         }
 
         void _restore_order() { std::sort(_cache.begin(), _cache.end(), _comp); }
 
+        /**
+         * Restores the order of a cache whose moves before first_new_move are sorted. Sorts only
+         * the appended moves and merges them into the sorted prefix.
+         */
+        void _restore_order(size_t first_new_move) {
+            auto middle = std::next(_cache.begin(), first_new_move);
+            std::sort(middle, _cache.end(), _comp);
+            std::inplace_merge(_cache.begin(), middle, _cache.end(), _comp);
+        }
+
       public:
         explicit removal_cache(const routingblocks::Instance& instance)
             : _instance(&instance), _evaluation{}, _cache{} {};
@@ -112,31 +173,91 @@ namespace routingblocks::utility {
         void clear() {
             _evaluation = nullptr;
             _cache.clear();
+            _route_snapshots.clear();
         };
 
+        /**
+         * Sets the number of threads used to evaluate the moves of different routes. The result
+         * does not depend on the number of threads.
+         */
+        void set_number_of_threads(size_t number_of_threads) {
+            _thread_pool = number_of_threads > 1 ? std::make_unique<thread_pool>(number_of_threads)
+                                                 : nullptr;
+        }
+
+        [[nodiscard]] size_t number_of_threads() const {
+            return _thread_pool ? _thread_pool->size() : 1;
+        }
+
+        /**
+         * Rebuilds the cache. Pass concurrent_evaluation = false if evaluation must not be called
+         * from several threads at once, the cache then stays single-threaded until the next
+         * rebuild.
+         */
         void rebuild(routingblocks::Evaluation& evaluation,
-                     const routingblocks::Solution& solution) {
+                     const routingblocks::Solution& solution, bool concurrent_evaluation = true) {
             clear();
             _evaluation = &evaluation;
-            _cache.resize(routingblocks::number_of_nodes(solution));
+            _concurrent_evaluation = concurrent_evaluation;
+            std::vector<size_t> route_indices(solution.size());
+            std::iota(route_indices.begin(), route_indices.end(), 0);
+            _append_moves_of_routes(solution, route_indices);
+            assert(_cache.size() == routingblocks::number_of_nodes(solution));
+            _restore_order();
+        }
+
+        /**
+         * Brings the cache in line with the passed solution. Only routes whose vertex sequence
+         * differs from the one the cache was last built from are re-evaluated. Falls back to a full
+         * rebuild if the cache was built with a different evaluation. Moves of unchanged routes keep
+         * their cost, so rebuild the cache after changing parameters of the evaluation.
+         */
+        void update(routingblocks::Evaluation& evaluation,
+                    const routingblocks::Solution& solution, bool concurrent_evaluation = true) {
+            if (_evaluation != &evaluation) {
+                rebuild(evaluation, solution, concurrent_evaluation);
+                return;
+            }
+            _concurrent_evaluation = concurrent_evaluation;
+
+            std::vector<bool> changed(solution.size(), false);
+            bool any_changed = _route_snapshots.size() > solution.size();
             size_t route_index = 0;
-            auto next_move_storage = _cache.begin();
             for (auto route_iter = solution.begin(); route_iter != solution.end();
                  ++route_index, ++route_iter) {
-                next_move_storage = _overwrite_sequence_with_moves_from_route(
-                    next_move_storage, *route_iter, route_index);
+                changed[route_index] = _route_changed(*route_iter, route_index);
+                any_changed |= changed[route_index];
             }
-            assert(next_move_storage == _cache.end());
-            _restore_order();
+            if (!any_changed) return;
+
+            // Drop the moves of changed and vanished routes, then append their new moves
+            _cache.erase(std::remove_if(_cache.begin(), _cache.end(),
+                                        [&changed](const move_t& move) {
+                                            auto route = move.node_location.route;
+                                            return route >= changed.size() || changed[route];
+                                        }),
+                         _cache.end());
+            _route_snapshots.resize(std::min(_route_snapshots.size(), solution.size()));
+            const size_t first_new_move = _cache.size();
+            std::vector<size_t> changed_routes;
+            for (route_index = 0; route_index < changed.size(); ++route_index) {
+                if (changed[route_index]) changed_routes.push_back(route_index);
+            }
+            _append_moves_of_routes(solution, changed_routes);
+            _restore_order(first_new_move);
         }
 
         void invalidate_route(const routingblocks::Route& route, size_t route_index) {
-            _update_moves_of_route(route, route_index);
-            _restore_order();
+            auto first_new_move = _update_moves_of_route(route, route_index);
+            _snapshot_route(route, route_index);
+            _restore_order(first_new_move);
         }
 
         auto begin() const { return _cache.begin(); }
         auto end() const { return _cache.end(); }
+        [[nodiscard]] size_t size() const { return _cache.size(); }
+
+        [[nodiscard]] const routingblocks::Evaluation* evaluation() const { return _evaluation; }
     };
 
 }  // namespace routingblocks::utility
@@ -21,15 +21,30 @@
 
 #pragma once
 
-#include <forward_list>
+#include <algorithm>
+#include <cassert>
+#include <cstddef>
 #include <iterator>
+#include <list>
 #include <memory>
-#include <numeric>
+#include <stdexcept>
 #include <utility>
+#include <vector>
 
+#include "fenwick_tree.h"
 #include "random.h"
 
 namespace routingblocks::utility {
+    /**
+     * \brief A list of elements that are picked at random with adaptive weights.
+     *
+     * Weights live in a fenwick_tree indexed by a slot per element, so pick, add and set_weight
+     * take O(log n). New elements go to the front of the list but to the last slot, i.e., slots
+     * run in reverse list order, and pick searches the tree from its end. This picks the same
+     * element for the same random draw as a scan over the list would. erase, adapt and
+     * reset_weights touch every weight and rebuild the tree in O(n). Iterators stay valid until
+     * the element they point to is erased.
+     */
     template <class T> class adaptive_priority_list {
       public:
         using value_type = T;
@@ -39,27 +54,27 @@ namespace routingblocks::utility {
             T value;
             double period_score;
             unsigned int period_invocations;
-            double weight;
+            size_t slot;
 
             template <typename B, typename... Args> explicit priority_list_entry(Args&&... args)
-                : period_score(0.0),
+                : value(std::forward<Args>(args)...),
+                  period_score(0.0),
                   period_invocations(0),
-                  weight(1.0),
-                  value(std::forward<Args>(args)...) {}
+                  slot(0) {}
 
             explicit priority_list_entry(T&& elem)
-                : value(std::move(elem)), period_score(0.0), period_invocations(0), weight(1.0){};
+                : value(std::move(elem)), period_score(0.0), period_invocations(0), slot(0){};
         };
 
-        using priority_list_t = std::forward_list<priority_list_entry>;
+        using priority_list_t = std::list<priority_list_entry>;
         priority_list_t _priority_list;
-        double _total_weight;
+        // _slots[i] is the entry whose weight is stored at index i of _weights
+        std::vector<typename priority_list_t::iterator> _slots;
+        fenwick_tree _weights;
 
         // TODO Remove, should not keep track of when to update
         double _smoothing_factor;
 
-        size_t _size;
-
         random rand;
 
       public:
@@ -132,37 +147,36 @@ namespace routingblocks::utility {
         };
 
         adaptive_priority_list(random random, double smoothingFactor)
-            : _total_weight(0.0),
-              _size(0),
-              _smoothing_factor(smoothingFactor),
-              rand(std::move(random)){};  // Zero initialization is fine
+            : _smoothing_factor(smoothingFactor), rand(std::move(random)){};
 
         void set_smoothing_factor(double factor) { _smoothing_factor = factor; }
 
         iterator add(T&& elem) {
             double new_operator_weight = _avg_weight();
-            _total_weight += new_operator_weight;
-            _size += 1;
             _priority_list.emplace_front(std::move(elem));
-            return iterator(_priority_list.begin());
+            return _register(_priority_list.begin(), new_operator_weight);
         }
 
         template <typename... Args> iterator emplace(Args&&... args) {
             double new_operator_weight = _avg_weight();
-            _total_weight += new_operator_weight;
-            _size += 1;
             _priority_list.emplace_front(std::forward<Args>(args)...);
-            return iterator(_priority_list.begin());
+            return _register(_priority_list.begin(), new_operator_weight);
         }
 
         void erase(const_iterator elem) {
-            _total_weight -= elem.list_iter->weight;
-            _size -= 1;
-            // Find predecessor
-            iterator pred = iterator(_priority_list.before_begin());
-            for (iterator cur = begin(); cur != elem; pred = cur++) {
+            // Shift the later slots down to keep them in reverse list order
+            const size_t slot = elem.list_iter->slot;
+            std::vector<double> weights;
+            weights.reserve(_slots.size() - 1);
+            for (size_t i = 0; i < _slots.size(); ++i) {
+                if (i != slot) weights.push_back(_weights.value(i));
+            }
+            _slots.erase(_slots.begin() + static_cast<std::ptrdiff_t>(slot));
+            for (size_t i = slot; i < _slots.size(); ++i) {
+                _slots[i]->slot = i;
             }
-            _priority_list.erase_after(pred.list_iter);
+            _weights.assign(std::move(weights));
+            _priority_list.erase(elem.list_iter);
         }
 
         void update(iterator elem, double score) {
@@ -170,40 +184,46 @@ namespace routingblocks::utility {
             elem.list_iter->period_invocations++;
         }
 
+        void set_weight(iterator elem, double weight) {
+            assert(weight >= 0.0);
+            _weights.set(elem.list_iter->slot, weight);
+        }
+
+        [[nodiscard]] double weight(const_iterator elem) const {
+            return _weights.value(elem.list_iter->slot);
+        }
+
         void adapt() {
-            _total_weight = 0.0;
-            for (auto& entry : _priority_list) {
-                entry.weight = _smoothing_factor
-                                   * (entry.period_score / std::max(1u, entry.period_invocations))
-                               + (1.0 - _smoothing_factor) * entry.weight;
+            std::vector<double> weights(_slots.size());
+            for (size_t slot = 0; slot < _slots.size(); ++slot) {
+                auto& entry = *_slots[slot];
+                weights[slot] = _smoothing_factor
+                                    * (entry.period_score / std::max(1u, entry.period_invocations))
+                                + (1.0 - _smoothing_factor) * _weights.value(slot);
 
-                assert(entry.weight >= 0.0);
+                assert(weights[slot] >= 0.0);
 
-                _total_weight += entry.weight;
                 // Period is finished. Reset period related scores
                 entry.period_score = 0.0;
                 entry.period_invocations = 0;
             }
+            _weights.assign(std::move(weights));
 
-            assert(_total_weight > 0.0 || empty());
+            assert(_weights.total() > 0.0 || empty());
         }
 
         iterator pick() {
-            double selected = rand.uniform(0.0, _total_weight);
-            // Traverse the list to find the interval
-            double current_upper = 0.0;
-            for (typename priority_list_t::iterator entry = _priority_list.begin();
-                 entry != _priority_list.end(); ++entry) {
-                current_upper += entry->weight;
-                if (current_upper >= selected) {
-                    return iterator(entry);
-                }
+            const double total = _weights.total();
+            double selected = rand.uniform(0.0, total);
+            // The list starts at the last slot, so search for the weight left of the draw
+            size_t slot = _weights.find(total - selected);
+            if (slot == _slots.size()) {
+                throw std::runtime_error("Cannot pick from empty priority list!");
             }
-
-            throw std::runtime_error("Cannot pick from empty priority list!");
+            return iterator(_slots[slot]);
         }
 
-        [[nodiscard]] auto size() const { return _size; }
+        [[nodiscard]] auto size() const { return _priority_list.size(); }
 
         [[nodiscard]] bool empty() const { return _priority_list.empty(); }
 
@@ -219,11 +239,10 @@ namespace routingblocks::utility {
 
         void reset_weights() {
             for (auto& entry : _priority_list) {
-                entry.weight = 1.0;
                 entry.period_score = 0.0;
                 entry.period_invocations = 0.0;
             }
-            _total_weight = size() * 1.0;
+            _weights.assign(std::vector<double>(size(), 1.0));
         }
 
         adaptive_priority_list& operator=(const adaptive_priority_list& other) = delete;
@@ -237,15 +256,16 @@ namespace routingblocks::utility {
         ~adaptive_priority_list() = default;
 
       private:
-        void update_total() {
-            _total_weight
-                = std::accumulate(_priority_list.begin(), _priority_list.end(), 0.,
-                                  [](double acc, const auto& entry) { return acc + entry.weight; });
-        };
+        iterator _register(typename priority_list_t::iterator entry, double weight) {
+            entry->slot = _slots.size();
+            _slots.push_back(entry);
+            _weights.push_back(weight);
+            return iterator(entry);
+        }
 
         [[nodiscard]] double _avg_weight() const {
-            if (_size == 0) return 1.0;
-            return _total_weight / _size;
+            if (_slots.empty()) return 1.0;
+            return _weights.total() / _slots.size();
         }
     };
 }  // namespace routingblocks::utility
@@ -0,0 +1,124 @@
+/*
+ * Copyright (c) 2023 Patrick S. Klein (@libklein)
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy of
+ * this software and associated documentation files (the "Software"), to deal in
+ * the Software without restriction, including without limitation the rights to
+ * use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ * the Software, and to permit persons to whom the Software is furnished to do so,
+ * subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in all
+ * copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ * FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ * COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ * IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ * CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+#pragma once
+
+#include <cassert>
+#include <cstddef>
+#include <vector>
+
+namespace routingblocks::utility {
+    /**
+     * \brief A sequence of non-negative weights that supports weighted sampling.
+     *
+     * Weights are kept in a binary indexed (Fenwick) tree, so changing a weight, appending or
+     * removing the last weight and finding the element a cumulative weight falls into all take
+     * O(log n). assign rebuilds the whole tree in O(n).
+     */
+    class fenwick_tree {
+        std::vector<double> _values;
+        // One-based, _tree[i] holds the sum of the values in (i - lowbit(i), i]
+        std::vector<double> _tree = {0.0};
+
+        static size_t _lowbit(size_t i) { return i & (~i + 1); }
+
+      public:
+        fenwick_tree() = default;
+
+        [[nodiscard]] size_t size() const { return _values.size(); }
+        [[nodiscard]] bool empty() const { return _values.empty(); }
+
+        [[nodiscard]] double value(size_t index) const { return _values[index]; }
+
+        /**
+         * Sum of the first count values.
+         */
+        [[nodiscard]] double prefix_sum(size_t count) const {
+            double sum = 0.0;
+            for (; count > 0; count -= _lowbit(count)) {
+                sum += _tree[count];
+            }
+            return sum;
+        }
+
+        [[nodiscard]] double total() const { return prefix_sum(size()); }
+
+        void set(size_t index, double value) {
+            assert(index < size());
+            const double delta = value - _values[index];
+            _values[index] = value;
+            for (size_t i = index + 1; i < _tree.size(); i += _lowbit(i)) {
+                _tree[i] += delta;
+            }
+        }
+
+        void push_back(double value) {
+            _values.push_back(value);
+            const size_t i = _values.size();
+            // Node i covers (i - lowbit(i), i]: its own value plus the nodes of that range
+            double node = value;
+            for (size_t child = i - 1; child > i - _lowbit(i); child -= _lowbit(child)) {
+                node += _tree[child];
+            }
+            _tree.push_back(node);
+        }
+
+        void pop_back() {
+            assert(!empty());
+            // No node after the last one exists, so no other node covers its value
+            _values.pop_back();
+            _tree.pop_back();
+        }
+
+        void assign(std::vector<double> values) {
+            _values = std::move(values);
+            _tree.assign(_values.size() + 1, 0.0);
+            for (size_t i = 1; i < _tree.size(); ++i) {
+                _tree[i] += _values[i - 1];
+                if (size_t parent = i + _lowbit(i); parent < _tree.size()) {
+                    _tree[parent] += _tree[i];
+                }
+            }
+        }
+
+        /**
+         * Index of the element the cumulative weight falls into, i.e., the smallest index with
+         * prefix_sum(index + 1) > cumulative_weight. Elements with zero weight are never
+         * returned. Weights at or past the total, which rounding may produce, map to the last
+         * element with positive weight. Returns size() if no such element exists.
+         */
+        [[nodiscard]] size_t find(double cumulative_weight) const {
+            size_t position = 0;
+            size_t step = 1;
+            while (step * 2 < _tree.size()) step *= 2;
+            for (; step > 0; step /= 2) {
+                if (position + step < _tree.size() && _tree[position + step] <= cumulative_weight) {
+                    position += step;
+                    cumulative_weight -= _tree[position];
+                }
+            }
+            if (position < size()) return position;
+            // Rounding pushed us past the end
+            while (position > 0 && _values[position - 1] <= 0.0) --position;
+            return position > 0 ? position - 1 : size();
+        }
+    };
+}  // namespace routingblocks::utility
@@ -24,6 +24,7 @@
 #include <xoshiro/xoshiro.h>
 
 #include <algorithm>
+#include <array>
 #include <concepts>
 #include <ctime>
 #include <limits>
@@ -33,6 +34,7 @@ namespace routingblocks::utility {
     class random {
       public:
         using result_type = size_t;
+        using state_type = std::array<uint64_t, 4>;
 
         constexpr static result_type min() { return std::numeric_limits<result_type>::min(); }
 
@@ -47,6 +49,14 @@ namespace routingblocks::utility {
 
         explicit random(uint64_t seed) : _generator(seed) {}
 
+        /**
+         * \brief Returns the internal state of the generator. A generator whose state is set to
+         * it produces the same sequence from there on.
+         */
+        [[nodiscard]] state_type state() const noexcept { return _generator.serialize(); }
+
+        void set_state(state_type state) noexcept { _generator.deserialize(state); }
+
         /**
          * \brief Returns a random int equally distributed on [min,max]
          * undefined behaviour if min > max.
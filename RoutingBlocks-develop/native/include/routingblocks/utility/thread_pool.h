@@ -0,0 +1,153 @@
+/*
+ * Copyright (c) 2023 Patrick S. Klein (@libklein)
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy of
+ * this software and associated documentation files (the "Software"), to deal in
+ * the Software without restriction, including without limitation the rights to
+ * use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+ * the Software, and to permit persons to whom the Software is furnished to do so,
+ * subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in all
+ * copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+ * FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+ * COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+ * IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+ * CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+#pragma once
+
+#include <algorithm>
+#include <atomic>
+#include <condition_variable>
+#include <exception>
+#include <functional>
+#include <mutex>
+#include <thread>
+#include <utility>
+#include <vector>
+
+namespace routingblocks::utility {
+    /**
+     * \brief A fixed-size pool of worker threads that runs index-based parallel loops.
+     *
+     * The calling thread takes part in every loop, so a pool of size n owns n - 1 workers and a
+     * pool of size one runs everything on the calling thread. Loops are not reentrant: a pool
+     * must not be used by two threads at the same time.
+     */
+    class thread_pool {
+        std::vector<std::thread> _workers;
+
+        std::mutex _mutex;
+        std::condition_variable _work_available;
+        std::condition_variable _work_done;
+
+        // State of the current loop, guarded by _mutex except for _next_task
+        const std::function<void(size_t)>* _task = nullptr;
+        size_t _number_of_tasks = 0;
+        std::atomic<size_t> _next_task = 0;
+        size_t _busy_workers = 0;
+        size_t _generation = 0;
+        bool _stop = false;
+        std::exception_ptr _error;
+
+      public:
+        explicit thread_pool(size_t number_of_threads) {
+            _workers.reserve(std::max<size_t>(number_of_threads, 1) - 1);
+            for (size_t i = 1; i < number_of_threads; ++i) {
+                _workers.emplace_back([this] { _work(); });
+            }
+        }
+
+        thread_pool(const thread_pool&) = delete;
+        thread_pool& operator=(const thread_pool&) = delete;
+
+        ~thread_pool() {
+            {
+                std::lock_guard lock(_mutex);
+                _stop = true;
+            }
+            _work_available.notify_all();
+            for (auto& worker : _workers) worker.join();
+        }
+
+        [[nodiscard]] size_t size() const { return _workers.size() + 1; }
+
+        /**
+         * \brief Calls task(i) for every i in [0, number_of_tasks) and blocks until all calls
+         * returned. Tasks are picked up in arbitrary order and by arbitrary threads, so task(i)
+         * should only write to state owned by index i. Rethrows the first exception thrown by a
+         * task once all tasks finished.
+         */
+        void parallel_for(size_t number_of_tasks, const std::function<void(size_t)>& task) {
+            if (_workers.empty() || number_of_tasks <= 1) {
+                for (size_t i = 0; i < number_of_tasks; ++i) task(i);
+                return;
+            }
+            {
+                std::lock_guard lock(_mutex);
+                _task = &task;
+                _number_of_tasks = number_of_tasks;
+                _next_task = 0;
+                _busy_workers = _workers.size();
+                _error = nullptr;
+                ++_generation;
+            }
+            _work_available.notify_all();
+            _run_tasks();
+
+            std::unique_lock lock(_mutex);
+            _work_done.wait(lock, [this] { return _busy_workers == 0; });
+            _task = nullptr;
+            if (_error) std::rethrow_exception(std::exchange(_error, nullptr));
+        }
+
+      private:
+        void _run_tasks() {
+            for (size_t i = _next_task++; i < _number_of_tasks; i = _next_task++) {
+                try {
+                    (*_task)(i);
+                } catch (...) {
+                    std::lock_guard lock(_mutex);
+                    if (!_error) _error = std::current_exception();
+                }
+            }
+        }
+
+        void _work() {
+            size_t seen_generation = 0;
+            while (true) {
+                {
+                    std::unique_lock lock(_mutex);
+                    _work_available.wait(
+                        lock, [&] { return _stop || _generation != seen_generation; });
+                    if (_stop) return;
+                    seen_generation = _generation;
+                }
+                _run_tasks();
+                {
+                    std::lock_guard lock(_mutex);
+                    --_busy_workers;
+                }
+                _work_done.notify_one();
+            }
+        }
+    };
+
+    /**
+     * \brief Runs task(i) for every i in [0, number_of_tasks) on pool, or sequentially on the
+     * calling thread if pool is null.
+     */
+    inline void parallel_for(thread_pool* pool, size_t number_of_tasks,
+                             const std::function<void(size_t)>& task) {
+        if (pool != nullptr) {
+            pool->parallel_for(number_of_tasks, task);
+            return;
+        }
+        for (size_t i = 0; i < number_of_tasks; ++i) task(i);
+    }
+}  // namespace routingblocks::utility
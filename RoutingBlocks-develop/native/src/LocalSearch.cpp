@@ -61,7 +61,31 @@ namespace routingblocks {
         }
     }
 
-    void LocalSearch::_apply_move(const Move& move) { move.apply(*_instance, _current_solution); }
+    void LocalSearch::_apply_move(const Move& move) {
+        move.apply(*_instance, _current_solution);
+        _memory.update(_current_solution);
+    }
+
+    void LocalSearch::_begin_run() {
+        if (_remember_local_optima && _operators != _remembered_operators) {
+            // Optima of a different neighborhood do not tell anything about this one
+            forget_local_optima();
+            _remembered_operators = _operators;
+        }
+        _memory.begin_run(_current_solution);
+        for (auto* op : _operators) {
+            op->attach_search_memory(&_memory);
+        }
+    }
+
+    void LocalSearch::_end_run(bool converged) {
+        for (auto* op : _operators) {
+            op->attach_search_memory(nullptr);
+        }
+        if (converged && _remember_local_optima) {
+            _memory.remember_local_optimum(_current_solution);
+        }
+    }
 
     LocalSearch::LocalSearch(const routingblocks::Instance& instance,
                              std::shared_ptr<eval_t> evaluation,
@@ -50,6 +50,33 @@ namespace routingblocks {
             _update_vertex_lookup(route_index);
         }
     }
+
+    void Solution::_set_unassigned(VertexID vertex_id, bool unassigned) {
+        if (_is_unassigned[vertex_id] == unassigned) return;
+        _is_unassigned[vertex_id] = unassigned;
+        if (unassigned) {
+            _unassigned_position[vertex_id] = _unassigned_vertices.size();
+            _unassigned_vertices.push_back(vertex_id);
+        } else {
+            // Swap with the last entry to remove in O(1)
+            auto position = _unassigned_position[vertex_id];
+            _unassigned_vertices[position] = _unassigned_vertices.back();
+            _unassigned_position[_unassigned_vertices[position]] = position;
+            _unassigned_vertices.pop_back();
+        }
+    }
+
+    void Solution::_update_unassigned(VertexID vertex_id) {
+        if (_instance->getVertex(vertex_id).customer()) {
+            _set_unassigned(vertex_id, _vertex_lookup[vertex_id].empty());
+        }
+    }
+
+    void Solution::_update_unassigned_vertices() {
+        for (const auto& customer : _instance->Customers()) {
+            _set_unassigned(customer.id, _vertex_lookup[customer.id].empty());
+        }
+    }
     void Solution::exchange_segment(Solution::iterator from_route,
                                     typename route_t::iterator from_route_segment_begin,
                                     typename route_t::iterator from_route_segment_end,
@@ -78,14 +105,18 @@ namespace routingblocks {
             = route->insert_segment_after(pos, std::make_move_iterator(temporary_segment.begin()),
                                           std::make_move_iterator(temporary_segment.end()));
         _update_vertex_lookup();
+        _set_unassigned(vertex_id, false);
         return new_pos;
     }
 
     Solution::route_t::iterator Solution::remove_route_segment(Solution::iterator route,
                                                                typename route_t::iterator begin,
                                                                typename route_t::iterator end) {
+        std::vector<VertexID> removed_vertices;
+        for (auto node = begin; node != end; ++node) removed_vertices.push_back(node->vertex_id());
         auto new_pos = route->remove_segment(begin, end);
         _update_vertex_lookup();
+        _update_unassigned(removed_vertices.begin(), removed_vertices.end());
         return new_pos;
     }
     auto Solution::remove_vertex(Solution::iterator route, typename route_t::iterator position) ->
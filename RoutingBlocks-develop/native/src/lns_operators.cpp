@@ -20,6 +20,10 @@
 #include <routingblocks/Solution.h>
 #include <routingblocks/lns_operators.h>
 
+#include <algorithm>
+#include <limits>
+#include <stdexcept>
+
 namespace routingblocks::lns::operators {
 
     std::vector<routingblocks::NodeLocation> sample_positions(
@@ -80,6 +84,156 @@ namespace routingblocks::lns::operators {
         return true;
     }
 
+    RelatedRemoval::RelatedRemoval(
+        const std::vector<std::vector<routingblocks::VertexID>>& neighbors,
+        const std::vector<std::vector<double>>& relatedness, move_selector_t move_selector,
+        move_selector_t seed_selector, initial_seed_selector_t initial_seed_selector,
+        size_t cluster_size)
+        : _move_selector(std::move(move_selector)),
+          _seed_selector(std::move(seed_selector)),
+          _initial_seed_selector(std::move(initial_seed_selector)),
+          _cluster_size(cluster_size) {
+        if (neighbors.size() != relatedness.size()) {
+            throw std::invalid_argument(
+                "neighbors and relatedness must have the same number of rows");
+        }
+        if (_cluster_size == 0) {
+            throw std::invalid_argument("cluster_size must be positive");
+        }
+        _neighbors.resize(neighbors.size());
+        for (size_t i = 0; i < neighbors.size(); ++i) {
+            if (neighbors[i].size() != relatedness[i].size()) {
+                throw std::invalid_argument(
+                    "neighbors and relatedness must have rows of the same length");
+            }
+            auto& row = _neighbors[i];
+            row.reserve(neighbors[i].size());
+            for (size_t j = 0; j < neighbors[i].size(); ++j) {
+                row.emplace_back(neighbors[i][j], relatedness[i][j]);
+            }
+            std::stable_sort(row.begin(), row.end(), [](const auto& lhs, const auto& rhs) {
+                return lhs.second > rhs.second;
+            });
+        }
+        _listed_in.resize(_neighbors.size(), 0);
+    }
+
+    void RelatedRemoval::_cache_nodes(const routingblocks::Solution& sol) {
+        constexpr auto npos = std::numeric_limits<size_t>::max();
+        _node_locations.clear();
+        _node_vertices.clear();
+        _route_offsets.clear();
+        size_t route_index = 0;
+        for (const auto& route : sol) {
+            _route_offsets.push_back(_node_locations.size());
+            size_t position = 1;
+            for (auto node_iter = std::next(route.begin()); node_iter != route.end_depot();
+                 ++node_iter, ++position) {
+                auto vertex_id = node_iter->vertex_id();
+                if (vertex_id >= _neighbors.size()) {
+                    throw std::out_of_range("Solution contains a vertex without relatedness row");
+                }
+                _node_locations.emplace_back(route_index, position);
+                _node_vertices.push_back(vertex_id);
+            }
+            ++route_index;
+        }
+
+        // Link nodes of the same vertex. Walk backwards so that each list is in solution order.
+        _first_node_of_vertex.assign(_neighbors.size(), npos);
+        _next_node.assign(_node_vertices.size(), npos);
+        for (size_t node = _node_vertices.size(); node-- > 0;) {
+            _next_node[node] = _first_node_of_vertex[_node_vertices[node]];
+            _first_node_of_vertex[_node_vertices[node]] = node;
+        }
+        _removed.assign(_node_vertices.size(), false);
+    }
+
+    size_t RelatedRemoval::_node_index(const routingblocks::NodeLocation& location) const {
+        return _route_offsets[location.route] + location.position - 1;
+    }
+
+    void RelatedRemoval::_collect_candidates(routingblocks::VertexID seed, moves_t& candidates) {
+        constexpr auto npos = std::numeric_limits<size_t>::max();
+        candidates.clear();
+        ++_listing;
+        for (const auto& [vertex_id, relatedness] : _neighbors[seed]) {
+            if (vertex_id >= _listed_in.size() || _listed_in[vertex_id] == _listing) {
+                continue;
+            }
+            _listed_in[vertex_id] = _listing;
+            for (auto node = _first_node_of_vertex[vertex_id]; node != npos;
+                 node = _next_node[node]) {
+                if (!_removed[node]) {
+                    candidates.push_back({vertex_id, relatedness, _node_locations[node]});
+                }
+            }
+        }
+        // Vertices that are not neighbors of the seed are least related.
+        for (size_t node = 0; node < _node_vertices.size(); ++node) {
+            if (!_removed[node] && _listed_in[_node_vertices[node]] != _listing) {
+                candidates.push_back({_node_vertices[node],
+                                      -std::numeric_limits<double>::infinity(),
+                                      _node_locations[node]});
+            }
+        }
+    }
+
+    std::vector<routingblocks::VertexID> RelatedRemoval::apply(
+        [[maybe_unused]] routingblocks::Evaluation& evaluation, routingblocks::Solution& sol,
+        size_t numberOfRemovedCustomers) {
+        _cache_nodes(sol);
+        if (_node_locations.empty() || numberOfRemovedCustomers > _node_locations.size()) {
+            throw std::runtime_error("Cannot remove more nodes than are in the solution!");
+        }
+
+        auto initial_seed = _initial_seed_selector(_node_locations);
+        if (initial_seed >= _node_locations.size()) {
+            throw std::out_of_range("Initial seed selector returned an invalid index");
+        }
+        _removed[initial_seed] = true;
+        moves_t removed_moves{
+            {_node_vertices[initial_seed], 1.0, _node_locations[initial_seed]}};
+        removed_moves.reserve(numberOfRemovedCustomers);
+
+        moves_t candidates;
+        while (removed_moves.size() < numberOfRemovedCustomers) {
+            auto cluster_size
+                = std::min(numberOfRemovedCustomers - removed_moves.size(), _cluster_size);
+            auto seed = _seed_selector(removed_moves);
+            if (seed >= removed_moves.size()) {
+                throw std::out_of_range("Seed selector returned an invalid index");
+            }
+            _collect_candidates(removed_moves[seed].vertex_id, candidates);
+            for (size_t i = 0; i < cluster_size; ++i) {
+                auto selected = _move_selector(candidates);
+                if (selected >= candidates.size()) {
+                    throw std::out_of_range("Move selector returned an invalid index");
+                }
+                _removed[_node_index(candidates[selected].location)] = true;
+                removed_moves.push_back(candidates[selected]);
+                candidates.erase(std::next(candidates.begin(), selected));
+            }
+        }
+
+        std::vector<routingblocks::NodeLocation> locations;
+        std::vector<routingblocks::VertexID> removed_vertices;
+        locations.reserve(removed_moves.size());
+        removed_vertices.reserve(removed_moves.size());
+        for (const auto& move : removed_moves) {
+            locations.push_back(move.location);
+            removed_vertices.push_back(move.vertex_id);
+        }
+        sol.remove_vertices(locations.begin(), locations.end());
+        return removed_vertices;
+    }
+
+    std::string_view RelatedRemoval::name() const { return "RelatedRemovalOperator"; }
+
+    bool RelatedRemoval::can_apply_to(const routingblocks::Solution& sol) const {
+        return sol.size() > 0;
+    }
+
     void RandomInsertion::apply([[maybe_unused]] routingblocks::Evaluation& evaluation,
                                 routingblocks::Solution& sol,
                                 const std::vector<routingblocks::VertexID>& missing_vertices) {
@@ -17,8 +17,9 @@
 # IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
-from ._routingblocks import AdaptiveLargeNeighborhood, Random, DestroyOperator, RepairOperator, Evaluation, Solution
-from typing import Tuple, Iterator
+from ._routingblocks import AdaptiveLargeNeighborhood, Random, DestroyOperator, RepairOperator, Evaluation, Solution, \
+    LNSIteration
+from typing import Tuple, Iterator, List, Optional, Callable
 
 
 class LargeNeighborhood:
@@ -29,7 +30,8 @@ class LargeNeighborhood:
     remove a number of vertices from the solution, while the repair operator is used to re-insert the removed vertices
     into the solution.
 
-    Destroy and repair operators are selected uniformly from a pool of registered operators.
+    Destroy and repair operators are selected uniformly from a pool of registered operators, unless a fixed weight is
+    assigned to an operator using :meth:`set_destroy_operator_weight` or :meth:`set_repair_operator_weight`.
     """
 
     def __init__(self, randgen: Random) -> None:
@@ -69,6 +71,59 @@ class LargeNeighborhood:
         """
         return self._alns.generate(evaluation, solution, number_of_vertices_to_remove)
 
+    def run(self, evaluation: Evaluation, initial_solution: Solution, num_iterations: int,
+            number_of_vertices_to_remove: int, time_limit: Optional[float] = None,
+            on_improvement: Optional[Callable[[Solution], None]] = None) -> Tuple[Solution, List[LNSIteration]]:
+        """
+        Run the LNS for a number of iterations. Each iteration generates a new solution from the current one and
+        accepts it if it is cheaper. The loop runs in native code with the GIL released; operators implemented in
+        python re-acquire it when invoked. The initial solution is not modified.
+
+        :param evaluation: The evaluation function to use.
+        :param initial_solution: The solution to start from.
+        :param num_iterations: The number of destroy/repair iterations.
+        :param number_of_vertices_to_remove: The number of vertices to remove in each iteration.
+        :param time_limit: Stop after this many seconds, even if fewer than num_iterations iterations ran.
+        :param on_improvement: Called with a copy of every accepted solution.
+        :return: A tuple containing the best solution found and the statistics of each iteration.
+        """
+        return self._alns.run(evaluation, initial_solution, num_iterations, number_of_vertices_to_remove,
+                              time_limit=time_limit, on_improvement=on_improvement)
+
+    def set_destroy_operator_weight(self, destroy_operator: DestroyOperator, weight: float) -> None:
+        """
+        Set the selection weight of a registered destroy operator. Operators with weight 0 are never selected.
+
+        :param destroy_operator: The operator to reweigh.
+        :param weight: The new, non-negative weight.
+        """
+        self._alns.set_destroy_operator_weight(destroy_operator, weight)
+
+    def set_repair_operator_weight(self, repair_operator: RepairOperator, weight: float) -> None:
+        """
+        Set the selection weight of a registered repair operator. Operators with weight 0 are never selected.
+
+        :param repair_operator: The operator to reweigh.
+        :param weight: The new, non-negative weight.
+        """
+        self._alns.set_repair_operator_weight(repair_operator, weight)
+
+    def get_destroy_operator_weight(self, destroy_operator: DestroyOperator) -> float:
+        """
+        Get the selection weight of a registered destroy operator.
+
+        :param destroy_operator: The operator.
+        """
+        return self._alns.get_destroy_operator_weight(destroy_operator)
+
+    def get_repair_operator_weight(self, repair_operator: RepairOperator) -> float:
+        """
+        Get the selection weight of a registered repair operator.
+
+        :param repair_operator: The operator.
+        """
+        return self._alns.get_repair_operator_weight(repair_operator)
+
     def remove_destroy_operator(self, destroy_operator: DestroyOperator) -> None:
         """
         Remove a destroy operator.
@@ -26,7 +26,7 @@ from .cluster_removal import ClusterRemovalOperator, DistanceBasedClusterMemberS
     SeedSelector
 from .station_vicinity_removal import StationVicinityRemovalOperator, StationSeedSelector
 from .related_removal import RelatedRemovalOperator, MoveSelector, RelatedVertexRemovalMove, \
-    build_relatedness_matrix
+    build_relatedness_matrix, RelatedNeighbors
 from .._routingblocks import _RandomRemovalOperator as RandomRemovalOperator, \
     _RandomInsertionOperator as RandomInsertionOperator
 from .._routingblocks.operators import *
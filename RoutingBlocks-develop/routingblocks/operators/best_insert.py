@@ -17,7 +17,7 @@
 # IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
-from typing import List, Iterable, Callable, TypeVar
+from typing import List, Iterable, Callable, TypeVar, Optional
 
 import routingblocks
 
@@ -37,14 +37,19 @@ class BestInsertionOperator(routingblocks.RepairOperator):
     selection process.
     """
 
-    def __init__(self, instance: routingblocks.Instance, move_selector: MoveSelector[routingblocks.InsertionMove]):
+    def __init__(self, instance: routingblocks.Instance, move_selector: MoveSelector[routingblocks.InsertionMove],
+                 arc_set: Optional[routingblocks.ArcSet] = None, number_of_threads: int = 1):
         """
         :param instance: The problem instance
         :param move_selector: The move selector used to choose the next insertion position
+        :param arc_set: Optional granular neighborhood. If passed, vertices are only inserted next to vertices they
+            share an arc of the set with, or next to a depot. Typically the same arc set as used by the local search.
+        :param number_of_threads: Number of threads used to evaluate the insertions of different vertices
         """
         routingblocks.RepairOperator.__init__(self)
         self._instance = instance
-        self._move_cache = routingblocks.InsertionCache(self._instance)
+        self._move_cache = routingblocks.InsertionCache(self._instance, arc_set)
+        self._move_cache.number_of_threads = number_of_threads
         # Exposed
         self.move_selector = move_selector
 
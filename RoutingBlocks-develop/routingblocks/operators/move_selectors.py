@@ -21,9 +21,16 @@ from typing import Iterable, TypeVar, Protocol, Generic
 from collections.abc import Sequence
 
 import routingblocks
+from .._routingblocks import _RemovalMoveSequence, _InsertionMoveSequence, _VertexInsertionMoveSequence
 
 T = TypeVar('T')
 
+# The lazy move sequences of the removal and insertion caches support len() and indexing, so selectors can pick a
+# move without converting the whole sequence to python objects.
+Sequence.register(_RemovalMoveSequence)
+Sequence.register(_InsertionMoveSequence)
+Sequence.register(_VertexInsertionMoveSequence)
+
 
 class MoveSelector(Protocol[T]):
     """
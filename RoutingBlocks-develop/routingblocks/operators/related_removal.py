@@ -18,32 +18,19 @@
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 from __future__ import annotations
-from typing import List, Callable, Set, Tuple
+from typing import List, Callable, Dict, Sequence, Union
+
+import collections.abc
 
 from .move_selectors import MoveSelector
-from dataclasses import dataclass
 
 import routingblocks
+from .._routingblocks import _RelatedRemovalOperator, _RelatedVertexRemovalMove as RelatedVertexRemovalMove, \
+    _RelatedVertexRemovalMoveSequence, _NodeLocationSequence
 
-
-@dataclass(frozen=True)
-class RelatedVertexRemovalMove:
-    """
-    :ivar vertex_id: The id of the corresponding vertex.
-    :ivar relatedness: The relatedness of the vertex to the seed vertex.
-    :ivar location: The location of the vertex in the solution.
-    """
-    vertex_id: int
-    relatedness: float
-    location: routingblocks.NodeLocation
-
-    def __hash__(self):
-        return hash((self.vertex_id, self.location.route, self.location.position))
-
-    def __eq__(self, other):
-        return self.vertex_id == other.vertex_id and \
-            self.location.route == other.location.route and \
-            self.location.position == other.location.position
+# Lets selectors such as random_selector_factory index the sequences passed to them instead of copying them.
+collections.abc.Sequence.register(_RelatedVertexRemovalMoveSequence)
+collections.abc.Sequence.register(_NodeLocationSequence)
 
 
 def build_relatedness_matrix(instance: routingblocks.Instance, relatedness_computer: Callable[[int, int], float]) -> \
@@ -66,7 +53,47 @@ def build_relatedness_matrix(instance: routingblocks.Instance, relatedness_compu
     return matrix
 
 
-class RelatedRemovalOperator(routingblocks.DestroyOperator):
+class _RelatedRow:
+    """
+    Row of a :py:class:`RelatedNeighbors` index. Vertices that are not among the related neighbors have a relatedness
+    of -inf.
+    """
+
+    def __init__(self, relatedness: Dict[int, float]):
+        self._relatedness = relatedness
+
+    def __getitem__(self, vertex_id: int) -> float:
+        return self._relatedness.get(vertex_id, float('-inf'))
+
+
+class RelatedNeighbors:
+    """
+    Sparse alternative to a dense relatedness matrix that stores only the k most related vertices of each vertex.
+    Vertices that are not among the k most related ones are treated as least related. Rows may be lists or numpy
+    arrays, e.g., the result of ``numpy.argpartition`` on a dense relatedness matrix.
+    """
+
+    def __init__(self, neighbors: Sequence[Sequence[int]], relatedness: Sequence[Sequence[float]]):
+        """
+        :param neighbors: ``neighbors[i]`` lists the ids of the vertices most related to vertex ``i``.
+        :param relatedness: ``relatedness[i][j]`` is the relatedness of vertex ``neighbors[i][j]`` to vertex ``i``.
+        """
+        if len(neighbors) != len(relatedness):
+            raise ValueError("neighbors and relatedness must have the same number of rows")
+        self._neighbors = neighbors
+        self._relatedness = relatedness
+
+    def __len__(self) -> int:
+        return len(self._neighbors)
+
+    def __getitem__(self, vertex_id: int) -> _RelatedRow:
+        return _RelatedRow(dict(zip(map(int, self._neighbors[vertex_id]), map(float, self._relatedness[vertex_id]))))
+
+
+Relatedness = Union[Sequence[Sequence[float]], RelatedNeighbors]
+
+
+class RelatedRemovalOperator(_RelatedRemovalOperator):
     """
     Removes related vertices from the solution. The operator first selects an initial seed vertex.
     Then, it selects the n most related vertices to the current seed vertex and adds them to the list of removed vertices.
@@ -75,95 +102,39 @@ class RelatedRemovalOperator(routingblocks.DestroyOperator):
 
     The operator determines related vertices by using a relatedness matrix passed to the constructor.
     This matrix contains a number that measures the degree of the relatedness between each pair of vertices.
-    The higher the number, the more related the vertices are.
+    The higher the number, the more related the vertices are. Instead of a dense matrix (a list of lists or a 2D numpy
+    array), a :py:class:`RelatedNeighbors` index that stores only the most related vertices can be passed.
+
+    (Initial) seed and related vertex selection is done using move selectors. The selectors receive read-only
+    sequences and have to return one of their elements. The sequences are only valid during the selector call, their
+    elements are copies that may be kept.
 
-    (Initial) seed and related vertex selection is done using move selectors.
+    The operator is implemented natively: the rows of the relatedness matrix are sorted once on construction, so
+    selecting related vertices does not sort the solution for every seed.
     """
 
-    def __init__(self, relatedness_matrix: List[List[float]],
+    def __init__(self, relatedness_matrix: Relatedness,
                  move_selector: MoveSelector[RelatedVertexRemovalMove],
                  seed_selector: MoveSelector[RelatedVertexRemovalMove],
-                 initial_seed_selector: MoveSelector[routingblocks.Node],
+                 initial_seed_selector: MoveSelector[routingblocks.NodeLocation],
                  cluster_size: int = 1):
         """
 
-        :param relatedness_matrix: The relatedness matrix. See :py:func:`build_relatedness_matrix` for a way to build such a matrix.
-        :param move_selector: The move selector to use for selecting the vertex to remove. Receives a list of related vertices, ordered by the degree of relatedness in descending order.
-        :param seed_selector: The move selector to use for selecting the seed vertex.
-        :param initial_seed_selector: The move selector to use for selecting the initial seed vertex.
+        :param relatedness_matrix: The relatedness matrix. See :py:func:`build_relatedness_matrix` for a way to build such a matrix. May also be a 2D numpy array or a :py:class:`RelatedNeighbors` index.
+        :param move_selector: The move selector to use for selecting the vertex to remove. Receives a sequence of related vertices, ordered by the degree of relatedness in descending order. Vertices of equal relatedness keep the order of the relatedness matrix row.
+        :param seed_selector: The move selector to use for selecting the seed vertex. Receives the vertices removed so far.
+        :param initial_seed_selector: The move selector to use for selecting the initial seed vertex. Receives the locations of all non-depot nodes in the solution.
         :param cluster_size: The number of related vertices to remove for each seed.
         """
+        if isinstance(relatedness_matrix, RelatedNeighbors):
+            neighbors = relatedness_matrix._neighbors
+            relatedness = relatedness_matrix._relatedness
+        else:
+            relatedness = relatedness_matrix
+            neighbors = [range(len(row)) for row in relatedness]
         # Important: Do not use super()!
-        routingblocks.DestroyOperator.__init__(self)
-        self._relatedness_matrix = relatedness_matrix
-        self._move_selector = move_selector
-        self._seed_selector = seed_selector
-        self._initial_seed_selector = initial_seed_selector
-        self._cluster_size = cluster_size
-
-        self._nodes_in_solution: List[Tuple[routingblocks.NodeLocation, routingblocks.Node]] = []
-
-    def can_apply_to(self, _solution: routingblocks.Solution) -> bool:
-        return len(_solution) > 0
-
-    def _get_sorted_related_vertices(self, related_vertices: List[float],
-                                     removed_vertices: Set[RelatedVertexRemovalMove]):
-        related_vertices_in_solution = []
-        # Iterate over solution and add entry for each node
-        for node_location, node in self._nodes_in_solution:
-            vertex_id = node.vertex_id
-            candidate = RelatedVertexRemovalMove(vertex_id, related_vertices[vertex_id], node_location)
-            if candidate not in removed_vertices:
-                related_vertices_in_solution.append(candidate)
-
-        # Sort by relatedness
-        related_vertices_in_solution.sort(key=lambda x: x.relatedness, reverse=True)
-        return related_vertices_in_solution
-
-    def _remove_seed_and_related(self, solution: routingblocks.Solution,
-                                 removed_vertices: List[RelatedVertexRemovalMove], num_vertices_to_remove: int):
-        # Pick random node from already removed vertices
-        seed_move = self._seed_selector(removed_vertices)
-        seed_move_id = seed_move.vertex_id
-        # seed_node_id = next(itertools.islice(removed_vertices, self._randgen.randint(0, len(removed_vertices) - 1), None)).vertex_id
-        # Get related vertices
-        related_vertices = self._get_sorted_related_vertices(self._relatedness_matrix[seed_move_id], removed_vertices)
-        # Select related vertices to remove
-        for _ in range(num_vertices_to_remove):
-            next_vertex = self._move_selector(related_vertices)
-            removed_vertices.append(next_vertex)
-            related_vertices.remove(next_vertex)
-        # Convenience return, actually modifies in-place
-        return removed_vertices
-
-    def _select_initial_seed(self, _solution: routingblocks.Solution) -> routingblocks.NodeLocation:
-        return self._initial_seed_selector(x[0] for x in self._nodes_in_solution)
-
-    def _cache_nodes_in_solution(self, solution: routingblocks.Solution):
-        for node_location in solution.non_depot_nodes:
-            self._nodes_in_solution.append((node_location, solution[node_location.route][node_location.position]))
-
-    def apply(self, evaluation: routingblocks.Evaluation, _solution: routingblocks.Solution,
-              number_of_removed_vertices: int) -> List[
-        int]:
-        # Cache nodes in the solution with their locations
-        self._cache_nodes_in_solution(_solution)
-        # Select seed node
-        initial_seed_location = self._select_initial_seed(_solution)
-        # seed_node_location = routingblocks.sample_locations(_solution, self._randgen, 1, False)[0]
-        seed_node = _solution[initial_seed_location.route][initial_seed_location.position]
-        # Initialize removed vertices
-        removed_vertices = [RelatedVertexRemovalMove(seed_node.vertex_id, 1.0, initial_seed_location)]
-        # Remove related
-        while len(removed_vertices) < number_of_removed_vertices:
-            num_vertices_to_remove = min(number_of_removed_vertices - len(removed_vertices), self._cluster_size)
-            removed_vertices = self._remove_seed_and_related(_solution, removed_vertices,
-                                                             num_vertices_to_remove)
-        # Remove vertices
-        _solution.remove_vertices([move.location for move in removed_vertices])
-        # Clear the cache
-        self._nodes_in_solution.clear()
-        return [move.vertex_id for move in removed_vertices]
+        _RelatedRemovalOperator.__init__(self, neighbors, relatedness, move_selector, seed_selector,
+                                         initial_seed_selector, cluster_size)
 
     def name(self) -> str:
         return self.__class__.__name__
@@ -36,14 +36,21 @@ class WorstRemovalOperator(routingblocks.DestroyOperator):
     selection process.
     """
 
-    def __init__(self, instance: routingblocks.Instance, move_selector: MoveSelector[routingblocks.RemovalMove]):
+    def __init__(self, instance: routingblocks.Instance, move_selector: MoveSelector[routingblocks.RemovalMove],
+                 number_of_threads: int = 1, incremental: bool = False):
         """
         :param instance: The problem instance
         :param routingblocks.operators.MoveSelector[routingblocks.RemovalMove] move_selector: The move selector used to choose the next vertex to remove
+        :param number_of_threads: Number of threads used to evaluate the removal moves of different routes
+        :param incremental: Keep the removal moves of routes that are unchanged since the last application instead of
+            re-evaluating every route. Only valid if the parameters of the evaluation, e.g., penalty factors, do not
+            change between applications.
         """
         routingblocks.DestroyOperator.__init__(self)
         self._instance = instance
         self._move_cache = routingblocks.RemovalCache(self._instance)
+        self._move_cache.number_of_threads = number_of_threads
+        self._incremental = incremental
         # Exposed
         self.move_selector = move_selector
 
@@ -56,7 +63,11 @@ class WorstRemovalOperator(routingblocks.DestroyOperator):
     def apply(self, evaluation: routingblocks.Evaluation, _solution: routingblocks.Solution,
               number_of_removed_vertices: int) -> List[
         int]:
-        self._move_cache.rebuild(evaluation, _solution)
+        if self._incremental:
+            # Only routes that changed since the last application are re-evaluated
+            self._move_cache.update(evaluation, _solution)
+        else:
+            self._move_cache.rebuild(evaluation, _solution)
         removed_vertices = []
         while len(removed_vertices) < number_of_removed_vertices:
             # Choose the next removed vertex
@@ -0,0 +1,125 @@
+# Copyright (c) 2023 Patrick S. Klein (@libklein)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of
+# this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from __future__ import annotations
+
+import random
+from itertools import islice
+from typing import List
+
+import pytest
+
+from fixtures import *
+
+import routingblocks
+from routingblocks import niftw
+
+from .reference.insertion_cache import InsertionCache
+
+
+@pytest.fixture(
+    params=['python', 'cpp']
+)
+def insertion_cache_factory(request):
+    if request.param == 'python':
+        return InsertionCache
+    elif request.param == 'cpp':
+        return routingblocks.InsertionCache
+
+
+def moves_in_order(cache):
+    if isinstance(cache, InsertionCache):
+        return cache.best_moves
+    return cache.moves_in_order
+
+
+def benchmark_insertion_cache_iterate(cache):
+    for _ in moves_in_order(cache):
+        pass
+
+
+def benchmark_insertion_cache_top(cache, k: int):
+    return list(islice(moves_in_order(cache), k))
+
+
+@pytest.fixture
+def instance_evaluation_solution(instance_parser, random_solution_factory):
+    replenishment_time = 0.
+    storage_capacity = 170.
+    battery_capacity = 170.
+
+    py_instance, instance = instance_parser('r101_21.txt')
+
+    evaluation = niftw.Evaluation(battery_capacity, storage_capacity, replenishment_time)
+    randgen = random.Random(0)
+    customers = list(instance.customers)
+    # Keep a third of the customers out of the solution, these are tracked by the cache
+    randgen.shuffle(customers)
+    number_of_missing = len(customers) // 3
+    solution = random_solution_factory(instance, evaluation, vertices=customers[number_of_missing:], randgen=randgen)
+    return instance, evaluation, solution, [vertex.vertex_id for vertex in customers[:number_of_missing]]
+
+
+@pytest.mark.benchmark(group="insertion_cache_iterate")
+def test_benchmark_insertion_cache_iterate(instance_evaluation_solution, benchmark, insertion_cache_factory):
+    instance, evaluation, solution, missing_vertices = instance_evaluation_solution
+
+    cache = insertion_cache_factory(instance)
+    cache.rebuild(evaluation, solution, missing_vertices)
+
+    benchmark(benchmark_insertion_cache_iterate, cache=cache)
+
+
+@pytest.mark.benchmark(group="insertion_cache_top")
+def test_benchmark_insertion_cache_top(instance_evaluation_solution, benchmark, insertion_cache_factory):
+    instance, evaluation, solution, missing_vertices = instance_evaluation_solution
+
+    cache = insertion_cache_factory(instance)
+    cache.rebuild(evaluation, solution, missing_vertices)
+
+    moves = benchmark(benchmark_insertion_cache_top, cache=cache, k=10)
+    assert len(moves) == 10
+    assert all(pred.delta_cost <= succ.delta_cost for pred, succ in zip(moves, moves[1:]))
+
+
+@pytest.mark.benchmark(group="insertion_cache_last")
+def test_benchmark_insertion_cache_last(instance_evaluation_solution, benchmark, insertion_cache_factory):
+    instance, evaluation, solution, missing_vertices = instance_evaluation_solution
+
+    cache = insertion_cache_factory(instance)
+    cache.rebuild(evaluation, solution, missing_vertices)
+
+    # Walks the entire merge but converts a single move
+    last_move = benchmark(lambda: list(moves_in_order(cache))[-1] if isinstance(cache, InsertionCache)
+                          else cache.moves_in_order[-1])
+    assert last_move.delta_cost == max(move.delta_cost for move in moves_in_order(cache))
+
+
+@pytest.mark.benchmark(group="insertion_cache_merge")
+@pytest.mark.parametrize("merge", ["heap", "linear"])
+def test_benchmark_insertion_cache_merge(instance_evaluation_solution, benchmark, merge):
+    instance, evaluation, solution, missing_vertices = instance_evaluation_solution
+
+    cache = routingblocks.InsertionCache(instance)
+    cache.rebuild(evaluation, solution, missing_vertices)
+    moves = cache.moves_in_order if merge == "heap" else cache._moves_in_order_linear_scan
+
+    # Indexing the last move walks the entire merge natively and converts a single move
+    last_move = benchmark(lambda: moves[-1])
+    assert last_move.delta_cost == max(move.delta_cost for move in cache.moves_in_order)
@@ -139,6 +139,44 @@ def mock_evaluation():
     return MockEvaluation()
 
 
+class VertexIdDistanceEvaluation(routingblocks.PyConcatenationBasedEvaluation):
+    """
+    Python evaluation whose labels are plain floats: the cost of a route is the sum of |i - j| over its arcs (i, j).
+    """
+
+    def __init__(self):
+        routingblocks.PyConcatenationBasedEvaluation.__init__(self)
+
+    def propagate_forward(self, pred_label: float, pred_vertex, vertex, arc) -> float:
+        return pred_label + abs(pred_vertex.vertex_id - vertex.vertex_id)
+
+    def propagate_backward(self, succ_label: float, succ_vertex, vertex, arc) -> float:
+        return succ_label + abs(succ_vertex.vertex_id - vertex.vertex_id)
+
+    def create_forward_label(self, vertex) -> float:
+        return 0.
+
+    def create_backward_label(self, vertex) -> float:
+        return 0.
+
+    def concatenate(self, fwd_label: float, bwd_label: float, vertex) -> float:
+        return fwd_label + bwd_label
+
+    def compute_cost(self, label: float) -> float:
+        return label
+
+    def is_feasible(self, label: float) -> bool:
+        return True
+
+    def get_cost_components(self, label: float) -> List[float]:
+        return [label]
+
+
+@pytest.fixture
+def python_evaluation():
+    return VertexIdDistanceEvaluation()
+
+
 def assert_forward_propagations(operations, expected_propagations):
     forward_propagations = [x for x in operations if isinstance(x, MockEvaluation.ForwardEvaluationCall)]
 
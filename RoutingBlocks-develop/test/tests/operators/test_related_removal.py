@@ -18,11 +18,15 @@
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 from typing import List
+import collections.abc
 import math
+import random
 import pytest
 
 import routingblocks
-from routingblocks.operators.related_removal import RelatedVertexRemovalMove, RelatedRemovalOperator
+from routingblocks.operators.related_removal import RelatedVertexRemovalMove, RelatedRemovalOperator, \
+    RelatedNeighbors
+from routingblocks.operators.move_selectors import first_move_selector, last_move_selector, random_selector_factory
 from fixtures import *
 
 
@@ -70,6 +74,18 @@ def create_relatedness_matrix(instance, expected_moves: List[RelatedVertexRemova
     return relatedness_matrix
 
 
+def to_related_neighbors(relatedness_matrix, k: int) -> RelatedNeighbors:
+    neighbors = [sorted(range(len(row)), key=lambda j: -row[j])[:k] for row in relatedness_matrix]
+    return RelatedNeighbors(neighbors, [[row[j] for j in row_neighbors]
+                                        for row, row_neighbors in zip(relatedness_matrix, neighbors)])
+
+
+def to_numpy(relatedness_matrix):
+    np = pytest.importorskip("numpy")
+    return np.asarray(relatedness_matrix)
+
+
+@pytest.mark.parametrize('matrix_kind', ['dense', 'numpy', 'neighbors'])
 @pytest.mark.parametrize('cluster_size', [1, 2])
 @pytest.mark.parametrize('raw_routes,expected_moves', [
     ([
@@ -90,7 +106,7 @@ def create_relatedness_matrix(instance, expected_moves: List[RelatedVertexRemova
      ], [routingblocks.NodeLocation(0, 2), routingblocks.NodeLocation(1, 2), routingblocks.NodeLocation(1, 3),
          routingblocks.NodeLocation(1, 1)])
 ])
-def test_related_remove(instance, mock_evaluation, cluster_size, raw_routes, expected_moves):
+def test_related_remove(instance, mock_evaluation, cluster_size, raw_routes, expected_moves, matrix_kind):
     py_instance, instance = instance
 
     solution = create_solution(instance, mock_evaluation, raw_routes)
@@ -101,6 +117,10 @@ def test_related_remove(instance, mock_evaluation, cluster_size, raw_routes, exp
         RelatedVertexRemovalMove(solution[x.route][x.position].vertex_id, 1., x) for x in expected_moves]
 
     relatedness_matrix = create_relatedness_matrix(instance, expected_moves, cluster_size)
+    if matrix_kind == 'numpy':
+        relatedness_matrix = to_numpy(relatedness_matrix)
+    elif matrix_kind == 'neighbors':
+        relatedness_matrix = to_related_neighbors(relatedness_matrix, cluster_size)
     mock_initial_seed_selector = MockInitialSeedSelector(expected_moves[0].location)
     mock_seed_selector = MockSeedSelector(expected_moves, cluster_size)
     mock_move_selector = MockMoveSelector()
@@ -114,3 +134,78 @@ def test_related_remove(instance, mock_evaluation, cluster_size, raw_routes, exp
     assert mock_seed_selector.num_calls == math.ceil((len(expected_moves) - 1) / cluster_size)
     # Move selector should be classed once for each vertex to remove except the first one
     assert mock_move_selector.calls == len(expected_moves) - 1
+
+
+def test_related_neighbors():
+    neighbors = RelatedNeighbors([[1, 2], [0, 2], [1, 0]], [[2., 1.], [5., 3.], [4., -1.]])
+    assert len(neighbors) == 3
+    assert neighbors[0][1] == 2.
+    assert neighbors[2][0] == -1.
+    assert neighbors[0][0] == float('-inf')
+
+    with pytest.raises(ValueError):
+        RelatedNeighbors([[1, 2]], [])
+
+
+def test_related_remove_selects_most_related(large_instance, mock_evaluation):
+    py_instance, instance = large_instance
+    rng = random.Random(42)
+    n = instance.number_of_vertices
+    relatedness_matrix = [[rng.random() for _ in range(n)] for _ in range(n)]
+    customers = [vertex.vertex_id for vertex in instance.customers]
+    raw_routes = [customers[i:i + 5] for i in range(0, len(customers), 5)]
+    cluster_size = 3
+    number_of_vertices_to_remove = 10
+
+    solution = create_solution(instance, mock_evaluation, raw_routes)
+    operator = RelatedRemovalOperator(relatedness_matrix, first_move_selector, last_move_selector,
+                                      first_move_selector, cluster_size=cluster_size)
+    assert operator.name() == "RelatedRemovalOperator"
+    removed_vertices = operator.apply(mock_evaluation, solution, number_of_vertices_to_remove)
+
+    # Seed is always the most recently removed vertex, candidates are the most related remaining customers
+    expected = [customers[0]]
+    while len(expected) < number_of_vertices_to_remove:
+        seed = expected[-1]
+        remaining = sorted((v for v in customers if v not in expected), key=lambda v: -relatedness_matrix[seed][v])
+        expected.extend(remaining[:min(cluster_size, number_of_vertices_to_remove - len(expected))])
+    assert removed_vertices == expected
+    assert sorted(v.vertex_id for route in solution for v in route if not v.vertex.is_depot) == \
+           sorted(set(customers) - set(expected))
+
+
+def test_related_remove_passes_sequences(instance, mock_evaluation):
+    py_instance, instance = instance
+    solution = create_solution(instance, mock_evaluation, [[1, 2], [3, 4, 5]])
+    n = instance.number_of_vertices
+    relatedness_matrix = [[0.] * n for _ in range(n)]
+    seen, picked = [], []
+
+    def move_selector(moves):
+        assert isinstance(moves, collections.abc.Sequence)
+        assert list(moves) == [moves[i] for i in range(len(moves))]
+        seen.append((moves, len(moves)))
+        picked.append(moves[-1])
+        return moves[-1]
+
+    operator = RelatedRemovalOperator(relatedness_matrix, move_selector, random_selector_factory(routingblocks.Random(1)),
+                                      random_selector_factory(routingblocks.Random(1)))
+    removed_vertices = operator.apply(mock_evaluation, solution, 3)
+    assert len(set(removed_vertices)) == 3
+    assert [length for _, length in seen] == [4, 3]
+    # Sequences are only valid during the selector call, the picked elements are copies and stay valid
+    for moves, _ in seen:
+        with pytest.raises(RuntimeError):
+            len(moves)
+        with pytest.raises(RuntimeError):
+            moves[0]
+    assert [move.vertex_id for move in picked] == removed_vertices[1:]
+
+    def foreign_move_selector(moves):
+        return RelatedVertexRemovalMove(1, 0., routingblocks.NodeLocation(5, 5))
+
+    operator = RelatedRemovalOperator(relatedness_matrix, foreign_move_selector, first_move_selector,
+                                      first_move_selector)
+    solution = create_solution(instance, mock_evaluation, [[1, 2], [3, 4, 5]])
+    with pytest.raises(ValueError):
+        operator.apply(mock_evaluation, solution, 2)
@@ -0,0 +1,61 @@
+# Copyright (c) 2023 Patrick S. Klein (@libklein)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of
+# this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from __future__ import annotations
+
+import pytest
+
+from fixtures import *
+
+try:
+    import routingblocks as alns
+    from routingblocks import adptw
+except ModuleNotFoundError:
+    pass
+
+
+def removal_costs(moves) -> list[float]:
+    return sorted(move.delta_cost for move in moves)
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_worst_removal_penalty_factor_change(large_instance, random_solution_factory, incremental):
+    py_instance, instance = large_instance
+    evaluation = adptw.Evaluation(py_instance.parameters.battery_capacity_time, py_instance.parameters.capacity)
+    solution = random_solution_factory(instance, evaluation, list(instance.customers), n_routes=3,
+                                       randgen=random.Random(1))
+    operator = alns.operators.WorstRemovalOperator(instance, alns.operators.first_move_selector,
+                                                   incremental=incremental)
+    operator.apply(evaluation, solution.copy(), 1)
+
+    evaluation.overload_penalty_factor *= 100.
+    evaluation.resource_penalty_factor *= 100.
+    evaluation.time_shift_penalty_factor *= 100.
+    candidate = solution.copy()
+    operator.apply(evaluation, candidate, 1)
+
+    reference_cache = alns.RemovalCache(instance)
+    reference_cache.rebuild(evaluation, candidate)
+    if incremental:
+        # Moves of the untouched routes are still costed with the old penalty factors
+        assert removal_costs(operator._move_cache.moves_in_order) != \
+               pytest.approx(removal_costs(reference_cache.moves_in_order))
+    else:
+        assert removal_costs(operator._move_cache.moves_in_order) == \
+               pytest.approx(removal_costs(reference_cache.moves_in_order))
@@ -19,6 +19,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Sequence
 from copy import copy
 from itertools import islice
 
@@ -165,3 +166,120 @@ def test_insertion_cache_update(instance, vertices_to_insert, raw_routes):
         cache.invalidate_route(solution[insertion_point.route], insertion_point.route)
         expected_cache.rebuild(evaluation, solution, vertices_to_insert)
         assert_cache_equal(instance=instance, solution=solution, cache1=cache, cache2=expected_cache)
+
+
+def test_insertion_cache_move_sequences(instance):
+    py_instance, instance = instance
+    evaluation = niftw.Evaluation(py_instance.parameters.battery_capacity_time, py_instance.parameters.capacity,
+                                  0.0)
+    cache = InsertionCache(instance)
+    solution = build_solution(evaluation, instance, [[1, 6, 3], [8, 2, 7]])
+    cache.rebuild(evaluation, solution, [4, 5])
+
+    for moves, expected_length in ((cache.moves_in_order, 16), (cache.get_best_insertions_for_vertex(4), 8)):
+        assert isinstance(moves, Sequence)
+        materialized = list(moves)
+        assert len(moves) == len(materialized) == expected_length
+        assert [moves[i] for i in range(len(moves))] == materialized
+        assert moves[-1] == materialized[-1]
+        assert moves.top(3) == materialized[:3]
+        with pytest.raises(IndexError):
+            moves[expected_length]
+
+    # Per-vertex sequences reflect later changes of the cache
+    moves = cache.get_best_insertions_for_vertex(5)
+    solution.insert_vertex_after(alns.NodeLocation(0, 0), 4)
+    cache.invalidate_route(solution[0], 0)
+    assert len(moves) == 9
+    assert list(moves) == list(cache.get_best_insertions_for_vertex(5))
+
+
+def test_insertion_cache_linear_scan_merge(large_instance):
+    py_instance, instance = large_instance
+    evaluation = niftw.Evaluation(py_instance.parameters.battery_capacity_time, py_instance.parameters.capacity,
+                                  0.0)
+    customers = [vertex.vertex_id for vertex in instance.customers]
+    tracked, routed = customers[::3], [x for x in customers if x not in customers[::3]]
+    cache = InsertionCache(instance)
+    solution = build_solution(evaluation, instance, [routed[i:i + 4] for i in range(0, len(routed), 4)])
+    cache.rebuild(evaluation, solution, tracked)
+
+    def as_keys(moves):
+        return sorted((move.vertex_id, move.after_node.route, move.after_node.position) for move in moves)
+
+    heap_merged, linear_merged = list(cache.moves_in_order), list(cache._moves_in_order_linear_scan)
+    # Both merges yield the same moves in the same cost order, only ties may be ordered differently
+    assert [move.delta_cost for move in heap_merged] == [move.delta_cost for move in linear_merged]
+    assert as_keys(heap_merged) == as_keys(linear_merged)
+    assert len(cache._moves_in_order_linear_scan) == len(heap_merged)
+
+
+def test_insertion_cache_granular(instance):
+    py_instance, instance = instance
+    evaluation = niftw.Evaluation(py_instance.parameters.battery_capacity_time, py_instance.parameters.capacity,
+                                  0.0)
+    solution = build_solution(evaluation, instance, [[1, 6, 3], [8, 2, 7]])
+    full_cache = InsertionCache(instance)
+    full_cache.rebuild(evaluation, solution, [4, 5])
+
+    # Allowing every arc considers every position
+    all_arcs = alns.ArcSet(instance.number_of_vertices)
+    cache = InsertionCache(instance, all_arcs)
+    cache.rebuild(evaluation, solution, [4, 5])
+    assert len(cache.moves_in_order) == len(full_cache.moves_in_order)
+    assert_cache_equal(instance, solution, cache, full_cache)
+
+    # Only (6, 4) and (5, 8) remain. Positions next to depots are always considered.
+    arcs = alns.ArcSet(instance.number_of_vertices)
+    for i in range(instance.number_of_vertices):
+        for j in range(instance.number_of_vertices):
+            arcs.forbid_arc(i, j)
+    arcs.include_arc(6, 4)
+    arcs.include_arc(5, 8)
+    cache = InsertionCache(instance, arcs)
+    cache.rebuild(evaluation, solution, [4, 5])
+
+    def locations(moves):
+        return sorted((move.after_node.route, move.after_node.position) for move in moves)
+
+    assert locations(cache.get_best_insertions_for_vertex(4)) == [(0, 0), (0, 2), (0, 3), (1, 0), (1, 3)]
+    assert locations(cache.get_best_insertions_for_vertex(5)) == [(0, 0), (0, 3), (1, 0), (1, 3)]
+    granular_locations = locations(cache.get_best_insertions_for_vertex(4))
+    expected = [move for move in full_cache.get_best_insertions_for_vertex(4)
+                if (move.after_node.route, move.after_node.position) in granular_locations]
+    assert list(cache.get_best_insertions_for_vertex(4)) == expected
+
+    # Invalidating a route yields the same moves as rebuilding
+    solution.insert_vertex_after(alns.NodeLocation(0, 2), 4)
+    cache.stop_tracking(4)
+    cache.invalidate_route(solution[0], 0)
+    expected_cache = InsertionCache(instance, arcs)
+    expected_cache.rebuild(evaluation, solution, [5])
+    assert list(cache.moves_in_order) == list(expected_cache.moves_in_order)
+
+
+@pytest.mark.parametrize("evaluation_type", ["native", "python"])
+def test_insertion_cache_threads(large_instance, python_evaluation, evaluation_type):
+    py_instance, instance = large_instance
+    evaluation = python_evaluation if evaluation_type == "python" else \
+        niftw.Evaluation(py_instance.parameters.battery_capacity_time, py_instance.parameters.capacity, 0.0)
+    customers = [vertex.vertex_id for vertex in instance.customers]
+    vertices_to_insert = customers[::2]
+    planned = customers[1::2]
+    solution = build_solution(evaluation, instance, [planned[i:i + 3] for i in range(0, len(planned), 3)])
+    cache = InsertionCache(instance)
+    cache.number_of_threads = 4
+    assert cache.number_of_threads == 4
+    expected_cache = InsertionCache(instance)
+
+    cache.rebuild(evaluation, solution, vertices_to_insert)
+    expected_cache.rebuild(evaluation, solution, vertices_to_insert)
+    assert list(cache.moves_in_order) == list(expected_cache.moves_in_order)
+
+    for vertex_id in vertices_to_insert[:5]:
+        best_insertion = cache.get_best_insertions_for_vertex(vertex_id)[0]
+        solution.insert_vertex_after(best_insertion.after_node, vertex_id)
+        for c in (cache, expected_cache):
+            c.stop_tracking(vertex_id)
+            c.invalidate_route(solution[best_insertion.after_node.route], best_insertion.after_node.route)
+        assert list(cache.moves_in_order) == list(expected_cache.moves_in_order)
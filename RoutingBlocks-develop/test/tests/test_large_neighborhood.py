@@ -152,3 +152,192 @@ def test_large_neighborhood_remove(randgen):
     large_neighborhood.remove_repair_operator(repair_operator)
     assert list(large_neighborhood.repair_operators) == []
     assert list(large_neighborhood.destroy_operators) == [destroy_operator]
+
+
+def test_large_neighborhood_run(large_instance, random_solution_factory, randgen):
+    py_instance, instance = large_instance
+    evaluation = evrptw.adptw.Evaluation(py_instance.parameters.battery_capacity_time,
+                                         py_instance.parameters.capacity)
+    solution = random_solution_factory(instance, evaluation, vertices=list(instance.customers))
+    initial_cost = solution.cost
+
+    large_neighborhood = evrptw.AdaptiveLargeNeighborhood(randgen, 0.)
+    large_neighborhood.add_destroy_operator(evrptw.operators.RandomRemovalOperator(randgen))
+    large_neighborhood.add_repair_operator(evrptw.operators.RandomInsertionOperator(randgen))
+
+    best_solution, iterations = large_neighborhood.run(evaluation, solution, 50, 3)
+
+    assert solution.cost == initial_cost
+    assert [x.iteration for x in iterations] == list(range(50))
+    accepted_costs = [x.cost for x in iterations if x.accepted]
+    assert accepted_costs == sorted(accepted_costs, reverse=True)
+    assert len(set(accepted_costs)) == len(accepted_costs)
+    assert best_solution.cost == pytest.approx(min([initial_cost, *accepted_costs]))
+    assert all(x.cost >= best_solution.cost for x in iterations)
+    accepted_fingerprints = [x.fingerprint for x in iterations if x.accepted]
+    assert best_solution.fingerprint == (accepted_fingerprints or [solution.fingerprint])[-1]
+    assert sorted(node.vertex_id for route in best_solution for node in route if not node.vertex.is_depot) \
+           == sorted(x.vertex_id for x in instance.customers)
+
+
+def test_large_neighborhood_run_custom_operators(instance, random_solution_factory, mock_evaluation, randgen):
+    py_instance, instance = instance
+    solution = random_solution_factory(instance, mock_evaluation)
+    large_neighborhood = evrptw.AdaptiveLargeNeighborhood(randgen, 0.)
+
+    destroy_operators = [MockDestroyOperator(0), MockDestroyOperator(1)]
+    repair_operator = MockRepairOperator(0)
+    for destroy_operator in destroy_operators:
+        large_neighborhood.add_destroy_operator(destroy_operator)
+    large_neighborhood.add_repair_operator(repair_operator)
+    large_neighborhood.set_destroy_operator_weight(destroy_operators[1], 0.)
+
+    best_solution, iterations = large_neighborhood.run(mock_evaluation, solution, 10, 1)
+
+    assert len(iterations) == 10
+    assert all(x.destroy_operator is destroy_operators[0] for x in iterations)
+    assert all(x.repair_operator is repair_operator for x in iterations)
+    assert destroy_operators[0].ops.count(['apply', 0]) == 10
+    assert destroy_operators[1].ops == []
+    assert repair_operator.ops.count(['apply', 0]) == 10
+
+
+def test_large_neighborhood_set_weight_unknown_operator(randgen):
+    large_neighborhood = evrptw.AdaptiveLargeNeighborhood(randgen, 0.)
+    with pytest.raises(ValueError):
+        large_neighborhood.set_destroy_operator_weight(MockDestroyOperator(0), 1.)
+    with pytest.raises(ValueError):
+        large_neighborhood.set_repair_operator_weight(MockRepairOperator(0), 1.)
+
+
+def test_large_neighborhood_run_time_limit(large_instance, random_solution_factory, randgen):
+    py_instance, instance = large_instance
+    evaluation = evrptw.adptw.Evaluation(py_instance.parameters.battery_capacity_time,
+                                         py_instance.parameters.capacity)
+    solution = random_solution_factory(instance, evaluation, vertices=list(instance.customers))
+
+    large_neighborhood = evrptw.AdaptiveLargeNeighborhood(randgen, 0.)
+    large_neighborhood.add_destroy_operator(evrptw.operators.RandomRemovalOperator(randgen))
+    large_neighborhood.add_repair_operator(evrptw.operators.RandomInsertionOperator(randgen))
+
+    _, iterations = large_neighborhood.run(evaluation, solution, 10 ** 9, 3, time_limit=0.05)
+    assert 0 < len(iterations) < 10 ** 9
+
+    _, iterations = large_neighborhood.run(evaluation, solution, 10, 3, time_limit=0.)
+    assert iterations == []
+
+
+def test_large_neighborhood_run_on_improvement(large_instance, random_solution_factory, randgen):
+    py_instance, instance = large_instance
+    evaluation = evrptw.adptw.Evaluation(py_instance.parameters.battery_capacity_time,
+                                         py_instance.parameters.capacity)
+    solution = random_solution_factory(instance, evaluation, vertices=list(instance.customers))
+
+    large_neighborhood = evrptw.AdaptiveLargeNeighborhood(randgen, 0.)
+    large_neighborhood.add_destroy_operator(evrptw.operators.RandomRemovalOperator(randgen))
+    large_neighborhood.add_repair_operator(evrptw.operators.RandomInsertionOperator(randgen))
+
+    improvements = []
+    best_solution, iterations = large_neighborhood.run(evaluation, solution, 100, 3,
+                                                       on_improvement=lambda x: improvements.append(x))
+    assert [x.cost for x in improvements] == [x.cost for x in iterations if x.accepted]
+    if improvements:
+        assert improvements[-1] == best_solution
+
+
+def test_large_neighborhood_operator_weights(randgen):
+    large_neighborhood = evrptw.AdaptiveLargeNeighborhood(randgen, 0.)
+    destroy_operators = [MockDestroyOperator(i) for i in range(40)]
+    for i, destroy_operator in enumerate(destroy_operators):
+        large_neighborhood.add_destroy_operator(destroy_operator)
+        large_neighborhood.set_destroy_operator_weight(destroy_operator, float(i))
+
+    for destroy_operator in destroy_operators[::2]:
+        large_neighborhood.remove_destroy_operator(destroy_operator)
+    remaining = destroy_operators[1::2]
+    assert sorted(large_neighborhood.destroy_operators, key=lambda x: x.num) == remaining
+    assert [large_neighborhood.get_destroy_operator_weight(x) for x in remaining] \
+           == [float(x.num) for x in remaining]
+
+    # New operators start with the average weight
+    added = MockDestroyOperator(40)
+    large_neighborhood.add_destroy_operator(added)
+    assert large_neighborhood.get_destroy_operator_weight(added) == pytest.approx(
+        sum(x.num for x in remaining) / len(remaining))
+
+    with pytest.raises(ValueError):
+        large_neighborhood.get_destroy_operator_weight(destroy_operators[0])
+    with pytest.raises(ValueError):
+        large_neighborhood.get_repair_operator_weight(MockRepairOperator(0))
+
+
+def test_large_neighborhood_weighted_pick(instance, random_solution_factory, mock_evaluation, randgen):
+    py_instance, instance = instance
+    solution = random_solution_factory(instance, mock_evaluation)
+    large_neighborhood = evrptw.AdaptiveLargeNeighborhood(randgen, 0.)
+    large_neighborhood.add_repair_operator(MockRepairOperator(0))
+
+    destroy_operators = [MockDestroyOperator(i) for i in range(30)]
+    for destroy_operator in destroy_operators:
+        large_neighborhood.add_destroy_operator(destroy_operator)
+        large_neighborhood.set_destroy_operator_weight(destroy_operator, 0.)
+    large_neighborhood.set_destroy_operator_weight(destroy_operators[3], 1.)
+    large_neighborhood.set_destroy_operator_weight(destroy_operators[17], 3.)
+
+    _, iterations = large_neighborhood.run(mock_evaluation, solution, 400, 1)
+
+    picks = [x.destroy_operator.num for x in iterations]
+    assert set(picks) == {3, 17}
+    assert 0.6 < picks.count(17) / len(picks) < 0.9
+
+
+def test_large_neighborhood_adapt_operator_weights(randgen):
+    large_neighborhood = evrptw.AdaptiveLargeNeighborhood(randgen, 0.5)
+    successful, unsuccessful = MockDestroyOperator(0), MockDestroyOperator(1)
+    repair_operator = MockRepairOperator(0)
+    large_neighborhood.add_destroy_operator(successful)
+    large_neighborhood.add_destroy_operator(unsuccessful)
+    large_neighborhood.add_repair_operator(repair_operator)
+
+    large_neighborhood.collect_score(successful, repair_operator, 1.)
+    large_neighborhood.collect_score(successful, repair_operator, 1.)
+    large_neighborhood.collect_score(unsuccessful, repair_operator, 0.)
+    large_neighborhood.adapt_operator_weights()
+
+    assert large_neighborhood.get_destroy_operator_weight(successful) == pytest.approx(1.)
+    assert large_neighborhood.get_destroy_operator_weight(unsuccessful) == pytest.approx(0.5)
+    assert large_neighborhood.get_repair_operator_weight(repair_operator) == pytest.approx(2. / 3. * 0.5 + 0.5)
+
+    large_neighborhood.reset_operator_weights()
+    assert large_neighborhood.get_destroy_operator_weight(unsuccessful) == 1.
+
+
+def test_large_neighborhood_pick_order(instance, random_solution_factory, mock_evaluation):
+    py_instance, instance = instance
+    solution = random_solution_factory(instance, mock_evaluation)
+    large_neighborhood = evrptw.AdaptiveLargeNeighborhood(evrptw.Random(7), 0.)
+    large_neighborhood.add_repair_operator(MockRepairOperator(0))
+
+    destroy_operators = [MockDestroyOperator(i) for i in range(12)]
+    for i, destroy_operator in enumerate(destroy_operators):
+        large_neighborhood.add_destroy_operator(destroy_operator)
+        large_neighborhood.set_destroy_operator_weight(destroy_operator, float(i % 4))
+    large_neighborhood.remove_destroy_operator(destroy_operators[5])
+    # Operators are kept newest first
+    listed = [x for x in destroy_operators[::-1] if x is not destroy_operators[5]]
+    assert list(large_neighborhood.destroy_operators) == listed
+
+    _, iterations = large_neighborhood.run(mock_evaluation, solution, 200, 1)
+
+    # Same picks as scanning the list with the same random draws
+    draws = evrptw.Random(7)
+    weights = [float(x.num % 4) for x in listed]
+    expected = []
+    for _ in iterations:
+        selected, cumulative = draws.uniform(0., sum(weights)), 0.
+        for destroy_operator, weight in zip(listed, weights):
+            cumulative += weight
+            if cumulative >= selected and weight > 0.:
+                expected.append(destroy_operator.num)
+                break
+    assert [x.destroy_operator.num for x in iterations] == expected
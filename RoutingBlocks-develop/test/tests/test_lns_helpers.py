@@ -63,3 +63,15 @@ def test_lns_helpers_sample_positions_with_depot(instance, random_solution_facto
     empty_solution = alns.Solution(adptw_evaluation, instance, 1)
     empty_solution_position = alns.sample_locations(empty_solution, randgen, 1, True)[0]
     assert empty_solution_position.route == 0 and empty_solution_position.position == 0
+
+
+def test_random_state_roundtrip():
+    randgen = alns.Random(42)
+    randgen.randint(0, 100)
+    state = randgen.get_state()
+    expected = [randgen.randint(0, 1000) for _ in range(10)]
+
+    restored = alns.Random(7)
+    restored.set_state(state)
+    assert restored.get_state() == state
+    assert [restored.randint(0, 1000) for _ in range(10)] == expected
@@ -294,3 +294,137 @@ def test_neighborhood_iterator(random_solution):
 
     actual_moves = set((x.origin_node, x.target_node) for x in routingblocks.iter_neighborhood(solution))
     assert actual_moves == expected_moves
+
+
+def _generator_arc_operators(instance):
+    return [routingblocks.operators.SwapOperator_0_1(instance, None),
+            routingblocks.operators.SwapOperator_1_1(instance, None),
+            routingblocks.operators.InterRouteTwoOptOperator(instance, None)]
+
+
+def _as_vertex_ids(solution):
+    return [[node.vertex_id for node in route] for route in solution]
+
+
+@pytest.fixture
+def adptw_local_search_setup(instance, random_solution_factory):
+    py_instance: helpers.Instance = instance[0]
+    instance: routingblocks.Instance = instance[1]
+    evaluation = adptw.Evaluation(py_instance.parameters.battery_capacity_time, py_instance.parameters.capacity)
+    evaluation.overload_penalty_factor = 100.
+    solution = random_solution_factory(instance=instance, evaluation=evaluation, randgen=random.Random(1))
+
+    def make_local_search():
+        return routingblocks.LocalSearch(instance, evaluation, None, routingblocks.BestImprovementPivotingRule())
+
+    return instance, evaluation, solution, make_local_search
+
+
+def test_local_search_dont_look_bits_reach_local_optimum(adptw_local_search_setup):
+    instance, evaluation, solution, make_local_search = adptw_local_search_setup
+    operators = _generator_arc_operators(instance)
+
+    make_local_search().optimize(solution, operators)
+
+    # A search without any skipped moves must not find further improvements
+    reoptimized = solution.copy()
+    make_local_search().optimize(reoptimized, operators)
+    assert reoptimized.cost == pytest.approx(solution.cost)
+    assert _as_vertex_ids(reoptimized) == _as_vertex_ids(solution)
+
+
+def test_local_search_remember_local_optima(adptw_local_search_setup):
+    instance, evaluation, solution, make_local_search = adptw_local_search_setup
+    operators = _generator_arc_operators(instance)
+    local_search = make_local_search()
+    assert not local_search.remember_local_optima
+    local_search.remember_local_optima = True
+
+    local_search.optimize(solution, operators)
+    assert local_search.number_of_remembered_optima == 1
+
+    # Perturb the local optimum by exchanging two customers between two routes
+    first, second = [i for i, route in enumerate(solution) if len(route) > 2][:2]
+    perturbed = solution.copy()
+    perturbed.exchange_segment(first, 1, 2, second, 1, 2)
+    reference = perturbed.copy()
+
+    local_search.optimize(perturbed, operators)
+    make_local_search().optimize(reference, operators)
+    # Skipped moves are non-improving, hence both searches take the same steps
+    assert perturbed.cost == pytest.approx(reference.cost)
+    assert _as_vertex_ids(perturbed) == _as_vertex_ids(reference)
+    assert local_search.number_of_remembered_optima == 2
+
+    # Optima are forgotten if the neighborhood changes
+    local_search.optimize(perturbed, operators[:1])
+    assert local_search.number_of_remembered_optima == 1
+
+    local_search.forget_local_optima()
+    assert local_search.number_of_remembered_optima == 0
+    local_search.remember_local_optima = False
+    local_search.optimize(perturbed, operators)
+    assert local_search.number_of_remembered_optima == 0
+
+
+def test_local_search_cached_moves_match_plain_best_improvement(adptw_local_search_setup):
+    instance, evaluation, solution, make_local_search = adptw_local_search_setup
+    operators = _generator_arc_operators(instance)
+
+    # Reference: best improvement driven from python. Operators used outside of a LocalSearch
+    # neither skip nor cache moves.
+    reference = solution.copy()
+    while True:
+        best_move, best_delta = None, -1e-2
+        for operator in operators:
+            operator.prepare_search(reference)
+            move = None
+            while (move := operator.find_next_improving_move(evaluation, reference, move)) is not None:
+                candidate = reference.copy()
+                move.apply(instance, candidate)
+                if (delta := candidate.cost - reference.cost) < best_delta:
+                    best_move, best_delta = move, delta
+            operator.finalize_search()
+        if best_move is None:
+            break
+        best_move.apply(instance, reference)
+
+    make_local_search().optimize(solution, operators)
+    assert _as_vertex_ids(solution) == _as_vertex_ids(reference)
+
+
+def test_local_search_threads_share_instance_and_evaluation(adptw_local_search_setup):
+    from concurrent.futures import ThreadPoolExecutor
+
+    instance, evaluation, solution, make_local_search = adptw_local_search_setup
+    first, second = [i for i, route in enumerate(solution) if len(route) > 2][:2]
+    starts = []
+    for length in range(1, 5):
+        start = solution.copy()
+        start.exchange_segment(first, 1, 1 + min(length, len(start[first]) - 2), second, 1, 2)
+        starts.append(start)
+
+    def optimize(start):
+        optimized = start.copy()
+        # Local searches and operators hold search state, every thread needs its own
+        make_local_search().optimize(optimized, _generator_arc_operators(instance))
+        return _as_vertex_ids(optimized)
+
+    expected = [optimize(start) for start in starts]
+    with ThreadPoolExecutor(max_workers=len(starts)) as pool:
+        assert list(pool.map(optimize, starts)) == expected
+
+
+def test_arc_set_from_mask():
+    n = 4
+    forbidden = {(0, 1), (2, 3), (3, 3)}
+    mask = memoryview(bytes((i, j) not in forbidden for i in range(n) for j in range(n))).cast('?', shape=[n, n])
+    arc_set = routingblocks.ArcSet.from_mask(mask)
+    for i in range(n):
+        for j in range(n):
+            assert arc_set.includes_arc(i, j) == ((i, j) not in forbidden)
+
+    with pytest.raises(ValueError):
+        routingblocks.ArcSet.from_mask(memoryview(bytes(6)).cast('?', shape=[2, 3]))
+    with pytest.raises(ValueError):
+        routingblocks.ArcSet.from_mask(memoryview(bytes(4)).cast('B', shape=[2, 2]))
@@ -19,6 +19,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Sequence
 from copy import copy
 from itertools import islice
 
@@ -27,6 +28,7 @@ import pytest
 
 import routingblocks
 from routingblocks import niftw
+from routingblocks.operators.move_selectors import last_move_selector, nth_move_selector_factory
 
 
 def iter_vertices(instance: routingblocks.Instance):
@@ -102,3 +104,118 @@ def test_removal_cache_update(instance, raw_routes):
         expected_cache.rebuild(evaluation, solution)
 
         assert_cache_equal(expected_cache, updated_cache)
+
+
+def test_removal_cache_sync_with_solution(instance):
+    py_instance, instance = instance
+    evaluation = niftw.Evaluation(py_instance.parameters.battery_capacity_time, py_instance.parameters.capacity,
+                                  0.0)
+    synced_cache = routingblocks.RemovalCache(instance)
+    expected_cache = routingblocks.RemovalCache(instance)
+
+    solution = build_solution(evaluation, instance, [[1, 6, 3], [8, 2, 7], [4, 5]])
+    # Falls back to a full rebuild on first use
+    synced_cache.update(evaluation, solution)
+    expected_cache.rebuild(evaluation, solution)
+    assert_cache_equal(synced_cache, expected_cache)
+
+    # Different solution object, some routes changed
+    other_solution = build_solution(evaluation, instance, [[1, 6, 3], [8, 7, 2], [4]])
+    synced_cache.update(evaluation, other_solution)
+    expected_cache.rebuild(evaluation, other_solution)
+    assert_cache_equal(synced_cache, expected_cache)
+
+    # Routes vanish
+    other_solution = build_solution(evaluation, instance, [[1, 6, 3, 5]])
+    synced_cache.update(evaluation, other_solution)
+    expected_cache.rebuild(evaluation, other_solution)
+    assert_cache_equal(synced_cache, expected_cache)
+
+    # Back to the original solution
+    synced_cache.update(evaluation, solution)
+    expected_cache.rebuild(evaluation, solution)
+    assert_cache_equal(synced_cache, expected_cache)
+
+
+def test_removal_cache_invalidate_keeps_order(large_instance):
+    py_instance, instance = large_instance
+    evaluation = niftw.Evaluation(py_instance.parameters.battery_capacity_time, py_instance.parameters.capacity,
+                                  0.0)
+    customers = [vertex.vertex_id for vertex in instance.customers]
+    solution = build_solution(evaluation, instance, [customers[i:i + 4] for i in range(0, len(customers), 4)])
+    cache = routingblocks.RemovalCache(instance)
+    expected_cache = routingblocks.RemovalCache(instance)
+    cache.rebuild(evaluation, solution)
+
+    def as_sorted(moves):
+        return sorted((move.delta_cost, move.vertex_id, move.node_location.route, move.node_location.position)
+                      for move in moves)
+
+    while solution.number_of_non_depot_nodes > 0:
+        # Always remove the worst vertex
+        worst_move = next(iter(cache.moves_in_order))
+        solution.remove_vertex(worst_move.node_location)
+        cache.invalidate_route(solution[worst_move.node_location.route], worst_move.node_location.route)
+
+        expected_cache.rebuild(evaluation, solution)
+        moves = list(cache.moves_in_order)
+        assert all(pred.delta_cost <= succ.delta_cost for pred, succ in zip(moves, moves[1:]))
+        assert as_sorted(moves) == as_sorted(expected_cache.moves_in_order)
+
+
+def test_removal_cache_moves_in_order_sequence(instance):
+    py_instance, instance = instance
+    evaluation = niftw.Evaluation(py_instance.parameters.battery_capacity_time, py_instance.parameters.capacity,
+                                  0.0)
+    cache = routingblocks.RemovalCache(instance)
+    solution = build_solution(evaluation, instance, [[1, 6, 3], [8, 2, 7]])
+    cache.rebuild(evaluation, solution)
+
+    moves = cache.moves_in_order
+    assert isinstance(moves, Sequence)
+    materialized = list(moves)
+    assert len(moves) == len(materialized) == 6
+    assert [moves[i] for i in range(len(moves))] == materialized
+    assert moves[-1] == materialized[-1]
+    assert moves.top(2) == materialized[:2]
+    assert moves.top(10) == materialized
+    with pytest.raises(IndexError):
+        moves[6]
+
+    # The sequence reflects later changes of the cache
+    solution.remove_vertex(solution.find(1)[0])
+    cache.invalidate_route(solution[0], 0)
+    assert len(moves) == 5
+    assert list(moves) == list(cache.moves_in_order)
+
+    # Selectors index the sequence
+    assert last_move_selector(moves) == list(moves)[-1]
+    assert nth_move_selector_factory(2)(moves) == list(moves)[1]
+
+
+@pytest.mark.parametrize("evaluation_type", ["native", "python"])
+def test_removal_cache_threads(large_instance, python_evaluation, evaluation_type):
+    py_instance, instance = large_instance
+    evaluation = python_evaluation if evaluation_type == "python" else \
+        niftw.Evaluation(py_instance.parameters.battery_capacity_time, py_instance.parameters.capacity, 0.0)
+    customers = [vertex.vertex_id for vertex in instance.customers]
+    solution = build_solution(evaluation, instance, [customers[i:i + 3] for i in range(0, len(customers), 3)])
+    cache = routingblocks.RemovalCache(instance)
+    cache.number_of_threads = 4
+    assert cache.number_of_threads == 4
+    expected_cache = routingblocks.RemovalCache(instance)
+
+    cache.rebuild(evaluation, solution)
+    expected_cache.rebuild(evaluation, solution)
+    assert_cache_equal(cache, expected_cache)
+
+    for _ in range(5):
+        for move in list(cache.moves_in_order)[:2]:
+            if solution.find(move.vertex_id):
+                solution.remove_vertex(solution.find(move.vertex_id)[0])
+        cache.update(evaluation, solution)
+        expected_cache.rebuild(evaluation, solution)
+        assert sorted(cache.moves_in_order, key=lambda move: move.delta_cost) == list(cache.moves_in_order)
+        assert len(cache.moves_in_order) == len(expected_cache.moves_in_order)
+        assert {(move.vertex_id, move.delta_cost) for move in cache.moves_in_order} == \
+               {(move.vertex_id, move.delta_cost) for move in expected_cache.moves_in_order}
@@ -468,3 +468,78 @@ def test_solution_lookup_by_location(adptw_instance: evrptw.Instance, random_sol
     for route_index, route in enumerate(solution):
         for pos, node in enumerate(route):
             assert solution.lookup(evrptw.NodeLocation(route_index, pos)) is node
+
+
+def test_solution_unassigned_vertices(adptw_instance: evrptw.Instance, random_solution_factory,
+                                      mock_evaluation: evrptw.Evaluation):
+    instance: evrptw.Instance = adptw_instance
+    customers = list(instance.customers)
+    assigned = random.sample(customers, k=len(customers) // 2)
+    solution = random_solution_factory(instance, mock_evaluation, assigned + list(instance.stations), 2)
+
+    def expected_unassigned():
+        visited = {node.vertex_id for route in solution for node in route}
+        return {x.vertex_id for x in customers} - visited
+
+    assert set(solution.unassigned_vertices) == expected_unassigned()
+    assert len(solution.unassigned_vertices) == len(customers) - len(assigned)
+    # Depot and stations are never reported
+    assert not solution.is_unassigned(instance.depot.vertex_id)
+    assert all(not solution.is_unassigned(x.vertex_id) for x in instance.stations)
+
+    copied_solution = solution.copy()
+    initially_unassigned = expected_unassigned()
+    positions = [evrptw.NodeLocation(route, pos) for route in range(len(solution)) for pos in
+                 range(1, len(solution[route]) - 1)]
+    solution.remove_vertices(random.sample(positions, k=len(positions) // 2))
+    assert set(solution.unassigned_vertices) == expected_unassigned()
+    assert all(solution.is_unassigned(x) for x in solution.unassigned_vertices)
+    assert set(copied_solution.unassigned_vertices) == initially_unassigned
+
+    missing = solution.unassigned_vertices
+    # Leave at least one customer unassigned, so that the route added below is not empty
+    solution.insert_vertices_after([(vertex_id, evrptw.NodeLocation(0, 0))
+                                    for vertex_id in missing[:min(3, len(missing) - 1)]])
+    assert set(solution.unassigned_vertices) == expected_unassigned()
+
+    solution.add_route(evrptw.create_route(mock_evaluation, instance, solution.unassigned_vertices))
+    assert solution.unassigned_vertices == []
+
+    solution.remove_route(solution[len(solution) - 1])
+    assert set(solution.unassigned_vertices) == expected_unassigned() != set()
+
+
+def test_solution_fingerprint(adptw_instance: evrptw.Instance, mock_evaluation: evrptw.Evaluation):
+    instance: evrptw.Instance = adptw_instance
+    customers = [x.vertex_id for x in instance.customers]
+    first, second = customers[:len(customers) // 2], customers[len(customers) // 2:]
+
+    def make_solution(*routes):
+        return evrptw.Solution(mock_evaluation, instance,
+                               [evrptw.create_route(mock_evaluation, instance, route) for route in routes])
+
+    solution = make_solution(first, second, [])
+    assert solution[2].fingerprint == 0
+    # Neither route order nor empty routes matter
+    assert solution.fingerprint == make_solution(second, first).fingerprint
+    assert solution.fingerprint == solution[0].fingerprint + solution[1].fingerprint & (2 ** 64 - 1)
+    assert solution.fingerprint != make_solution(first[::-1], second).fingerprint
+    assert solution.fingerprint != make_solution(first + second[:1], second[1:]).fingerprint
+
+    initial_fingerprint = solution.fingerprint
+    copied_solution = solution.copy()
+    assert copied_solution.fingerprint == initial_fingerprint
+
+    # Kept up to date by modifications
+    solution.exchange_segment(0, 1, 2, 1, 1, 3)
+    assert solution.fingerprint != initial_fingerprint
+    assert solution.fingerprint == make_solution(*[[node.vertex_id for node in route][1:-1]
+                                                   for route in solution]).fingerprint
+    assert copied_solution.fingerprint == initial_fingerprint
+
+    solution = copied_solution.copy()
+    removed_vertex = solution[0][2].vertex_id
+    solution.remove_vertex(evrptw.NodeLocation(0, 2))
+    assert solution.fingerprint == make_solution([x for x in first if x != removed_vertex], second).fingerprint
+    solution.insert_vertex_after(evrptw.NodeLocation(0, 1), removed_vertex)
+    assert solution.fingerprint == initial_fingerprint
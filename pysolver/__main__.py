@@ -1,3 +1,6 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import repeat
 from pathlib import Path
 import random
 
@@ -20,6 +23,9 @@ from pysolver.instance.parsing import parse_instance
 from pysolver.utils.plot import draw_routes
 from pysolver.utils.plot_map import draw_routes_on_map
 from pysolver.metaheuristic.ils import iterative_local_search
+from pysolver.metaheuristic.islands import from_routes, island_lns, to_routes
+from pysolver.metaheuristic.route_pool import RoutePool, fleet_limits
+from pysolver.utils.anytime import IncumbentWriter, ResumeCheckpoint, TimeBudget, restore_random
 
 
 from pysolver.metaheuristic import lns
@@ -138,23 +144,12 @@ def print_route_summary(py_instance, solution: rb.Solution, evaluation: rb_ext.H
 #     for i, route in enumerate(solution.routes):
 #         print(f"vt_{evaluation.compute_best_vehicle_id_of_route(route)}:", route)
 
-@click.command('pysolver')
-@click.argument('instance-path', type=click.Path(exists=True, dir_okay=False, file_okay=True), required=True)
-@click.option('--output-path', type=click.Path(exists=True, dir_okay=True, file_okay=False), default=Path('.'))
-@click.option('--seed', type=int, default=None)
-
-
-
-def main(instance_path: Path, output_path: Path, seed: int):
-    # set random number generator seed to ensure deterministic behavior for reproducibility
-    if seed is None:
-        seed = random.randint(0, 10000)
-    random.seed(seed)
-    np.random.seed(seed)
-    cpp_random = rb.Random(seed)
+def worker_seeds(seed: int, workers: int) -> list[int]:
+    """Seeds of the multi-start workers. The first worker reuses ``seed``, so ``--workers 1`` matches a plain run."""
+    return [seed, *(int(s) for s in np.random.SeedSequence(seed).generate_state(workers - 1))]
 
-    instance_path = Path(instance_path)
 
+def setup(instance_path: Path):
     py_instance, fleets, initial_fleets = parse_instance(instance_path, return_fleets=True)
     cpp_instance = create_cpp_instance(py_instance)
 
@@ -186,32 +181,228 @@ def main(instance_path: Path, output_path: Path, seed: int):
     cfg = load_cfg(Path("pysolver/finetuned_params.json"))
     block = pick_block(instance_path, cfg)
 
+    evaluation = rb_ext.HFVRPEvaluation(veh_props, initial_veh_props, p.max_work_time, city._asdict())
+    return py_instance, cpp_instance, evaluation, block, toll, (veh_props, initial_veh_props)
+
+
+def island_context(instance_path: Path):
+    py_instance, cpp_instance, evaluation, *_ = setup(instance_path)
+    return py_instance, cpp_instance, evaluation
+
+
+def _no_checkpoint(solution: rb.Solution, stage: str = ""):
+    pass
+
+
+def _pooling(checkpoint, route_pool: RoutePool | None):
+    """Checkpoint callback that also offers every solution it sees to the route pool."""
+    if route_pool is None:
+        return checkpoint
+
+    def on_improvement(solution: rb.Solution, stage: str = ""):
+        route_pool.add_solution(solution)
+        checkpoint(solution, stage)
+    return on_improvement
+
+
+def _saving(resume_checkpoint: ResumeCheckpoint | None, stage: str, seed: int, cpp_random: rb.Random,
+            first_iteration: int = 0):
+    """on_checkpoint callback of a stage that saves its state whenever ``resume_checkpoint`` is due."""
+    if resume_checkpoint is None:
+        return None
+
+    def on_checkpoint(solution: rb.Solution, iteration: int, destroy_weights: list[float] | None = None):
+        if resume_checkpoint.due():
+            extra = {} if destroy_weights is None else {"destroy_weights": destroy_weights}
+            resume_checkpoint.save(stage, first_iteration + iteration, solution, seed, cpp_random, **extra)
+    return on_checkpoint
+
+
+def run_pipeline(py_instance, cpp_instance, evaluation, block: dict, seed: int,
+                 instance_path: Path | None = None, islands: int = 1, exchange_interval: int = 250,
+                 budget: TimeBudget = TimeBudget(), checkpoint=_no_checkpoint,
+                 fleets: tuple[list, list] | None = None,
+                 resume_checkpoint: ResumeCheckpoint | None = None, resume_state: dict | None = None) -> rb.Solution:
+    """
+    Savings, LNS, ILS and set partitioning over the routes they found.
+
+    :param resume_checkpoint: Periodically saves the state of the LNS and ILS to continue from. Not used by
+        cooperative islands.
+    :param resume_state: A state loaded from a resume checkpoint. The pipeline skips the stages before the saved one
+        and continues it from the saved solution, iteration and random number generator states.
+    """
+    deadline = budget.start()
+    # set random number generator seed to ensure deterministic behavior for reproducibility
+    random.seed(seed)
+    np.random.seed(seed)
+    cpp_random = rb.Random(seed)
+    resumed_stage = resumed_solution = None
+    if resume_state is not None:
+        resumed_stage = resume_state["stage"]
+        evaluation.reset_free_vehicle_usage()
+        resumed_solution = from_routes(evaluation, cpp_instance, resume_state["routes"])
+        restore_random(resume_state, cpp_random)
+        print_solution_info(f"Resuming {resumed_stage} at iteration {resume_state["iteration"]}", resumed_solution)
+    lns_iterations = 2500
+
     s_cfg   = block.get("savings", {})
     lns_cfg = block.get("lns", {})
     ils_cfg = block.get("ils", {})
+    pool_cfg = block.get("route_pool", {})
 
-    evaluation = rb_ext.HFVRPEvaluation(veh_props, initial_veh_props, p.max_work_time, city._asdict())
+    # Routes seen by LNS and ILS, recombined by set partitioning at the end. Needs the fleet to respect its counts.
+    route_pool = None
+    if fleets is not None and pool_cfg.get("enabled", True):
+        route_pool = RoutePool(evaluation, cpp_instance, [row[0] for row in fleets[0]], fleet_limits(*fleets),
+                               capacity=int(pool_cfg.get("capacity", 100_000)))
+    checkpoint = _pooling(checkpoint, route_pool)
 
     # 1. Savings Construction
-    evaluation.reset_free_vehicle_usage()
-    savings_solution = savings(py_instance, evaluation, cpp_instance, 
-                               max_customers_per_route=int(s_cfg.get("max_customers_per_route", 16)),
-                               min_saving=float(s_cfg.get("min_saving", 0.0)))
-    print_solution_info(f"Savings with max_customers_per_route {int(s_cfg.get("max_customers_per_route", 16))} ", savings_solution)
+    if resumed_stage is not None:
+        savings_solution = resumed_solution
+        checkpoint(resumed_solution, resumed_stage)
+    else:
+        evaluation.reset_free_vehicle_usage()
+        savings_solution = savings(py_instance, evaluation, cpp_instance, 
+                                   max_customers_per_route=int(s_cfg.get("max_customers_per_route", 16)),
+                                   min_saving=float(s_cfg.get("min_saving", 0.0)),
+                                   time_limit=deadline.stage_limit(budget.savings))
+        print_solution_info(f"Savings with max_customers_per_route {int(s_cfg.get("max_customers_per_route", 16))} ", savings_solution)
+        checkpoint(savings_solution, "savings")
 
     # 2. LNS
     evaluation.reset_free_vehicle_usage()
-    lns_savings_solution = lns(py_instance, evaluation, cpp_instance, cpp_random, savings_solution, 2500,
-                               remove_fraction=float(lns_cfg.get("destroy_fraction", 0.2)),
-                               destroy_weights=tuple(lns_cfg.get("destroy_weights", [1.0, 0.0, 0.0])))
+    lns_limit = deadline.stage_limit(budget.lns)
+    lns_done = resume_state["iteration"] if resumed_stage == "lns" else 0
+    destroy_weights = tuple(lns_cfg.get("destroy_weights", [1.0, 0.0, 0.0]))
+    if resumed_stage == "lns" and "destroy_weights" in resume_state:
+        destroy_weights = tuple(resume_state["destroy_weights"])
+    if lns_limit == 0 or resumed_stage == "ils":
+        lns_savings_solution = savings_solution
+    elif islands > 1:
+        lns_savings_solution = island_lns(partial(island_context, instance_path), evaluation, cpp_instance,
+                                          savings_solution, lns_iterations, islands=islands, seed=seed,
+                                          exchange_interval=exchange_interval,
+                                          remove_fraction=float(lns_cfg.get("destroy_fraction", 0.2)),
+                                          destroy_weights=tuple(lns_cfg.get("destroy_weights", [1.0, 0.0, 0.0])),
+                                          adaptation_period=int(lns_cfg.get("adaptation_period", 0)),
+                                          smoothing_factor=float(lns_cfg.get("smoothing_factor", 0.2)),
+                                          time_limit=lns_limit, on_improvement=partial(checkpoint, stage="lns"))
+    else:
+        lns_savings_solution = lns(py_instance, evaluation, cpp_instance, cpp_random, savings_solution,
+                                   lns_iterations - lns_done,
+                                   remove_fraction=float(lns_cfg.get("destroy_fraction", 0.2)),
+                                   destroy_weights=destroy_weights,
+                                   adaptation_period=int(lns_cfg.get("adaptation_period", 0)),
+                                   smoothing_factor=float(lns_cfg.get("smoothing_factor", 0.2)),
+                                   time_limit=lns_limit, on_improvement=partial(checkpoint, stage="lns"),
+                                   on_checkpoint=_saving(resume_checkpoint, "lns", seed, cpp_random, lns_done))
     print_solution_info(f"LNS with remove_fraction {float(lns_cfg.get("destroy_fraction", 0.2))}", lns_savings_solution)
     
     # 3. ILS
     evaluation.reset_free_vehicle_usage()
-    ils_solution = iterative_local_search(py_instance, evaluation, cpp_instance, cpp_random, lns_savings_solution,  
-                                          max_iterations=int(ils_cfg.get("max_iterations", 50)),
-                                          remove_fraction=float(ils_cfg.get("destroy_fraction", 0.15)))
-    print_solution_info(f"ILS with remove_fraction {float(ils_cfg.get("destroy_fraction", 0.15))}", ils_solution)
+    ils_limit = deadline.stage_limit(budget.ils)
+    if ils_limit == 0:
+        ils_solution = lns_savings_solution
+    else:
+        ils_solution = iterative_local_search(py_instance, evaluation, cpp_instance, cpp_random, lns_savings_solution,
+                                              max_iterations=int(ils_cfg.get("max_iterations", 50)),
+                                              remove_fraction=float(ils_cfg.get("destroy_fraction", 0.15)),
+                                              granular_repair=bool(ils_cfg.get("granular_repair", False)),
+                                              visited_capacity=int(ils_cfg.get("visited_capacity", 4096)),
+                                              route_pool=route_pool,
+                                              time_limit=ils_limit, on_improvement=partial(checkpoint, stage="ils"),
+                                              start_iteration=resume_state["iteration"] if resumed_stage == "ils" else 0,
+                                              on_checkpoint=_saving(resume_checkpoint, "ils", seed, cpp_random))
+        print_solution_info(f"ILS with remove_fraction {float(ils_cfg.get("destroy_fraction", 0.15))}", ils_solution)
+
+    # 4. Set partitioning over the route pool
+    pool_limit = deadline.stage_limit(pool_cfg.get("time_limit", 30.0))
+    if route_pool is None or pool_limit == 0:
+        return ils_solution
+    evaluation.reset_free_vehicle_usage()
+    recombined_solution = route_pool.recombine(ils_solution, time_limit=pool_limit)
+    print_solution_info(f"Set partitioning over {len(route_pool)} pooled routes", recombined_solution)
+    if recombined_solution is not ils_solution:
+        checkpoint(recombined_solution, "route_pool")
+    return recombined_solution
+
+
+def solve_worker(instance_path: Path, seed: int, budget: TimeBudget,
+                 incumbent_path: Path) -> tuple[float, list[list[int]]]:
+    """Runs the whole pipeline in a worker process. rb objects do not pickle, so the routes are returned as ids."""
+    py_instance, cpp_instance, evaluation, block, _, fleets = setup(instance_path)
+    solution = run_pipeline(py_instance, cpp_instance, evaluation, block, seed, budget=budget,
+                            checkpoint=IncumbentWriter(incumbent_path, py_instance), fleets=fleets)
+    return solution.cost, to_routes(solution)
+
+
+@click.command('pysolver')
+@click.argument('instance-path', type=click.Path(exists=True, dir_okay=False, file_okay=True), required=True)
+@click.option('--output-path', type=click.Path(exists=True, dir_okay=True, file_okay=False), default=Path('.'))
+@click.option('--seed', type=int, default=None)
+@click.option('--workers', type=int, default=1,
+              help="Run this many independently seeded pipelines in parallel and keep the best solution.")
+@click.option('--cooperative', is_flag=True, default=False,
+              help="With --workers, run the LNS stage as cooperating islands that share an elite pool "
+                   "instead of running independent pipelines.")
+@click.option('--exchange-interval', type=int, default=250,
+              help="LNS iterations between two elite exchanges in --cooperative mode.")
+@click.option('--time-limit', type=float, default=None, help="Wall-clock budget in seconds for the whole pipeline.")
+@click.option('--savings-time', type=float, default=None, help="Wall-clock budget in seconds for savings.")
+@click.option('--lns-time', type=float, default=None, help="Wall-clock budget in seconds for the LNS.")
+@click.option('--ils-time', type=float, default=None, help="Wall-clock budget in seconds for the ILS.")
+@click.option('--checkpoint-interval', type=float, default=60.0,
+              help="Seconds between two saves of the LNS/ILS state that --resume continues from. "
+                   "Only single pipeline runs are checkpointed.")
+@click.option('--resume', is_flag=True, default=False,
+              help="Continue from the checkpoint a killed run left in --output-path, if any. "
+                   "The seed is taken from the checkpoint and the time limits apply to the resumed run.")
+def main(instance_path: Path, output_path: Path, seed: int, workers: int, cooperative: bool,
+         exchange_interval: int, time_limit: float | None, savings_time: float | None, lns_time: float | None,
+         ils_time: float | None, checkpoint_interval: float, resume: bool):
+    if resume and workers > 1:
+        raise click.UsageError("--resume is only supported for single pipeline runs (--workers 1)")
+    if seed is None:
+        seed = random.randint(0, 10000)
+
+    instance_path = Path(instance_path)
+    output_path = Path(output_path)
+    budget = TimeBudget(total=time_limit, savings=savings_time, lns=lns_time, ils=ils_time)
+    py_instance, cpp_instance, evaluation, block, toll, fleets = setup(instance_path)
+    # The best plan found so far is always on disk, even if the run is killed
+    incumbent = IncumbentWriter(output_path / f"{instance_path.stem}.incumbent.json", py_instance)
+
+    if workers <= 1:
+        # The search state is on disk as well, so a killed run can continue with --resume
+        resume_checkpoint = ResumeCheckpoint(output_path / f"{instance_path.stem}.checkpoint.json.gz",
+                                             interval=checkpoint_interval)
+        resume_state = resume_checkpoint.load() if resume else None
+        if resume and resume_state is None:
+            print(f"No checkpoint at {resume_checkpoint.path}, starting from scratch")
+        if resume_state is not None:
+            seed = resume_state["seed"]
+        ils_solution = run_pipeline(py_instance, cpp_instance, evaluation, block, seed, budget=budget,
+                                    checkpoint=incumbent, fleets=fleets,
+                                    resume_checkpoint=resume_checkpoint, resume_state=resume_state)
+        resume_checkpoint.clear()
+    elif cooperative:
+        ils_solution = run_pipeline(py_instance, cpp_instance, evaluation, block, seed, instance_path=instance_path,
+                                    islands=workers, exchange_interval=exchange_interval, budget=budget,
+                                    checkpoint=incumbent, fleets=fleets)
+    else:
+        seeds = worker_seeds(seed, workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(solve_worker, repeat(instance_path), seeds, repeat(budget),
+                                    [output_path / f"{instance_path.stem}.seed{s}.incumbent.json" for s in seeds]))
+        for worker_seed, (cost, _) in zip(seeds, results):
+            print(f"seed {worker_seed} | obj: {cost}")
+        # min keeps the first of equally good results, so the choice does not depend on completion order
+        best_seed, (best_cost, best_routes) = min(zip(seeds, results), key=lambda x: x[1][0])
+        print(f"Best of {workers} workers: seed {best_seed} | obj: {best_cost}")
+        evaluation.reset_free_vehicle_usage()
+        ils_solution = from_routes(evaluation, cpp_instance, best_routes)
+        incumbent(ils_solution, "multistart")
 
     # 4. Solution
     evaluation.reset_free_vehicle_usage()
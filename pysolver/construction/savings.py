@@ -2,15 +2,21 @@ from routingblocks._routingblocks import Route
 from routingblocks_bais_as._routingblocks_bais_as import HFVRPEvaluation
 from pysolver.instance.models import Instance
 import routingblocks as rb
+import time
 
 def savings(py_instance: Instance,
             evaluation: HFVRPEvaluation,
             cpp_instance: rb.Instance,
             max_customers_per_route: int = 8,
-            min_saving: float = 0.0) -> rb.Solution:
+            min_saving: float = 0.0,
+            time_limit: float | None = None) -> rb.Solution:
+    # Stops merging once time_limit seconds have passed; the routes merged so far still form a full solution
+    deadline = None if time_limit is None else time.monotonic() + time_limit
 
     # --- Build independent 1-customer routes (NOT from solution.routes) ---
     routes: list[rb.Route] = []
+    demand_weight = py_instance.vertices.demand_weight.tolist()
+    demand_volume = py_instance.vertices.demand_volume.tolist()
     capacity_w: list[float] = []
     capacity_v: list[float] = []
     c_to_route_id = [-1]  # 0th unused to match vertex ids
@@ -21,8 +27,8 @@ def savings(py_instance: Instance,
         r.insert_vertices_after([(c_i, 0)])
         routes.append(r)
         c_to_route_id.append(len(routes) - 1)
-        capacity_w.append(py_instance.vertices[c_i].demand_weight)
-        capacity_v.append(py_instance.vertices[c_i].demand_volume)
+        capacity_w.append(demand_weight[c_i])
+        capacity_v.append(demand_volume[c_i])
 
     # --- Compute savings (with a tiny threshold) ---
     savings = []
@@ -48,6 +54,8 @@ def savings(py_instance: Instance,
         attempt_count += 1
         if attempt_count > MAX_ATTEMPTS:
             break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
 
         ri = c_to_route_id[c_i]
         rj = c_to_route_id[c_j]
@@ -56,7 +56,7 @@ def create_cpp_instance(instance: Instance) -> rb_ext.Instance:
 
     # 🚨 Correct — do NOT reload id_map.txt here!
     # Build name_to_vertex_id from instance.vertices
-    name_to_vertex_id = {v.vertex_name: v.vertex_id for v in instance.vertices}
+    name_to_vertex_id = dict(zip(instance.vertices.vertex_name, instance.vertices.vertex_id.tolist()))
 
     cpp_vertices = [create_cpp_vertex(v, i, data_factory=vertex_data_factory) for i, v in enumerate(sorted_vertices)]
 
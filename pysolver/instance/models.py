@@ -1,11 +1,10 @@
 from dataclasses import dataclass
-from typing import Iterable, Tuple, Dict
+from typing import Iterable, Iterator, Tuple, Dict
 from enum import Enum
-from itertools import product
+from itertools import chain
 from datetime import timedelta
 
-
-from pydantic import root_validator, field_validator, model_validator
+import numpy as np
 
 # VertexID = str
 ArcID = Tuple[int, int]
@@ -16,8 +15,9 @@ class VertexType(Enum):
     Customer = 'c'
 
 
-@dataclass
+@dataclass(slots=True)
 class Vertex:
+    """Lightweight record view of a single row of a :class:`VertexTable`."""
     vertex_id: int
     vertex_name: str
     vertex_type: VertexType
@@ -43,20 +43,114 @@ class Vertex:
     def is_depot(self) -> bool:
         return self.vertex_type == VertexType.Depot
 
-    @model_validator(mode='after')
-    def check_depot_station_demand(cls, values: dict) -> Dict:
-        if values['vertex_type'] in [VertexType.Depot]:
-            if values['demand'] != 0.0:
-                raise ValueError(
-                    "stations or depots cannot have a non-zero demand")
-        return values
 
-    @field_validator('demand')
-    def check_nonzero_members(cls, value):
-        if value < 0:
-            raise ValueError(
-                '_vertex demand must be at least 0')
-        return value
+class VertexTable:
+    """
+    Column-oriented (structure-of-arrays) store of all vertices of an instance.
+
+    Coordinates, demands and service times are kept as NumPy arrays indexed by row, so vectorised
+    consumers (construction, plotting, relatedness) can work on whole columns at once. Indexing or
+    iterating the table yields :class:`Vertex` records that are created on demand.
+    """
+    __slots__ = ('vertex_id', 'vertex_name', 'is_depot', 'x_coord', 'y_coord',
+                 'demand_weight', 'demand_volume', 'service_time', '_name_index')
+
+    def __init__(self, vertex_id, vertex_name, is_depot, x_coord, y_coord,
+                 demand_weight, demand_volume, service_time):
+        self.vertex_id = np.asarray(vertex_id, dtype=np.int64)
+        self.vertex_name = [str(name).strip() for name in vertex_name]
+        self.is_depot = np.asarray(is_depot, dtype=bool)
+        self.x_coord = np.asarray(x_coord, dtype=np.float64)
+        self.y_coord = np.asarray(y_coord, dtype=np.float64)
+        self.demand_weight = np.asarray(demand_weight, dtype=np.int64)
+        self.demand_volume = np.asarray(demand_volume, dtype=np.float64)
+        self.service_time = np.asarray(service_time, dtype=np.float64)
+        self._name_index = {name: row for row, name in enumerate(self.vertex_name)}
+        self._validate()
+
+    @classmethod
+    def from_vertices(cls, vertices: Iterable[Vertex]) -> 'VertexTable':
+        vertices = list(vertices)
+        return cls(
+            vertex_id=[v.vertex_id for v in vertices],
+            vertex_name=[v.vertex_name for v in vertices],
+            is_depot=[v.is_depot for v in vertices],
+            x_coord=[v.x_coord for v in vertices],
+            y_coord=[v.y_coord for v in vertices],
+            demand_weight=[v.demand_weight for v in vertices],
+            demand_volume=[v.demand_volume for v in vertices],
+            service_time=[v.service_time for v in vertices],
+        )
+
+    def _validate(self) -> None:
+        n = len(self.vertex_name)
+        columns = (self.vertex_id, self.is_depot, self.x_coord, self.y_coord,
+                   self.demand_weight, self.demand_volume, self.service_time)
+        if any(column.shape != (n,) for column in columns):
+            raise ValueError(f'all vertex columns must have length {n}')
+        if len(self._name_index) != n:
+            raise ValueError('vertex names must be unique')
+        if np.any(self.demand_weight < 0) or np.any(self.demand_volume < 0):
+            raise ValueError('vertex demand must be at least 0')
+        if np.any(self.demand_weight[self.is_depot] != 0):
+            raise ValueError('depots cannot have a non-zero demand')
+
+    def __len__(self) -> int:
+        return len(self.vertex_name)
+
+    def __getitem__(self, item: int | slice) -> Vertex | list[Vertex]:
+        if isinstance(item, slice):
+            return [self._view(row) for row in range(*item.indices(len(self)))]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError(f'vertex row {item} out of range')
+        return self._view(item)
+
+    def __iter__(self) -> Iterator[Vertex]:
+        return (self._view(row) for row in range(len(self)))
+
+    def take(self, rows, renumber: bool = False) -> 'VertexTable':
+        """
+        Returns a new table holding the given rows in the given order. With ``renumber`` the
+        vertices get consecutive ids ``0..len(rows)-1`` assigned.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        return VertexTable(
+            vertex_id=np.arange(len(rows)) if renumber else self.vertex_id[rows],
+            vertex_name=[self.vertex_name[row] for row in rows.tolist()],
+            is_depot=self.is_depot[rows],
+            x_coord=self.x_coord[rows],
+            y_coord=self.y_coord[rows],
+            demand_weight=self.demand_weight[rows],
+            demand_volume=self.demand_volume[rows],
+            service_time=self.service_time[rows],
+        )
+
+    def _view(self, row: int) -> Vertex:
+        return Vertex(
+            vertex_id=int(self.vertex_id[row]),
+            vertex_name=self.vertex_name[row],
+            vertex_type=VertexType.Depot if self.is_depot[row] else VertexType.Customer,
+            x_coord=float(self.x_coord[row]),
+            y_coord=float(self.y_coord[row]),
+            demand_weight=int(self.demand_weight[row]),
+            demand_volume=float(self.demand_volume[row]),
+            service_time=float(self.service_time[row]),
+        )
+
+    def index_of(self, vertex_name: str) -> int:
+        """Returns the row of the vertex with the given name."""
+        return self._name_index[vertex_name.strip()]
+
+    @property
+    def coordinates(self) -> np.ndarray:
+        """(n, 2) array of (x, y) coordinates."""
+        return np.column_stack((self.x_coord, self.y_coord))
+
+    @property
+    def customer_rows(self) -> np.ndarray:
+        return np.flatnonzero(~self.is_depot)
 
 
 @dataclass
@@ -65,12 +159,6 @@ class Arc:
     duration: float
     inside_km: float = 0.0
 
-    @field_validator('*')
-    def check_nonzero_members(cls, value):
-        if value < 0:
-            raise ValueError('negative arcs are not allowed')
-        return value
-
     @property
     def cost(self) -> float:
         return self.distance
@@ -94,54 +182,15 @@ class Parameters:
     green_upside: float
 
 
-
-    @field_validator('*')
-    def check_nonzero_members(cls, value):
-        if value <= 0.:
-            raise ValueError('parameter values must be greater than 0')
-        return value
-
-
 @dataclass
 class Instance:
     parameters: Parameters
-    vertices: list[Vertex]
+    vertices: VertexTable
     arcs: dict[ArcID, Arc]
 
-    @field_validator('vertices')
-    def check_single_depot(cls, vertices: list[Vertex]):
-        if sum(1 for x in vertices if x.is_depot) != 1:
-            raise ValueError('expected exactly one depot')
-        return vertices
-
-    @field_validator('vertices')
-    def check_at_least_one_customer(cls, vertices: list[Vertex]):
-        if sum(1 for x in vertices if x.is_customer) == 0:
-            raise ValueError('expected at least one customer')
-        return vertices
-
-    @field_validator('vertices')
-    def check_vertex_ids_match(cls, vertices: list[Vertex]):
-        for v_id, v in vertices:
-            if v_id != v.vertex_id:
-                raise ValueError(f'Vertex {v} has id {v.vertex_id} but expected {v_id}')
-        return vertices
-
-    @model_validator(mode='after')
-    def check_arc_matrix_complete(cls, members):
-        arcs = members['arcs']
-        vertices = members['vertices']
-        for u, v in product(vertices.values(), repeat=2):
-            if (u.vertex_id, v.vertex_id) not in arcs:
-                raise ValueError("arc ({(u.vertex_id, v.vertex_id)}) is missing")
-        if len(arcs) != len(vertices) ** 2:
-            raise ValueError('too many arcs: got {len(arcs)} but expected {len(vertices)**2}')
-
-        return members
-
     @property
     def depot(self) -> Vertex:
-        return self.vertices[0]
+        return self.vertices[int(np.flatnonzero(self.vertices.is_depot)[0])]
 
     @property
     def stations(self) -> Iterable[Vertex]:
@@ -149,4 +198,13 @@ class Instance:
 
     @property
     def customers(self) -> Iterable[Vertex]:
-        return (i for i in self.vertices if i.is_customer)
+        return (self.vertices[row] for row in self.vertices.customer_rows)
+
+    def cost_matrix(self) -> np.ndarray:
+        """Arc costs as a dense (n, n) matrix indexed by vertex id."""
+        n = len(self.vertices)
+        ids = np.fromiter(chain.from_iterable(self.arcs.keys()), dtype=np.int64, count=2 * len(self.arcs))
+        matrix = np.empty((n, n))
+        matrix[ids[0::2], ids[1::2]] = np.fromiter((arc.cost for arc in self.arcs.values()), dtype=np.float64,
+                                                   count=len(self.arcs))
+        return matrix
@@ -3,9 +3,12 @@ from itertools import product
 from math import sqrt
 from pathlib import Path
 from typing import Callable
+
+import numpy as np
+
 from .parsing_csv import parse_routes_file, parse_nodes_file
 
-from .models import Vertex, Parameters, ArcID, Arc, Instance, VertexType
+from .models import Vertex, Parameters, ArcID, Arc, Instance, VertexTable
 
 
 def create_arc_matrix(parameters: Parameters, vertices: list[Vertex],
@@ -109,68 +112,66 @@ def parse_instance(instance_path: Path, *, return_fleets: bool = False) -> Insta
 
     # === 1. Parse Coordinates ===
     coord_lines = lines[coord_start:demand_start]
-    vertices = []
-    for line in coord_lines:
+    n = len(coord_lines)
+    vertex_ids = np.empty(n, dtype=np.int64)
+    vertex_names: list[str] = []
+    x_coord = np.empty(n)
+    y_coord = np.empty(n)
+    for row, line in enumerate(coord_lines):
         tokens = line.split()
         if len(tokens) < 3:
             raise ValueError(f"Expected 3 columns (id, x, y), got: {line}")
-        vertex_id = int(tokens[0]) - 1  # convert 1-based to 0-based
-        x = float(tokens[1])
-        y = float(tokens[2])
-        vertex_type = VertexType.Depot if vertex_id == 0 else VertexType.Customer
-
-        vertex_name = id_map.get(int(tokens[0]), tokens[0]).strip()
-
-
-        vertices.append(Vertex(
-            vertex_id=vertex_id,
-            vertex_name=vertex_name,
-            vertex_type=vertex_type,
-            x_coord=x,
-            y_coord=y,
-            demand_weight=0,  # to be filled below
-            demand_volume=0.0,
-            service_time=15*60 #second
-        ))
+        vertex_ids[row] = int(tokens[0]) - 1  # convert 1-based to 0-based
+        x_coord[row] = float(tokens[1])
+        y_coord[row] = float(tokens[2])
+        vertex_names.append(id_map.get(int(tokens[0]), tokens[0]).strip())
 
     # === 2. Parse Demands ===
+    demand_weight = np.zeros(n, dtype=np.int64)
     for ln in lines[demand_start + 1: depmand_end]:
         tokens = ln.strip().split()
         if len(tokens) < 2:
             continue
         idx, w = tokens[:2]
-        vid = int(idx) - 1
-        vertices[vid].demand_weight = int(w)
+        demand_weight[int(idx) - 1] = int(w)
 
     # === 2b. Parse Volume (if exists)
     try:
         volume_start = lines.index("VOLUME_SECTION") + 1
         volume_end = lines.index("END_VOLUME_SECTION")
+        demand_volume = np.zeros(n)
         for ln in lines[volume_start:volume_end]:
             tokens = ln.strip().split()
             if len(tokens) < 2:
                 continue
             idx, vol = tokens[:2]
-            vid = int(idx) - 1
             # assuming volume is in dm³ → convert to m³
-            vertices[vid].demand_volume = float(vol) / 1000.0
+            demand_volume[int(idx) - 1] = float(vol) / 1000.0
     except ValueError:
         # fallback estimate if volume is missing
-        for v in vertices:
-            v.demand_volume = v.demand_weight / 1000.0
+        demand_volume = demand_weight / 1000.0
 
     avg_work_h = city.get("hours_per_day", 8.0)
     max_work_sec = 3600.0 * avg_work_h
 
+    service_time = np.full(n, 900.0)
     if "SERVICE_TIME_SECTION" in lines:
         st_s = lines.index("SERVICE_TIME_SECTION") + 1
         st_e = lines.index("END_SERVICE_TIME_SECTION")
         for ln in lines[st_s:st_e]:
             vid, sec = ln.split()
-            vertices[int(vid) - 1].service_time = float(sec)
-    else:
-        for v in vertices[1:]:
-            v.service_time = 900
+            service_time[int(vid) - 1] = float(sec)
+
+    vertices = VertexTable(
+        vertex_id=vertex_ids,
+        vertex_name=vertex_names,
+        is_depot=vertex_ids == 0,
+        x_coord=x_coord,
+        y_coord=y_coord,
+        demand_weight=demand_weight,
+        demand_volume=demand_volume,
+        service_time=service_time,
+    )
 
     # === 3. Parameters ===
     parameters = Parameters(
@@ -185,6 +186,10 @@ def parse_instance(instance_path: Path, *, return_fleets: bool = False) -> Insta
     # === 4. Arcs ===
     ROUTES_DIR = Path("resources/data")
     inferred_routes = ROUTES_DIR / f"{instance_path.stem}.routes"
+    if not inferred_routes.exists():
+        # .vrp files are written with lower-case names, the data files keep their original case
+        inferred_routes = next((p for p in ROUTES_DIR.glob("*.routes")
+                                if p.stem.lower() == instance_path.stem.lower()), inferred_routes)
     arcs = parse_routes_file(inferred_routes, vertices)
 
     inst = Instance(parameters=parameters, vertices=vertices, arcs=arcs)
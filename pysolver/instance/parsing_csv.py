@@ -2,20 +2,46 @@ import csv
 from pathlib import Path
 from typing import Dict, Tuple
 from datetime import datetime, timedelta
-from .models import Vertex, Arc, ArcID
+from .models import Arc, ArcID
 
 
+import numpy as np
 import pandas as pd
 
-from .models import Vertex, VertexType, Arc, Instance, Parameters
+from .models import VertexTable, Arc, Instance, Parameters
 
-def _hhmmss_to_seconds(hhmmss: str) -> int:
-    h, m, s = map(int, hhmmss.strip().split(":"))
-    return h * 3600 + m * 60 + s
+_HHMMSS_WEIGHTS = np.array([3600, 60, 1], dtype=np.int64)
 
-def parse_nodes_file(path: Path) -> list[Vertex]:
-    vertices = []
 
+def durations_to_seconds(column: pd.Series) -> np.ndarray:
+    """
+    Decodes a whole duration column into seconds. Entries may be HH:MM:SS strings or plain
+    (numeric) seconds; missing entries decode to 0.
+    """
+    if pd.api.types.is_numeric_dtype(column):
+        return column.fillna(0.0).to_numpy(dtype=np.float64)
+
+    text = column.astype("string").str.strip()
+    is_hhmmss = text.str.contains(":", regex=False).fillna(False).to_numpy(dtype=bool)
+    is_plain = ~is_hhmmss & text.notna().to_numpy(dtype=bool)
+
+    seconds = np.zeros(len(text), dtype=np.float64)
+    if is_hhmmss.any():
+        fields = text[is_hhmmss].str.split(":", expand=True).astype(np.int64).to_numpy()
+        seconds[is_hhmmss] = fields @ _HHMMSS_WEIGHTS
+    if is_plain.any():
+        seconds[is_plain] = text[is_plain].astype(np.float64).to_numpy()  # already seconds
+    return seconds
+
+
+def seconds_to_hhmmss(seconds: np.ndarray) -> list[str]:
+    """Inverse of durations_to_seconds: formats seconds as HH:MM:SS strings."""
+    seconds = np.rint(np.asarray(seconds, dtype=np.float64)).astype(np.int64)
+    return [f"{h:02d}:{m:02d}:{s:02d}" for h, m, s in
+            zip((seconds // 3600).tolist(), (seconds // 60 % 60).tolist(), (seconds % 60).tolist())]
+
+
+def parse_nodes_file(path: Path) -> VertexTable:
     # 🚨 Force Id column to string so 'D0', 'C1', ... are preserved!
     nodes_df = pd.read_csv(
         path,
@@ -24,93 +50,59 @@ def parse_nodes_file(path: Path) -> list[Vertex]:
         dtype={"Id": str}
     )
 
-    for _, row in nodes_df.iterrows():
-        name = row['Id'].strip()
-        print(f"[DEBUG] Raw name: '{name}' → stripped: '{name.strip()}' (len={len(name)})")
-
-        # Extract vertex_id correctly from the name (e.g., C35 → 35)
-        if name.startswith("C"):
-            vertex_id = int(name[1:])
-            vertex_type = VertexType.Customer
-        elif name.startswith("D"):
-            vertex_id = 0
-            vertex_type = VertexType.Depot
-        else:
-            raise ValueError(f"Unknown Id format: {name}")
-
-        lon = float(row['Lon'])
-        lat = float(row['Lat'])
-        weight = int(row['Demand[kg]'])
-        volume = float(row['Demand[m^3*10^-3]']) / 1000.0  # Convert to m³
-        duration = row["Duration"]
-
-        if pd.isna(duration):
-            service_time = 0.0
-        elif isinstance(duration, str) and ":" in duration:
-            service_time = _hhmmss_to_seconds(duration)
-        else:
-            service_time = float(duration)
-
-        vertices.append(Vertex(
-            vertex_id=vertex_id,
-            vertex_name=name,
-            vertex_type=vertex_type,
-            x_coord=lon,
-            y_coord=lat,
-            demand_weight=weight,
-            demand_volume=volume,
-            service_time=service_time
-        ))
-    if name.strip() in {"C35", "C6"}:
-        print(f"[DEBUG] From .nodes → {name}: weight={weight}, volume={volume}")
-
-    return vertices
+    names = nodes_df['Id'].str.strip()
+    is_depot = names.str.startswith("D").to_numpy()
+    is_customer = names.str.startswith("C").to_numpy()
+    if not np.all(is_depot | is_customer):
+        raise ValueError(f"Unknown Id format: {names[~(is_depot | is_customer)].iloc[0]}")
+
+    # Extract vertex_id correctly from the name (e.g., C35 → 35), depots are always 0
+    vertex_ids = np.where(is_depot, 0, names.str[1:].astype(np.int64))
+
+    return VertexTable(
+        vertex_id=vertex_ids,
+        vertex_name=names,
+        is_depot=is_depot,
+        x_coord=nodes_df['Lon'].to_numpy(dtype=float),
+        y_coord=nodes_df['Lat'].to_numpy(dtype=float),
+        demand_weight=nodes_df['Demand[kg]'].to_numpy(dtype=np.int64),
+        demand_volume=nodes_df['Demand[m^3*10^-3]'].to_numpy(dtype=float) / 1000.0,  # Convert to m³
+        service_time=durations_to_seconds(nodes_df["Duration"]),
+    )
 
 # def parse_duration(s: str) -> timedelta:
 #     return datetime.strptime(s.strip(), "%H:%M:%S") - datetime(1900, 1, 1)
 
 
 def parse_routes_file(path: Path,
-                      vertices: list[Vertex]) -> Dict[ArcID, Arc]:
+                      vertices: VertexTable) -> Dict[ArcID, Arc]:
     """Read *.routes* and build the full (i,j)->Arc dictionary."""
     df = pd.read_csv(path, sep=r"\s+", header=0,
                      dtype={"From": str, "To": str})
 
     # name  -> vertex_id
-    name2id = {v.vertex_name.strip(): v.vertex_id for v in vertices}
+    name2id = dict(zip(vertices.vertex_name, vertices.vertex_id.tolist()))
     arcs: Dict[ArcID, Arc] = {}
 
-    for _, row in df.iterrows():
-        from_name = row["From"].strip()
-        to_name   = row["To"].strip()
-
+    columns = zip(
+        df["From"].str.strip().tolist(),
+        df["To"].str.strip().tolist(),
+        df["DistanceTotal[km]"].to_numpy(dtype=np.float64).tolist(),  # km
+        df["DistanceInside[km]"].to_numpy(dtype=np.float64).tolist(),
+        durations_to_seconds(df["Duration[s]"]).tolist(),  # travel-time (sec)
+    )
+    for from_name, to_name, dist_km, dist_inside, dur_sec in columns:
         if from_name not in name2id or to_name not in name2id:
             print(f"⚠️  Skipping arc {from_name}->{to_name} "
                   f"(name not found in .nodes)")
             continue
 
-        i = name2id[from_name]
-        j = name2id[to_name]
-
-        # -------- distance (km) -------------------------------
-        dist_km = float(row["DistanceTotal[km]"])
-        dist_inside = float(row["DistanceInside[km]"])
-
-        # -------- travel-time (sec) ---------------------------
-        dur_raw = row["Duration[s]"]
-        if pd.isna(dur_raw):
-            dur_sec = 0.0
-        elif isinstance(dur_raw, str) and ":" in dur_raw:
-            dur_sec = _hhmmss_to_seconds(dur_raw)
-        else:
-            dur_sec = float(dur_raw)          # already seconds
-
-        arcs[(i, j)] = Arc(distance=dist_km,
-                           duration=dur_sec,
-                           inside_km=dist_inside)   #  ← stored!
+        arcs[(name2id[from_name], name2id[to_name])] = Arc(distance=dist_km,
+                                                           duration=dur_sec,
+                                                           inside_km=dist_inside)   #  ← stored!
 
     # ---------- fill missing (i,i) and ∞-arcs -----------------
-    ids = [v.vertex_id for v in vertices]
+    ids = vertices.vertex_id.tolist()
     for u in ids:
         for v in ids:
             if (u, v) not in arcs:
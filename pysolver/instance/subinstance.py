@@ -0,0 +1,203 @@
+# subinstance.py ── cut sub-instances (districts, random samples) out of a city
+#
+#   python -m pysolver.instance.subinstance NewYork --from-nodes resources/data/NewYorkManhattan.nodes \
+#                                                   --from-nodes resources/data/NewYorkState.nodes \
+#                                                   --out-dir resources/data/districts
+#   python -m pysolver.instance.subinstance Paris --sample 20 --count 5 --seed 1
+#
+#   For every subset this writes <name>.nodes and <name>.routes to --out-dir (resources/data by
+#   default) and <name>.vrp / <name>.id_map.txt to resources/instances/test_instances. Sub-instances
+#   are refused if they would overwrite one of the files they are cut from.
+#
+#   The nodes and routes of a city are turned into dense arc matrices once (and cached
+#   in resources/data/.cache, keyed by the file hashes). A subset is then a plain index
+#   slice of those matrices, so no routes table has to be scanned per subset.
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Mapping
+import json
+
+import click
+import numpy as np
+import pandas as pd
+
+from pysolver.instance.models import VertexTable
+from pysolver.instance.parsing_csv import durations_to_seconds, parse_nodes_file, seconds_to_hhmmss
+from pysolver.instance.vrp_make import CFG_FILE, DATA_DIR, INST_OUT_DIR, file_digest, write_vrp
+
+CACHE_DIR = DATA_DIR / ".cache"
+
+ROUTE_COLUMNS = ["DistanceTotal[km]", "DistanceInside[km]", "DistanceOutside[km]", "Duration[s]"]
+
+
+@dataclass
+class CityTables:
+    """Nodes of a city plus its arcs as dense (n, n) matrices; missing arcs are NaN."""
+    nodes: pd.DataFrame  # raw .nodes rows, kept as text so they are written back unchanged
+    vertices: VertexTable
+    distance: np.ndarray
+    distance_inside: np.ndarray
+    distance_outside: np.ndarray
+    duration: np.ndarray
+
+    def rows_of(self, node_ids: Iterable[str]) -> np.ndarray:
+        """Rows of the given node ids, depot first. The depot is added if missing."""
+        rows = [self.vertices.index_of(node_id) for node_id in node_ids]
+        depot_row = int(np.flatnonzero(self.vertices.is_depot)[0])
+        return np.asarray([depot_row, *(row for row in rows if row != depot_row)], dtype=np.int64)
+
+
+def _read_nodes(nodes_path: Path) -> pd.DataFrame:
+    return pd.read_csv(nodes_path, sep=r"\s+", header=0, dtype=str)
+
+
+def _build_matrices(vertices: VertexTable, routes_path: Path) -> dict[str, np.ndarray]:
+    routes = pd.read_csv(routes_path, sep=r"\s+", header=0, dtype={"From": str, "To": str})
+    index = pd.Index(vertices.vertex_name)
+    rows = index.get_indexer(routes["From"].str.strip())
+    cols = index.get_indexer(routes["To"].str.strip())
+    known = (rows >= 0) & (cols >= 0)
+    rows, cols = rows[known], cols[known]
+
+    n = len(vertices)
+    matrices = {}
+    for key, column in zip(("distance", "distance_inside", "distance_outside"), ROUTE_COLUMNS):
+        matrix = np.full((n, n), np.nan)
+        matrix[rows, cols] = routes[column].to_numpy(dtype=np.float64)[known]
+        matrices[key] = matrix
+    duration = np.full((n, n), np.nan)
+    duration[rows, cols] = durations_to_seconds(routes["Duration[s]"])[known]
+    matrices["duration"] = duration
+    return matrices
+
+
+def load_city(nodes_path: Path, routes_path: Path) -> CityTables:
+    """Loads a city, reusing the cached arc matrices if nodes and routes are unchanged."""
+    vertices = parse_nodes_file(nodes_path)
+    cache_key = f"{file_digest(nodes_path)}:{file_digest(routes_path)}"
+    cache_path = CACHE_DIR / f"{routes_path.stem}.npz"
+
+    matrices = None
+    if cache_path.exists():
+        with np.load(cache_path) as cached:
+            if str(cached["key"]) == cache_key:
+                matrices = {key: cached[key] for key in cached.files if key != "key"}
+    if matrices is None:
+        matrices = _build_matrices(vertices, routes_path)
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        np.savez(cache_path, key=np.asarray(cache_key), **matrices)
+
+    return CityTables(nodes=_read_nodes(nodes_path), vertices=vertices, **matrices)
+
+
+def _write_nodes(tables: CityTables, rows: np.ndarray, path: Path):
+    tables.nodes.iloc[rows].to_csv(path, sep=" ", index=False)
+
+
+def _write_routes(tables: CityTables, rows: np.ndarray, path: Path):
+    grid = np.ix_(rows, rows)
+    distance = tables.distance[grid].ravel()
+    present = ~np.isnan(distance)
+    names = np.asarray(tables.vertices.vertex_name, dtype=object)[rows]
+    m = len(rows)
+    routes = pd.DataFrame({
+        "From": np.repeat(names, m)[present],
+        "To": np.tile(names, m)[present],
+        "DistanceTotal[km]": distance[present],
+        "DistanceInside[km]": tables.distance_inside[grid].ravel()[present],
+        "DistanceOutside[km]": tables.distance_outside[grid].ravel()[present],
+        "Duration[s]": seconds_to_hhmmss(np.nan_to_num(tables.duration[grid].ravel()[present])),
+    })
+    routes.to_csv(path, sep=" ", index=False)
+
+
+def extract_subinstances(city: str, subsets: Mapping[str, Iterable[str]], *,
+                         out_dir: Path = DATA_DIR, instance_dir: Path = INST_OUT_DIR,
+                         write_instance: bool = True, source_files: Iterable[Path] = ()) -> list[str]:
+    """
+    Cuts several sub-instances out of ``city`` (a key of city_configs.json) in one pass.
+
+    :param subsets: Maps the name of each sub-instance to the ids (e.g. ``"C12"``) of the nodes it contains.
+        The depot of the city is always included.
+    :param out_dir: Directory the <name>.nodes and <name>.routes files are written to. The city itself is always
+        read from resources/data.
+    :param write_instance: Also write <name>.vrp and <name>.id_map.txt using the fleet and city
+        parameters of ``city``.
+    :param source_files: Further files the subsets were read from. Like the nodes and routes files of ``city``,
+        they are never overwritten.
+    :return: The names of the written sub-instances.
+    :raises FileExistsError: If a sub-instance would overwrite one of the input files. Nothing is written then.
+    """
+    spec = json.loads(CFG_FILE.read_text())[city]
+    nodes_path, routes_path = DATA_DIR / spec["nodes_path"], DATA_DIR / spec["routes_path"]
+    inputs = {Path(path).resolve() for path in (nodes_path, routes_path, *source_files)}
+    for name in subsets:
+        for path in (out_dir / f"{name}.nodes", out_dir / f"{name}.routes"):
+            if path.resolve() in inputs:
+                raise FileExistsError(f"sub-instance {name!r} would overwrite its input {path}")
+    tables = load_city(nodes_path, routes_path)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    instance_dir.mkdir(parents=True, exist_ok=True)
+    for name, node_ids in subsets.items():
+        rows = tables.rows_of(node_ids)
+        _write_nodes(tables, rows, out_dir / f"{name}.nodes")
+        _write_routes(tables, rows, out_dir / f"{name}.routes")
+        if write_instance:
+            sub_spec = {**spec, "nodes_path": f"{name}.nodes", "routes_path": f"{name}.routes"}
+            write_vrp(name, sub_spec, tables.vertices.take(rows, renumber=True), out_dir=instance_dir)
+    return list(subsets)
+
+
+def extract_subinstance(city: str, node_ids: Iterable[str], name: str, **kwargs) -> str:
+    """Cuts a single sub-instance out of ``city``. See :func:`extract_subinstances`."""
+    return extract_subinstances(city, {name: node_ids}, **kwargs)[0]
+
+
+def sample_subsets(city: str, size: int, count: int, seed: int = 0) -> dict[str, list[str]]:
+    """Draws ``count`` random customer subsets of ``size`` customers each from ``city``."""
+    spec = json.loads(CFG_FILE.read_text())[city]
+    vertices = parse_nodes_file(DATA_DIR / spec["nodes_path"])
+    customers = vertices.customer_rows
+    if size > len(customers):
+        raise ValueError(f"{city} has only {len(customers)} customers, cannot sample {size}")
+    rng = np.random.default_rng(seed)
+    return {
+        f"{city.lower()}_s{size}_{k}": [vertices.vertex_name[row] for row in
+                                          np.sort(rng.choice(customers, size=size, replace=False)).tolist()]
+        for k in range(count)
+    }
+
+
+@click.command("subinstance")
+@click.argument("city")
+@click.option("--from-nodes", "nodes_files", multiple=True, type=click.Path(exists=True, dir_okay=False),
+              help="Create one sub-instance per .nodes file, named after the file.")
+@click.option("--sample", "sample_size", type=int, default=None,
+              help="Create random sub-instances with this many customers.")
+@click.option("--count", type=int, default=1, help="Number of random sub-instances.")
+@click.option("--seed", type=int, default=0)
+@click.option("--vrp/--no-vrp", "write_instance", default=True, help="Also write .vrp and id_map files.")
+@click.option("--out-dir", type=click.Path(file_okay=False, path_type=Path), default=DATA_DIR, show_default=True,
+              help="Directory for the .nodes and .routes files of the sub-instances.")
+def main(city: str, nodes_files: tuple[str, ...], sample_size: int | None, count: int, seed: int,
+         write_instance: bool, out_dir: Path):
+    subsets: dict[str, list[str]] = {}
+    for nodes_file in nodes_files:
+        subsets[Path(nodes_file).stem] = _read_nodes(Path(nodes_file))["Id"].str.strip().tolist()
+    if sample_size is not None:
+        subsets.update(sample_subsets(city, sample_size, count, seed))
+    if not subsets:
+        raise click.UsageError("nothing to extract, pass --from-nodes and/or --sample")
+
+    try:
+        names = extract_subinstances(city, subsets, out_dir=out_dir, write_instance=write_instance,
+                                     source_files=[Path(nodes_file) for nodes_file in nodes_files])
+    except FileExistsError as error:
+        raise click.UsageError(f"{error}; choose another --out-dir") from error
+    for name in names:
+        print(f"✅ {city}: {name}.nodes, {name}.routes written to {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
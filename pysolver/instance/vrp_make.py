@@ -1,14 +1,23 @@
 # vrp_make.py ── create .vrp + id_map.txt for all cities in city_configs.json
 #
-#   python vrp_make.py
+#   python -m pysolver.instance.vrp_make [--workers N] [--force] [--city NAME ...]
 #
 #   outputs to:
 #       resources/instances/test_instances/<city>.vrp
 #       resources/instances/test_instances/<city>.id_map.txt
-from gettext import Catalog
+#
+#   Only cities whose inputs (nodes file, routes file, used fleet catalog entries,
+#   city config) changed since the last run are regenerated. Their fingerprints are
+#   kept in resources/instances/test_instances/vrp_make.deps.json.
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+import hashlib
 import json
+import os
+
+import click
 
+from pysolver.instance.models import VertexTable
 from pysolver.instance.parsing_csv import (
     parse_instance_from_csv
 )
@@ -20,18 +29,14 @@ DATA_DIR     = PROJ_ROOT / "resources" / "data"
 INST_OUT_DIR = PROJ_ROOT / "resources" / "instances" / "test_instances"
 CFG_FILE     = DATA_DIR / "city_configs.json"
 CATALOG_FILE  = DATA_DIR / "fleet_catalog.json"
+DEPS_FILE    = INST_OUT_DIR / "vrp_make.deps.json"
 
 INST_OUT_DIR.mkdir(parents=True, exist_ok=True)
 CATALOG = json.loads(CATALOG_FILE.read_text())
 
 # --------------------------------------------------------------------------
-def build_vrp(city: str, spec: dict):
-    """Create <city>.vrp and <city>.id_map.txt from config spec."""
-    nodes_path  = DATA_DIR / spec["nodes_path"]
-    routes_path = DATA_DIR / spec["routes_path"]
-
-    mix: dict[str, int] = spec["fleets"]  # type id  →  count
-
+def _fleet_rows(mix: dict[str, int]) -> list[dict]:
+    """Expands a fleet mix (type id → count) with the catalog data of each type."""
     fleet_rows = []
     for typ, cnt in mix.items():
         cat = CATALOG[typ]
@@ -46,23 +51,16 @@ def build_vrp(city: str, spec: dict):
             m_rng=cat["max_range_km"],
             main_c=cat["maint_c_km"],
         ))
+    return fleet_rows
 
-    initial_mix: dict[str, int] = spec["initial_fleet"]  # type id  →  count
 
-    initial_fleet_rows = []
-    for typ, cnt in initial_mix.items():
-        cat = CATALOG[typ]
-        initial_fleet_rows.append(dict(
-            typ=typ,
-            cnt=cnt,
-            vol=cat["volume_m3"],
-            pay_w=cat["payload_kg"],
-            acq_c=cat["acq_cost"],
-            con_kWh=cat["cons_kWh_km"],
-            con_l=cat["cons_l_km"],
-            m_rng=cat["max_range_km"],
-            main_c=cat["maint_c_km"],
-        ))
+def build_vrp(city: str, spec: dict):
+    """Create <city>.vrp and <city>.id_map.txt from config spec."""
+    nodes_path  = DATA_DIR / spec["nodes_path"]
+    routes_path = DATA_DIR / spec["routes_path"]
+
+    fleet_rows = _fleet_rows(spec["fleets"])
+    initial_fleet_rows = _fleet_rows(spec["initial_fleet"])
 
     # ---- capacity & fleet size (legacy weight capacity for header) ----------
     cap_weight = fleet_rows[0]["pay_w"]
@@ -99,23 +97,31 @@ def build_vrp(city: str, spec: dict):
         green_upside=green_upside
     )
 
+    write_vrp(city, spec, inst.vertices)
+
+
+def write_vrp(city: str, spec: dict, vertices: VertexTable, out_dir: Path = INST_OUT_DIR):
+    """Write <city>.vrp and <city>.id_map.txt for the given vertices and config spec."""
+    fleet_rows = _fleet_rows(spec["fleets"])
+    initial_fleet_rows = _fleet_rows(spec["initial_fleet"])
+
     city_slug = city.lower()
 
     # ----------- id_map.txt  -----------------------------------------------
-    id_map_path = INST_OUT_DIR / f"{city_slug}.id_map.txt"
+    id_map_path = out_dir / f"{city_slug}.id_map.txt"
     with id_map_path.open("w") as mp:
-        for v in inst.vertices:
-            mp.write(f"{v.vertex_id + 1} {v.vertex_name}\n")
+        for vertex_id, name in zip(vertices.vertex_id.tolist(), vertices.vertex_name):
+            mp.write(f"{vertex_id + 1} {name}\n")
 
     # ----------- .vrp file --------------------------------------------------
-    vrp_path = INST_OUT_DIR / f"{city_slug}.vrp"
+    vrp_path = out_dir / f"{city_slug}.vrp"
     with vrp_path.open("w") as f:
 
         # classic header
         f.write(f"NAME : {city.upper()}\n")
         f.write("TYPE : HFVRP\n")
         f.write("COMMENT : generated from city_configs.json\n")
-        f.write(f"DIMENSION : {len(inst.vertices)}\n\n")
+        f.write(f"DIMENSION : {len(vertices)}\n\n")
 
         # ---- fleet block ---------------------------------------------------
         f.write("FLEET_SECTION\n")
@@ -147,18 +153,18 @@ def build_vrp(city: str, spec: dict):
 
         # ---- coordinates ---------------------------------------------------
         f.write("NODE_COORD_SECTION\n")
-        for v in inst.vertices:
+        for v in vertices:
             f.write(f"{v.vertex_id + 1} {v.x_coord:.6f} {v.y_coord:.6f}\n")
 
         # ---- demands (weight) ---------------------------------------------
         f.write("\nDEMAND_SECTION\n")
-        for v in inst.vertices:
+        for v in vertices:
             f.write(f"{v.vertex_id + 1} {v.demand}\n")
         f.write("END_DEMAND_SECTION\n\n")
 
         # ---- volumes -------------------------------------------------------
         f.write("\nVOLUME_SECTION\n")
-        for v in inst.vertices:
+        for v in vertices:
             # convert m³ to milliliters (×1000) for compatibility
             milliliters = int(round(v.demand_volume * 1000))
             f.write(f"{v.vertex_id + 1} {milliliters}\n")
@@ -166,27 +172,109 @@ def build_vrp(city: str, spec: dict):
 
         # ---- depot ---------------------------------------------------------
         f.write("\nDEPOT_SECTION\n")
-        f.write(f"{inst.depot.vertex_id + 1}\n-1\n")
+        f.write(f"{int(vertices.vertex_id[vertices.is_depot][0]) + 1}\n-1\n")
         f.write("EOF\n\n")
 
         # ---- service time ---------------------------------------------------------
         f.write("SERVICE_TIME_SECTION\n")
-        for v in inst.vertices:  # depot first, then customers
-            f.write(f"{v.vertex_id + 1} {v.service_time}\n")
+        for vertex_id, service_time in zip(vertices.vertex_id.tolist(),
+                                           vertices.service_time.tolist()):  # depot first, then customers
+            if service_time.is_integer():
+                service_time = int(service_time)
+            f.write(f"{vertex_id + 1} {service_time}\n")
         f.write("END_SERVICE_TIME_SECTION\n\n")
 
     print(f"✅ {city}:  {vrp_path.name}, {id_map_path.name} written")
 
 # --------------------------------------------------------------------------
-def main():
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def city_fingerprint(spec: dict) -> str:
+    """Hash of everything build_vrp reads for a city: nodes, routes, catalog entries and config."""
+    used_types = sorted(set(spec["fleets"]) | set(spec["initial_fleet"]))
+    deps = {
+        "nodes": file_digest(DATA_DIR / spec["nodes_path"]),
+        "routes": file_digest(DATA_DIR / spec["routes_path"]),
+        "catalog": {typ: CATALOG[typ] for typ in used_types},
+        "spec": spec,
+    }
+    return hashlib.sha256(json.dumps(deps, sort_keys=True).encode()).hexdigest()
+
+
+def _outputs_exist(city: str) -> bool:
+    city_slug = city.lower()
+    return (INST_OUT_DIR / f"{city_slug}.vrp").exists() and (INST_OUT_DIR / f"{city_slug}.id_map.txt").exists()
+
+
+def _load_deps() -> dict[str, str]:
+    try:
+        return json.loads(DEPS_FILE.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _store_deps(deps: dict[str, str]):
+    tmp_path = DEPS_FILE.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(deps, indent=2, sort_keys=True))
+    tmp_path.replace(DEPS_FILE)
+
+
+@click.command("vrp_make")
+@click.option("--workers", type=int, default=None,
+              help="Number of worker processes (default: number of CPUs).")
+@click.option("--force", is_flag=True, default=False, help="Regenerate all cities regardless of fingerprints.")
+@click.option("--city", "cities", multiple=True, help="Restrict generation to the given cities.")
+def main(workers: int | None, force: bool, cities: tuple[str, ...]):
     with CFG_FILE.open() as f:
         configs = json.load(f)
+    if cities:
+        configs = {city: spec for city, spec in configs.items() if city in cities}
 
+    deps = _load_deps()
+    stale: dict[str, str] = {}
     for city, spec in configs.items():
         try:
-            build_vrp(city, spec)
+            fingerprint = city_fingerprint(spec)
         except Exception as e:
             print(f"⚠️ {city}: {e}")
+            continue
+        if force or deps.get(city) != fingerprint or not _outputs_exist(city):
+            stale[city] = fingerprint
+        else:
+            print(f"✔ {city}: up to date")
+
+    if not stale:
+        return
+
+    workers = min(workers or os.cpu_count() or 1, len(stale))
+    if workers == 1:
+        for city, fingerprint in stale.items():
+            try:
+                build_vrp(city, configs[city])
+            except Exception as e:
+                print(f"⚠️ {city}: {e}")
+                continue
+            deps[city] = fingerprint
+            _store_deps(deps)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(build_vrp, city, configs[city]): city for city in stale}
+        for future in as_completed(futures):
+            city = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f"⚠️ {city}: {e}")
+                continue
+            deps[city] = stale[city]
+            _store_deps(deps)
 
 if __name__ == "__main__":
     main()
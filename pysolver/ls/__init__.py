@@ -1,7 +1,29 @@
+import numpy as np
 import routingblocks as rb
 from pysolver.instance.models import Instance
 
 
+def granular_arc_mask(costs: np.ndarray, granularity: int) -> np.ndarray:
+    """
+    Boolean (n, n) mask that keeps, for every non-depot vertex, the arcs to its ``granularity`` cheapest non-depot
+    successors (ties go to the lower index). Arcs from and to the depot are always kept.
+    """
+    mask = np.ones(costs.shape, dtype=bool)
+    inner = costs[1:, 1:]
+    if granularity >= inner.shape[1]:
+        return mask
+    if granularity <= 0:
+        mask[1:, 1:] = False
+        return mask
+    kth = np.partition(inner, granularity - 1, axis=1)[:, granularity - 1, None]
+    cheaper = inner < kth
+    ties = inner == kth
+    # Among the arcs as expensive as the k-th cheapest, keep as many as needed in index order
+    missing = granularity - cheaper.sum(axis=1, keepdims=True)
+    mask[1:, 1:] = cheaper | (ties & (np.cumsum(ties, axis=1) <= missing))
+    return mask
+
+
 class CustomLocalSearch:
     _local_search: rb.LocalSearch
     _reduced_arc_set: rb.ArcSet
@@ -10,16 +32,10 @@ class CustomLocalSearch:
     def __init__(self, py_instance: Instance, evaluation: rb.Evaluation, cpp_instance: rb.Instance,
                  granularity: int = 20):
         self._local_search = rb.LocalSearch(cpp_instance, evaluation, None, rb.BestImprovementPivotingRule())
+        # Perturbed solutions share most routes with the previous local optimum, don't search those again
+        self._local_search.remember_local_optima = True
 
-        arc_set = rb.ArcSet(len(py_instance.vertices))
-        for i in range(1, len(py_instance.vertices)):
-            sorted_arcs = sorted(
-                ((j, py_instance.arcs[py_instance.vertices[i].vertex_id, py_instance.vertices[j].vertex_id]) for j in
-                 range(1, len(py_instance.vertices))), key=lambda arc: arc[1].cost)
-            for j, _ in sorted_arcs[granularity:]:
-                arc_set.forbid_arc(i, j)
-
-        self._reduced_arc_set = arc_set
+        self._reduced_arc_set = rb.ArcSet.from_mask(granular_arc_mask(py_instance.cost_matrix(), granularity))
 
         self._operators = [
             rb.operators.SwapOperator_0_1(cpp_instance, self._reduced_arc_set),
@@ -28,6 +44,11 @@ class CustomLocalSearch:
             rb.operators.InterRouteTwoOptOperator(cpp_instance, self._reduced_arc_set),
         ]
 
+    @property
+    def arc_set(self) -> rb.ArcSet:
+        """The granular arc set restricting the operators. Shared with granular repair operators."""
+        return self._reduced_arc_set
+
     def improve(self, solution: rb.Solution) -> rb.Solution:
         self._local_search.optimize(solution, self._operators)
         return solution
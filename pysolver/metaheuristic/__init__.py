@@ -1,36 +1,53 @@
-import random
+import math
+import time
 
+import numpy as np
 import routingblocks as rb
 from pysolver.instance.models import Instance
 from routingblocks.operators.move_selectors import last_move_selector, random_selector_factory
-from routingblocks.operators.related_removal import RelatedVertexRemovalMove, build_relatedness_matrix
-import math
+from routingblocks.operators.related_removal import RelatedNeighbors
 
 
+def related_neighbors(py_instance: Instance, k: int) -> RelatedNeighbors:
+    """The ``k`` vertices closest to each vertex by euclidean distance of the coordinates, relatedness -distance."""
+    x = py_instance.vertices.x_coord
+    y = py_instance.vertices.y_coord
+    distance = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :])
+    np.fill_diagonal(distance, np.inf)
+    k = min(k, len(distance) - 1)
+    neighbors = np.argpartition(distance, k - 1, axis=1)[:, :k]
+    return RelatedNeighbors(neighbors, -np.take_along_axis(distance, neighbors, axis=1))
+
 
 def lns(py_instance: Instance, evaluation: rb.Evaluation, cpp_instance: rb.Instance,
         cpp_random: rb.Random,
         initial_solution: rb.Solution, max_iterations: int, remove_fraction: float = 0.20,
-        destroy_weights: tuple[float, float, float] = (1.0, 0.0, 0.0)) -> rb.Solution:
-
-    lns = rb.LargeNeighborhood(cpp_random)
-
-    vertices = py_instance.vertices
-
-    def distance_relatedness(u: int, v: int) -> float:
-        vert_u = vertices[u]
-        vert_v = vertices[v]
-        dx = vert_u.x_coord - vert_v.x_coord
-        dy = vert_u.y_coord - vert_v.y_coord
-        return -math.hypot(dx, dy)
-
-    relatedness_matrix = build_relatedness_matrix(cpp_instance, distance_relatedness)
+        destroy_weights: tuple[float, float, float] = (1.0, 0.0, 0.0),
+        adaptation_period: int = 0, smoothing_factor: float = 0.2,
+        time_limit: float | None = None, on_improvement=None,
+        checkpoint_every: int = 100, on_checkpoint=None) -> rb.Solution:
+    """
+    LNS with random, worst and related removal and best insertion, accepting only improvements.
+
+    :param destroy_weights: Initial selection weights of the random, worst and related removal operators.
+    :param adaptation_period: Adapt the destroy weights to the acceptance rate of each operator every
+        ``adaptation_period`` iterations. 0 keeps ``destroy_weights`` fixed. Operators with weight 0 stay disabled.
+    :param smoothing_factor: Share of the last period's acceptance rate in an adapted weight.
+    :param on_checkpoint: Called as ``on_checkpoint(best_solution, iterations_done, destroy_weights)`` every
+        ``checkpoint_every`` iterations, rounded up to a multiple of ``adaptation_period``. The native loop then runs
+        in chunks of that many iterations, which does not change the search.
+    """
+    lns = rb.AdaptiveLargeNeighborhood(cpp_random, smoothing_factor)
+
+    num_customers = len(py_instance.vertices) - 1
+    num_removed = max(1, int(num_customers * remove_fraction))
 
     destroy_operators = [
         rb.operators.RandomRemovalOperator(cpp_random),
         rb.operators.WorstRemovalOperator(cpp_instance, last_move_selector),
         rb.operators.RelatedRemovalOperator(
-            relatedness_matrix,
+            # A seed never needs more related vertices than are removed in total
+            related_neighbors(py_instance, num_removed),
             random_selector_factory(cpp_random),  # move_selector
             random_selector_factory(cpp_random),  # seed_selector
             random_selector_factory(cpp_random)  # initial_seed_selector
@@ -40,8 +57,9 @@ def lns(py_instance: Instance, evaluation: rb.Evaluation, cpp_instance: rb.Insta
     wsum = sum(destroy_weights)
     destroy_weights = [w/wsum for w in destroy_weights] if wsum > 0 else [1.0, 0.0, 0.0]
 
-    for operator in destroy_operators:
+    for operator, weight in zip(destroy_operators, destroy_weights):
         lns.add_destroy_operator(operator)
+        lns.set_destroy_operator_weight(operator, weight)
 
     repair_operators = [
         rb.operators.BestInsertionOperator(cpp_instance, rb.operators.move_selectors.first_move_selector)
@@ -50,35 +68,45 @@ def lns(py_instance: Instance, evaluation: rb.Evaluation, cpp_instance: rb.Insta
     for operator in repair_operators:
         lns.add_repair_operator(operator)
 
-    current_solution = initial_solution
-    for it in range(max_iterations):
-        destroy_op = random.choices(destroy_operators, weights=destroy_weights, k=1)[0]
-        new_solution = current_solution.copy()
-        num_customers = len(py_instance.vertices) - 1
-        num_removed = max(1, int(num_customers * remove_fraction))
-        destroy_op.apply(evaluation, new_solution, num_removed)
-
-        vertex_ids = list(missing_customers(new_solution, len(py_instance.vertices)))
-        repair_op = repair_operators[0]
-        repair_op.apply(evaluation, new_solution, vertex_ids)
-
-        if new_solution.cost < current_solution.cost:
-            print(f"it {it}: new best solution found with {new_solution.cost}")
-            current_solution = new_solution
-        else:
-            pass
-
-        missing = missing_customers(new_solution, len(py_instance.vertices))
-        if missing:
-            print(f"⚠️  Iteration {it}: Missing customers {missing}")
-
-    return current_solution
-
-def missing_customers(solution: rb.Solution, num_customers: int) -> set[int]:
-    visited = set()
-    for route in solution:
-        for v in route:
-            visited.add(v.vertex_id)
-    expected = set(range(1, num_customers))  # assuming 0 = depot
-    return expected - visited
-
+    chunk_size = max_iterations
+    if on_checkpoint is not None:
+        chunk_size = max(1, checkpoint_every)
+        if adaptation_period > 0:
+            chunk_size = math.ceil(chunk_size / adaptation_period) * adaptation_period
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+
+    # The destroy/repair/accept loop runs natively, python is only entered for the python operators
+    best_solution, done, fingerprints = initial_solution, 0, []
+    while done < max_iterations:
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            break
+        chunk = min(chunk_size, max_iterations - done)
+        best_solution, iterations = lns.run(evaluation, best_solution, chunk, num_removed,
+                                            adaptation_period=adaptation_period, time_limit=remaining,
+                                            on_improvement=on_improvement)
+        for it in iterations:
+            if it.accepted:
+                print(f"it {done + it.iteration}: new best solution found with {it.cost}")
+        fingerprints += (it.fingerprint for it in iterations)
+        done += len(iterations)
+        if on_checkpoint is not None:
+            on_checkpoint(best_solution, done,
+                          [lns.get_destroy_operator_weight(operator) for operator in destroy_operators])
+        if len(iterations) < chunk:  # out of time
+            break
+
+    if fingerprints:
+        duplicates = len(fingerprints) - len(set(fingerprints))
+        print(f"LNS: {duplicates} of {len(fingerprints)} generated solutions ({duplicates / len(fingerprints):.1%}) "
+              f"were generated before")
+
+    if adaptation_period > 0:
+        weights = [lns.get_destroy_operator_weight(operator) for operator in destroy_operators]
+        print(f"adapted destroy weights {[round(w, 3) for w in weights]}")
+
+    missing = best_solution.unassigned_vertices
+    if missing:
+        print(f"⚠️  Missing customers {missing}")
+
+    return best_solution
@@ -1,4 +1,11 @@
+import time
+
 import routingblocks as rb
+from routingblocks.operators import WorstRemovalOperator, BestInsertionOperator, random_selector_factory, first_move_selector
+
+from pysolver.ls import CustomLocalSearch
+from pysolver.metaheuristic.route_pool import RoutePool
+from pysolver.metaheuristic.visited import VisitedSolutions
 
 def iterative_local_search(
     py_instance,
@@ -9,40 +16,73 @@ def iterative_local_search(
     max_iterations: int = 100,
     remove_fraction: float = 0.1,
     ls_granularity: int = 20,
+    granular_repair: bool = False,
+    visited_capacity: int = 4096,
+    route_pool: RoutePool | None = None,
+    time_limit: float | None = None,
+    on_improvement=None,
+    start_iteration: int = 0,
+    on_checkpoint=None,
 ):
-    
-    from pysolver.ls import CustomLocalSearch
-    from routingblocks.operators import WorstRemovalOperator, BestInsertionOperator, random_selector_factory, first_move_selector
-
+    """
+    ``on_checkpoint(best_solution, i)`` is called before iteration ``i``. A search resumed from such a checkpoint
+    passes the solution as ``initial_solution`` and ``start_iteration=i``.
+    """
+    deadline = None if time_limit is None else time.monotonic() + time_limit
     best_solution = initial_solution.copy()
     
     num_customers = len(py_instance.vertices) - 1
     perturbation_strength = max(1, int(num_customers * remove_fraction))
     
     ls = CustomLocalSearch(py_instance, evaluation, cpp_instance, granularity=ls_granularity)
+    # Operators (and their move caches) live for the whole search. The removal cache keeps the moves of
+    # every route that is unchanged since the previous perturbation.
+    destroy = WorstRemovalOperator(cpp_instance, random_selector_factory(rng), incremental=True)
+    # A granular repair only reinserts vertices next to one of their ls_granularity nearest neighbours or next to
+    # the depot, using the same arc set as the local search
+    repair = BestInsertionOperator(cpp_instance, first_move_selector, ls.arc_set if granular_repair else None)
     best_solution = ls.improve(best_solution)
+    if on_improvement is not None:
+        on_improvement(best_solution)
+    # Fingerprints of recently repaired solutions. Only improvements are accepted and the best cost never increases,
+    # so a repaired solution seen before would not be accepted after local search this time either. 0 disables this.
+    visited = VisitedSolutions(visited_capacity) if visited_capacity > 0 else None
+    if visited is not None:
+        visited.add(best_solution.fingerprint)
 
-    for i in range(max_iterations):
+    for i in range(start_iteration, max_iterations):
+        if on_checkpoint is not None:
+            on_checkpoint(best_solution, i)
+        if deadline is not None and time.monotonic() >= deadline:
+            break
         # Local copy
         candidate = best_solution.copy()
 
         # Destroying
-        destroy = WorstRemovalOperator(cpp_instance, random_selector_factory(rng))
         removed = destroy.apply(evaluation, candidate, perturbation_strength)
 
         # Repairing
-        repair = BestInsertionOperator(cpp_instance, first_move_selector)
         repair.apply(evaluation, candidate, removed)
+        if visited is not None and visited.check(candidate.fingerprint):
+            continue
 
         # LS
         candidate = ls.improve(candidate)
+        if route_pool is not None:
+            route_pool.add_solution(candidate)
 
         # Accept only better solutions
         if candidate.cost < best_solution.cost:
             best_solution = candidate
+            if visited is not None:
+                visited.add(best_solution.fingerprint)
+            if on_improvement is not None:
+                on_improvement(best_solution)
             #print(f"Iteration {i}: Improved → obj = {best_solution.cost:.2f}")
         #else:
             #print("error")
 
-    
+    if visited is not None and visited.lookups:
+        print(f"ILS: skipped local search on {visited.duplicates} of {visited.lookups} repaired solutions "
+              f"({visited.duplicate_rate:.1%}) seen before")
     return best_solution
\ No newline at end of file
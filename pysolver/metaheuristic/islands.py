@@ -0,0 +1,123 @@
+# islands.py ── island-model cooperative LNS
+#
+#   Every island (one per worker process) runs the plain LNS of pysolver.metaheuristic for
+#   `exchange_interval` iterations, then hands its incumbent back as a route list. The best
+#   distinct incumbents form an elite pool, and islands that lag behind the best one restart
+#   from an elite solution in the next epoch.
+#
+#   Exchange happens at epoch boundaries and every epoch/island pair gets its own seed, so a
+#   run is reproducible no matter which process picks up which island.
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Callable
+import math
+import time
+
+import numpy as np
+import routingblocks as rb
+
+from pysolver.metaheuristic import lns
+
+Routes = list[list[int]]
+
+# (py_instance, cpp_instance, evaluation) of the worker process, built once by _init_worker
+_context = None
+
+
+def to_routes(solution: rb.Solution) -> Routes:
+    """Vertex ids of every route, depots included. Unlike rb objects, this pickles."""
+    return [[v.vertex_id for v in route] for route in solution]
+
+
+def from_routes(evaluation: rb.Evaluation, cpp_instance: rb.Instance, routes: Routes) -> rb.Solution:
+    return rb.Solution(evaluation, cpp_instance,
+                       [rb.create_route(evaluation, cpp_instance, route[1:-1]) for route in routes])
+
+
+@dataclass
+class ElitePool:
+    """The ``size`` cheapest distinct solutions seen so far, cheapest first."""
+    size: int
+    entries: list[tuple[float, Routes]] = field(default_factory=list)
+
+    def offer(self, cost: float, routes: Routes):
+        if any(routes == known for _, known in self.entries):
+            return
+        self.entries.append((cost, routes))
+        self.entries.sort(key=lambda entry: entry[0])  # stable, earlier entries win ties
+        del self.entries[self.size:]
+
+    @property
+    def best(self) -> tuple[float, Routes]:
+        return self.entries[0]
+
+
+def _init_worker(context_factory: Callable):
+    global _context
+    _context = context_factory()
+
+
+def _run_island(routes: Routes, seed: int, iterations: int, remove_fraction: float,
+                destroy_weights: tuple[float, float, float], adaptation_period: int, smoothing_factor: float,
+                time_limit: float | None) -> tuple[float, Routes]:
+    py_instance, cpp_instance, evaluation = _context
+    evaluation.reset_free_vehicle_usage()
+    solution = lns(py_instance, evaluation, cpp_instance, rb.Random(seed),
+                   from_routes(evaluation, cpp_instance, routes), iterations,
+                   remove_fraction=remove_fraction, destroy_weights=destroy_weights,
+                   adaptation_period=adaptation_period, smoothing_factor=smoothing_factor, time_limit=time_limit)
+    return solution.cost, to_routes(solution)
+
+
+def island_lns(context_factory: Callable, evaluation: rb.Evaluation, cpp_instance: rb.Instance,
+               initial_solution: rb.Solution, max_iterations: int, *, islands: int, seed: int,
+               exchange_interval: int = 250, remove_fraction: float = 0.20,
+               destroy_weights: tuple[float, float, float] = (1.0, 0.0, 0.0),
+               adaptation_period: int = 0, smoothing_factor: float = 0.2,
+               elite_size: int = 4, restart_gap: float = 0.005,
+               time_limit: float | None = None, on_improvement=None) -> rb.Solution:
+    """
+    Cooperative parallel LNS. Each of the ``islands`` workers runs ``max_iterations`` LNS iterations in total.
+
+    :param context_factory: Picklable callable returning ``(py_instance, cpp_instance, evaluation)``. Called once
+        per worker process, since rb objects cannot be sent to other processes.
+    :param exchange_interval: Number of LNS iterations between two exchanges with the elite pool.
+    :param adaptation_period: See :func:`pysolver.metaheuristic.lns`, as is ``smoothing_factor``. Adapted weights do
+        not carry over epochs.
+    :param restart_gap: An island restarts from the elite if its cost exceeds the best cost by more than this
+        fraction.
+    :param time_limit: Wall-clock limit in seconds. No new epoch is started once it is reached.
+    :param on_improvement: Called in this process with the new best solution whenever the elite improves.
+    """
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    start = (initial_solution.cost, to_routes(initial_solution))
+    elite = ElitePool(elite_size)
+    elite.offer(*start)
+    incumbents = [start] * islands
+
+    epochs = math.ceil(max_iterations / exchange_interval)
+    with ProcessPoolExecutor(max_workers=islands, initializer=_init_worker,
+                             initargs=(context_factory,)) as pool:
+        for epoch in range(epochs):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            iterations = min(exchange_interval, max_iterations - epoch * exchange_interval)
+            seeds = [int(s) for s in np.random.SeedSequence([seed, epoch]).generate_state(islands)]
+            incumbents = list(pool.map(_run_island, [routes for _, routes in incumbents], seeds,
+                                       repeat(iterations), repeat(remove_fraction), repeat(destroy_weights),
+                                       repeat(adaptation_period), repeat(smoothing_factor), repeat(remaining)))
+
+            previous_best = elite.best[0]
+            for cost, routes in incumbents:
+                elite.offer(cost, routes)
+            best_cost = elite.best[0]
+            if on_improvement is not None and best_cost < previous_best:
+                on_improvement(from_routes(evaluation, cpp_instance, elite.best[1]))
+            for island, (cost, _) in enumerate(incumbents):
+                if cost - best_cost > restart_gap * abs(best_cost):
+                    incumbents[island] = elite.entries[island % len(elite.entries)]
+            print(f"epoch {epoch}: best {best_cost} | islands {[round(cost, 2) for cost, _ in incumbents]}")
+
+    return from_routes(evaluation, cpp_instance, elite.best[1])
@@ -0,0 +1,113 @@
+# route_pool.py ── set-partitioning recombination of the routes seen during search
+#
+#   LNS and ILS evaluate many good routes that never make it into the final solution. The pool keeps
+#   every distinct route it is offered (deduplicated by rb.Route.fingerprint) as a compact column:
+#   its customers, its cost and the vehicle type the evaluation assigns to it. solve() then picks the
+#   cheapest subset of pooled routes that visits every customer exactly once and uses no more vehicles
+#   of a type than the fleet and the initial fleet hold, as a set-partitioning MIP solved locally by
+#   HiGHS through scipy.optimize.milp.
+#
+#   Route costs do not depend on the other routes of a solution, so the objective of the MIP is the
+#   cost of the assembled rb.Solution and can be compared with the incumbent directly. Empty routes
+#   are not free under the HFVRP evaluation, so assembled solutions are padded with empty routes to
+#   the route count of the incumbent and each column costs what it adds over an empty route.
+from array import array
+from collections import Counter
+from typing import Sequence
+
+import numpy as np
+import routingblocks as rb
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.sparse import csc_array
+
+
+def fleet_limits(fleets: Sequence[tuple], initial_fleets: Sequence[tuple]) -> dict[str, int]:
+    """
+    Number of vehicles of each type: the purchasable ones plus those of the initial fleet. Both are fleet rows as
+    returned by ``parse_instance(..., return_fleets=True)``, one row per vehicle and the type first.
+    """
+    return dict(Counter(row[0] for row in fleets) + Counter(row[0] for row in initial_fleets))
+
+
+class RoutePool:
+    """
+    Distinct routes seen during search, for set-partitioning recombination.
+
+    :param vehicle_types: Type of every vehicle of the evaluation, indexed like
+        ``evaluation.compute_best_vehicle_id_of_route``, i.e., the first column of the parsed fleet rows.
+    :param limits: Maximum number of routes per vehicle type, see :func:`fleet_limits`.
+    :param capacity: Routes offered once the pool holds this many are ignored.
+    """
+
+    def __init__(self, evaluation: rb.Evaluation, cpp_instance: rb.Instance, vehicle_types: Sequence[str],
+                 limits: dict[str, int], capacity: int = 100_000):
+        self.evaluation = evaluation
+        self.cpp_instance = cpp_instance
+        self.capacity = capacity
+        self._type_index = {typ: k for k, typ in enumerate(dict.fromkeys(vehicle_types))}
+        self._type_of_vehicle = [self._type_index[typ] for typ in vehicle_types]
+        self._limits = np.array([limits.get(typ, 0) for typ in self._type_index], dtype=np.float64)
+        self._empty_route_cost = rb.Route(evaluation, cpp_instance).cost
+        self._columns: dict[int, int] = {}  # route fingerprint -> column
+        self._customers: list[np.ndarray] = []
+        self._costs = array("d")
+        self._types = array("H")
+
+    def __len__(self) -> int:
+        return len(self._costs)
+
+    def add_route(self, route: rb.Route) -> bool:
+        """Adds ``route`` unless it is empty, already pooled or the pool is full. Returns whether it was added."""
+        if route.empty or len(self) >= self.capacity:
+            return False
+        fingerprint = route.fingerprint
+        if fingerprint in self._columns:
+            return False
+        self._columns[fingerprint] = len(self)
+        self._customers.append(np.fromiter((node.vertex_id for node in route), dtype=np.int32)[1:-1])
+        self._costs.append(route.cost)
+        self._types.append(self._type_of_vehicle[self.evaluation.compute_best_vehicle_id_of_route(route)])
+        return True
+
+    def add_solution(self, solution: rb.Solution) -> int:
+        """Adds all routes of ``solution``. Returns the number of new routes."""
+        return sum(self.add_route(route) for route in solution)
+
+    def solve(self, num_routes: int, time_limit: float | None = None) -> rb.Solution | None:
+        """
+        Cheapest solution with ``num_routes`` routes, empty ones included, assembled from pooled routes. Every
+        customer that appears in the pool is visited exactly once. Returns None if the pool is empty or HiGHS finds
+        no feasible solution within ``time_limit`` seconds.
+        """
+        if not len(self):
+            return None
+        costs = np.frombuffer(self._costs, dtype=np.float64) - self._empty_route_cost
+        lengths = np.fromiter((len(c) for c in self._customers), dtype=np.int64, count=len(self))
+        visits = np.concatenate(self._customers)
+        customers, rows = np.unique(visits, return_inverse=True)
+        columns = np.repeat(np.arange(len(self)), lengths)
+        cover = csc_array((np.ones(len(visits)), (rows, columns)), shape=(len(customers), len(self)))
+        types = np.frombuffer(self._types, dtype=np.uint16)
+        fleet = csc_array((np.ones(len(self)), (types, np.arange(len(self)))), shape=(len(self._limits), len(self)))
+
+        options = {} if time_limit is None else {"time_limit": max(time_limit, 0.0)}
+        result = milp(costs, integrality=np.ones(len(self)), bounds=Bounds(0, 1),
+                      constraints=[LinearConstraint(cover, 1, 1), LinearConstraint(fleet, 0, self._limits),
+                                   LinearConstraint(np.ones((1, len(self))), 0, num_routes)],
+                      options=options)
+        if result.x is None:
+            return None
+        chosen = np.flatnonzero(result.x > 0.5)
+        routes = [rb.create_route(self.evaluation, self.cpp_instance, self._customers[column].tolist())
+                  for column in chosen]
+        routes += [rb.Route(self.evaluation, self.cpp_instance) for _ in range(num_routes - len(routes))]
+        return rb.Solution(self.evaluation, self.cpp_instance, routes)
+
+    def recombine(self, solution: rb.Solution, time_limit: float | None = None) -> rb.Solution:
+        """Pools the routes of ``solution`` and returns the assembled solution if it is cheaper, else ``solution``."""
+        self.add_solution(solution)
+        recombined = self.solve(len(solution), time_limit)
+        if (recombined is None or recombined.cost >= solution.cost - 1e-9
+                or len(recombined.unassigned_vertices) > len(solution.unassigned_vertices)):
+            return solution
+        return recombined
@@ -0,0 +1,41 @@
+# visited.py ── bounded memory of recently generated solutions
+#
+#   Solutions are identified by rb.Solution.fingerprint, a 64 bit hash of their routes that the
+#   solution keeps up to date on every modification, so a lookup costs O(number of routes).
+from collections import OrderedDict
+
+
+class VisitedSolutions:
+    """The ``capacity`` most recently seen solution fingerprints, evicted least recently seen first."""
+
+    def __init__(self, capacity: int = 4096):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.lookups = 0
+        self.duplicates = 0
+        self._fingerprints: OrderedDict[int, None] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return fingerprint in self._fingerprints
+
+    def add(self, fingerprint: int):
+        self._fingerprints[fingerprint] = None
+        self._fingerprints.move_to_end(fingerprint)
+        if len(self._fingerprints) > self.capacity:
+            self._fingerprints.popitem(last=False)
+
+    def check(self, fingerprint: int) -> bool:
+        """Records ``fingerprint`` and returns whether it was seen before. Counts towards :attr:`duplicate_rate`."""
+        self.lookups += 1
+        seen = fingerprint in self._fingerprints
+        self.duplicates += seen
+        self.add(fingerprint)
+        return seen
+
+    @property
+    def duplicate_rate(self) -> float:
+        return self.duplicates / self.lookups if self.lookups else 0.0
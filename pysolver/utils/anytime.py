@@ -0,0 +1,122 @@
+# anytime.py ── wall-clock budgets and incumbent checkpoints for the solver pipeline
+from dataclasses import dataclass
+from pathlib import Path
+import gzip
+import json
+import os
+import random
+import time
+
+import routingblocks as rb
+
+from pysolver.instance.models import Instance
+
+
+@dataclass(frozen=True)
+class TimeBudget:
+    """Wall-clock limits in seconds for the whole pipeline and for each stage. ``None`` means unlimited."""
+    total: float | None = None
+    savings: float | None = None
+    lns: float | None = None
+    ils: float | None = None
+
+    def start(self) -> "Deadline":
+        return Deadline(None if self.total is None else time.monotonic() + self.total)
+
+
+@dataclass(frozen=True)
+class Deadline:
+    at: float | None
+
+    def remaining(self) -> float | None:
+        return None if self.at is None else max(0.0, self.at - time.monotonic())
+
+    def stage_limit(self, stage_limit: float | None) -> float | None:
+        """Time a stage may use: its own limit, cut down to what is left of the pipeline budget."""
+        limits = [x for x in (stage_limit, self.remaining()) if x is not None]
+        return min(limits) if limits else None
+
+
+class IncumbentWriter:
+    """
+    Anytime callback that writes the incumbent to ``path`` as JSON whenever it improves. The file is replaced
+    atomically, so a run that is killed at any point leaves the last complete plan behind.
+    """
+
+    def __init__(self, path: Path, py_instance: Instance):
+        self.path = Path(path)
+        self.py_instance = py_instance
+        self.best_cost = float("inf")
+
+    def __call__(self, solution: rb.Solution, stage: str = ""):
+        cost = solution.cost
+        if cost >= self.best_cost:
+            return
+        self.best_cost = cost
+        names = self.py_instance.vertices.vertex_name
+        routes = [[v.vertex_id for v in route] for route in solution if len(route) > 2]
+        payload = {
+            "stage": stage,
+            "cost": cost,
+            "feasible": solution.feasible,
+            "routes": routes,
+            "route_names": [[names[vertex_id] for vertex_id in route] for route in routes],
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload))
+        os.replace(tmp_path, self.path)
+
+
+class ResumeCheckpoint:
+    """
+    Search state of a running stage, written to ``path`` as gzipped JSON at most every ``interval`` seconds, so that a
+    killed run can continue where it stopped instead of starting over from savings. LNS and ILS only accept
+    improvements, so the solution of a stage is also its incumbent. The file is replaced atomically.
+    """
+
+    def __init__(self, path: Path, interval: float = 60.0):
+        self.path = Path(path)
+        self.interval = interval
+        self._last_save = time.monotonic()
+
+    def due(self) -> bool:
+        return time.monotonic() - self._last_save >= self.interval
+
+    def save(self, stage: str, iteration: int, solution: rb.Solution, seed: int, cpp_random: rb.Random, **extra):
+        """
+        Saves ``solution`` after ``iteration`` iterations of ``stage``, together with the state of the python and
+        routingblocks random number generators. ``extra`` holds further JSON serializable stage state.
+        """
+        version, internal_state, gauss_next = random.getstate()
+        payload = {
+            "stage": stage,
+            "iteration": iteration,
+            "seed": seed,
+            "cost": solution.cost,
+            "routes": [[v.vertex_id for v in route] for route in solution],
+            "random": [version, internal_state, gauss_next],
+            "cpp_random": cpp_random.get_state(),
+            **extra,
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self.path)
+        self._last_save = time.monotonic()
+
+    def load(self) -> dict | None:
+        """The saved state, or None if there is no checkpoint."""
+        if not self.path.exists():
+            return None
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+
+def restore_random(state: dict, cpp_random: rb.Random):
+    """Puts the python and routingblocks random number generators back into the state saved in ``state``."""
+    version, internal_state, gauss_next = state["random"]
+    random.setstate((version, tuple(internal_state), gauss_next))
+    cpp_random.set_state(state["cpp_random"])
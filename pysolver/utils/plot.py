@@ -10,21 +10,16 @@ from pysolver.instance.models import Instance
 def draw_routes(instance: Instance, R: list[list[int]]):
     # set color scheme
     # https://matplotlib.org/3.2.1/gallery/color/colormap_reference.html
-    colors = plt.cm.get_cmap('tab10', len(R))
+    colors = plt.get_cmap('tab10', len(R))
+    vertices = instance.vertices
 
     fig, ax = plt.subplots()
 
     for r_idx, r in enumerate([i for i in filter(lambda r: len(r) > 2, R)]):
-        path = list()
-        for i in range(len(r)):
-            # for i in range(1, len(r)-1):
-            path.append((instance.vertices[r[i]].x_coord, instance.vertices[r[i]].y_coord))
-
         # plot control points and connecting lines
-        x, y = zip(*path)
-        line, = ax.plot(x, y, 'o-', color=colors(r_idx))
+        line, = ax.plot(vertices.x_coord[r], vertices.y_coord[r], 'o-', color=colors(r_idx))
 
-    ax.plot(instance.vertices[0].x_coord, instance.vertices[0].y_coord, 'ks')
+    ax.plot(vertices.x_coord[0], vertices.y_coord[0], 'ks')
 
     # ax.grid()
     ax.axis('equal')
@@ -3,23 +3,22 @@ import random
 from pysolver.instance.models import Instance
 
 def draw_routes_on_map(instance: Instance, R: list[list[int]]):
+    vertices = instance.vertices
     # Extract node coordinates
-    node_coords = {
-        v.vertex_id: (v.y_coord, v.x_coord)  # Note: folium uses (lat, lon) = (y, x)
-        for v in instance.vertices
-    }
+    node_coords = dict(zip(vertices.vertex_id.tolist(),
+                           zip(vertices.y_coord.tolist(), vertices.x_coord.tolist())))  # Note: folium uses (lat, lon) = (y, x)
 
     # Create center point for the map
-    center_lat = sum(v.y_coord for v in instance.vertices) / len(instance.vertices)
-    center_lon = sum(v.x_coord for v in instance.vertices) / len(instance.vertices)
+    center_lat = float(vertices.y_coord.mean())
+    center_lon = float(vertices.x_coord.mean())
     m = folium.Map(location=(center_lat, center_lon), zoom_start=10)
 
     # Add all nodes to the map
-    for v in instance.vertices:
+    for vertex_id, location in node_coords.items():
         folium.Marker(
-            location=(v.y_coord, v.x_coord),
-            tooltip=f"ID: {v.vertex_id}",
-            icon=folium.Icon(color='green' if v.vertex_id != 0 else 'black')  # depot is black
+            location=location,
+            tooltip=f"ID: {vertex_id}",
+            icon=folium.Icon(color='green' if vertex_id != 0 else 'black')  # depot is black
         ).add_to(m)
 
     # Generate distinct colors for each route